@@ -0,0 +1,138 @@
+# Puntos de entrada asíncronos (asyncio) para los métodos de asignación y
+# transporte
+#
+# Las resoluciones pesadas se delegan a un pool de trabajadores y CBC se
+# ejecuta como subproceso no bloqueante, de modo que el ciclo de eventos
+# sigue atendiendo otras tareas mientras tanto.
+
+import asyncio
+import functools
+import os
+import tempfile
+from time import perf_counter
+
+import metodo_hungaro as mh
+
+METODO_VOGEL = "vogel"
+METODO_CBC = "cbc"
+
+class SolucionadorAsincrono:
+    """Resuelve problemas desde corrutinas sin bloquear el ciclo de eventos.
+
+    A lo sumo 'max_concurrentes' resoluciones corren a la vez (por omisión,
+    la cantidad de procesadores); las demás esperan su turno sin ocupar
+    trabajadores, así que una instancia grande no acapara el servicio.
+    El trabajo de CPU se hace en 'ejecutor' (un concurrent.futures.Executor)
+    o, por omisión, en el pool de 'tipo_pool' de metodo_hungaro con
+    max_concurrentes trabajadores (ver mh.obtener_pool).
+
+    Cada método acepta 'tiempo_limite' en segundos; al vencerse, o si se
+    cancela la tarea que espera, se lanza TimeoutError o CancelledError y
+    se libera el lugar.  Los subprocesos de CBC se terminan en ese momento;
+    una resolución ya iniciada en el pool, en cambio, no se puede
+    interrumpir: termina en segundo plano y su resultado se descarta.
+
+    Un mismo objeto debe usarse dentro de un único ciclo de eventos.
+    """
+
+    def __init__(self, max_concurrentes=None, ejecutor=None,
+                 tipo_pool=mh.POOL_PROCESOS):
+        self.max_concurrentes = max_concurrentes or os.cpu_count() or 1
+        self.ejecutor = ejecutor
+        self.tipo_pool = tipo_pool
+        self._semaforo = asyncio.Semaphore(self.max_concurrentes)
+
+    async def hungaro(self, matriz_costos, minimizar=True,
+                      tiempo_limite=None, **opciones):
+        """Versión asíncrona de mh.hungaro; 'opciones' son los demás
+        argumentos por nombre de ésta (salvo funcion_pasos, que podría
+        pedir datos por la entrada estándar)."""
+        if opciones.get("funcion_pasos") is not None:
+            raise ValueError("funcion_pasos no se admite en modo asíncrono")
+        funcion = functools.partial(mh.hungaro, matriz_costos, minimizar,
+                                    **opciones)
+        return await self._limitar(
+            functools.partial(self._en_ejecutor, funcion), tiempo_limite)
+
+    async def transporte(self, oferta, demanda, costos, duales=False,
+                         metodo=METODO_VOGEL, tiempo_limite=None,
+                         ruta_cbc=None):
+        """Resuelve con transporte_vogel (METODO_VOGEL) o transporte_cbc
+        (METODO_CBC); en el último caso, CBC corre como subproceso
+        asíncrono y sólo la escritura del modelo ocupa un trabajador."""
+        import transporte as trans
+
+        if metodo == METODO_VOGEL:
+            funcion = functools.partial(trans.transporte_vogel, oferta,
+                                        demanda, costos, duales)
+            fabrica = functools.partial(self._en_ejecutor, funcion)
+        elif metodo == METODO_CBC:
+            fabrica = functools.partial(self._transporte_cbc, oferta, demanda,
+                                        costos, duales, ruta_cbc)
+        else:
+            raise ValueError("Método desconocido: %r" % (metodo,))
+        return await self._limitar(fabrica, tiempo_limite)
+
+    async def costo_transporte_ruta_minima(self, oferta, demanda, origen,
+                                           destino, costo_envio,
+                                           duales=False, tiempo_limite=None):
+        """Versión asíncrona de trans.costo_transporte_ruta_minima (PuLP).
+
+        PuLP espera a CBC dentro del trabajador, por lo que ese subproceso
+        no se termina al cancelar; para eso conviene transporte con
+        METODO_CBC.
+        """
+        import transporte as trans
+
+        funcion = functools.partial(trans.costo_transporte_ruta_minima,
+                                    oferta, demanda, origen, destino,
+                                    costo_envio, duales)
+        return await self._limitar(
+            functools.partial(self._en_ejecutor, funcion), tiempo_limite)
+
+    async def _limitar(self, fabrica, tiempo_limite):
+        # 'fabrica' crea la corrutina una vez obtenido el lugar; el tiempo
+        # límite incluye la espera
+        async def con_lugar():
+            async with self._semaforo:
+                return await fabrica()
+        return await asyncio.wait_for(con_lugar(), tiempo_limite)
+
+    async def _en_ejecutor(self, funcion):
+        ejecutor = self.ejecutor
+        if ejecutor is None:
+            ejecutor = mh.obtener_pool(self.max_concurrentes, self.tipo_pool)
+        return await asyncio.get_running_loop().run_in_executor(ejecutor,
+                                                                funcion)
+
+    async def _transporte_cbc(self, oferta, demanda, costos, duales,
+                              ruta_cbc):
+        import transporte as trans
+
+        inicio = perf_counter()
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo_modelo = os.path.join(directorio, "transporte.mps")
+            archivo_solucion = os.path.join(directorio, "transporte.sol")
+            # El modelo se escribe en un hilo: el archivo debe quedar en
+            # este proceso para que lo lea CBC
+            costos = await asyncio.to_thread(trans.escribir_modelo_cbc,
+                                             archivo_modelo, oferta, demanda,
+                                             costos)
+            construido = perf_counter()
+            comando = trans.comando_cbc(archivo_modelo, archivo_solucion,
+                                        ruta_cbc)
+            proceso = await asyncio.create_subprocess_exec(
+                *comando, stdout=asyncio.subprocess.DEVNULL)
+            try:
+                codigo = await proceso.wait()
+            except BaseException:  # Cancelación o tiempo límite
+                if proceso.returncode is None:
+                    proceso.kill()
+                    await asyncio.shield(proceso.wait())
+                raise
+            if codigo != 0:
+                raise RuntimeError("CBC terminó con el código %d" % codigo)
+            tiempos = {"construccion": construido - inicio,
+                       "resolucion": perf_counter() - construido}
+            return trans.resultado_cbc(archivo_solucion, costos, duales,
+                                       tiempos)
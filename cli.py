@@ -2,10 +2,24 @@
 # Interfaz interactiva de consola para resolver problemas de
 # transporte y asignación
 # Autor: Andrés Gallegos y Santiago Pinto               Fecha: 2024-07-18
+#
+# Con argumentos, funciona en modo no interactivo (ver lote):
+#   python cli.py asignacion problemas.jsonl --salida resultados.jsonl
+#   python cli.py transporte problemas.csv --formato-salida csv
 
+import argparse
+import collections
+import csv
+import functools
+import io
+import json
+import os
+import subprocess
 import sys
 import metodo_hungaro as mh
-import transporte as trans
+
+# transporte se importa en las funciones que lo usan: carga NumPy y PuLP,
+# que una ejecución sólo de asignación no necesita
 
 _MSG_ERROR_OPCION_INCORRECTA = "Opción incorrecta."
 funcion_estado = None
@@ -40,9 +54,34 @@ def inicio():
 
 def transporte():
     global funcion_estado
-    trans.main()
+    import transporte as trans
+
+    oferta, demanda, origen, destino, costo_envio = trans.leer_datos()
+    try:
+        resultado = trans.costo_transporte_vogel(oferta, demanda, origen,
+                                                 destino, costo_envio)
+    except ValueError as e:
+        print("Los datos introducidos son inválidos:",
+              "\t" + e.args[0],
+              sep="\n", file=sys.stderr)
+        funcion_estado = inicio
+        return
+    mostrar_resultado_transporte(resultado, origen, destino)
     funcion_estado = inicio
 
+def mostrar_resultado_transporte(resultado, origen, destino):
+    import transporte as trans
+
+    if resultado.estado != trans.ESTADO_OPTIMO:
+        print("Estado de la solución:", resultado.estado, file=sys.stderr)
+    salida = [["Origen", "Destino", "Cantidad"]]
+    salida += ([str(origen[i]), str(destino[j]), str(cantidad)]
+               for i, j, cantidad in zip(resultado.origenes,
+                                         resultado.destinos,
+                                         resultado.cantidades))
+    salida += [["Costo total", "", str(resultado.costo_total)]]
+    mostrar_tabla(salida)
+
 def asignacion():
     global funcion_estado
     matriz_costos = []
@@ -124,5 +163,401 @@ def mostrar_tabla(tabla):
         print("|")
     print("+", linea_horizontal[1:-1], "+", sep="", end="\n\n")
 
+FORMATOS_ENTRADA = ("csv", "json", "jsonl", "npy")
+FORMATOS_SALIDA = ("jsonl", "csv")
+METODOS_TRANSPORTE = ("vogel", "cbc")
+
+def lote(argumentos=None):
+    """Modo no interactivo: resuelve los problemas de uno o más archivos.
+
+    Los problemas se leen, resuelven y escriben de a uno, por lo que la
+    memoria no depende de la cantidad de problemas de la entrada; con
+    --trabajadores se resuelven en paralelo, manteniendo el orden de
+    entrada.  Cada resultado lleva el 'indice' del problema (contando
+    desde 0 en todos los archivos) y su 'id', si tenía.  Los problemas
+    inválidos, o en los que falla el solver, no detienen el proceso: su
+    error se informa en la salida (JSON Lines) o en la salida de errores
+    (CSV), y el código de salida es 1.  Si falta un archivo de entrada, no
+    se resuelve nada y el código es 2; si se cierra la salida (p. ej. con
+    head), se termina sin mensajes.
+
+    Formatos de entrada (por la extensión, o --formato-entrada; "-" es la
+    entrada estándar, en JSON Lines por omisión):
+    jsonl: un problema por línea.  json: un solo problema.  Un problema de
+        asignación es una matriz o un objeto {"costos": matriz,
+        "minimizar": bool, "id": ...}; uno de transporte es un objeto
+        {"oferta": [...], "demanda": [...], "costos": matriz, "id": ...}.
+        Los costos null son rutas inexistentes.
+    csv: problemas separados por filas vacías.  En asignación, cada fila
+        es una fila de la matriz de costos; en transporte, la última
+        columna es la oferta y la última fila la demanda.  Las celdas
+        vacías son rutas inexistentes.
+    npy: sólo asignación; un arreglo 2-D es un problema y uno 3-D una
+        pila de problemas, que se lee por partes (mmap).
+
+    El subcomando rutas resuelve un único problema de transporte dado como
+    tabla de rutas (origen, destino, costo) en CSV o Parquet, con la
+    oferta y la demanda en archivos aparte (ver trans.leer_rutas), y
+    escribe los envíos en CSV con los nombres de los nodos.
+    """
+    analizador = argparse.ArgumentParser(
+        description="Resuelve problemas de asignación o transporte leídos"
+                    " de archivos.")
+    subcomandos = analizador.add_subparsers(dest="problema", required=True)
+    for problema, metodos in (("asignacion", (mh.METODO_CAMINOS,
+                                              mh.METODO_MARCADO)),
+                              ("transporte", METODOS_TRANSPORTE)):
+        subcomando = subcomandos.add_parser(problema)
+        subcomando.add_argument("archivos", nargs="*", default=["-"],
+                                help="archivos de entrada (- o nada para la"
+                                     " entrada estándar)")
+        subcomando.add_argument("--formato-entrada", choices=FORMATOS_ENTRADA)
+        subcomando.add_argument("--salida", default="-",
+                                help="archivo de salida (- para la salida"
+                                     " estándar)")
+        subcomando.add_argument("--formato-salida", choices=FORMATOS_SALIDA)
+        subcomando.add_argument("--metodo", choices=metodos,
+                                default=metodos[0])
+        subcomando.add_argument("--trabajadores", type=int, default=0,
+                                help="procesos para resolver en paralelo"
+                                     " (0: en este proceso)")
+        if problema == "asignacion":
+            subcomando.add_argument("--maximizar", action="store_true",
+                                    help="maximiza en los problemas que no"
+                                         " indican 'minimizar'")
+    subcomando = subcomandos.add_parser("rutas")
+    subcomando.add_argument("archivo",
+                            help="rutas en CSV o Parquet, con columnas"
+                                 " origen, destino y costo")
+    subcomando.add_argument("--oferta", required=True,
+                            help="archivo con el nombre y la oferta de cada"
+                                 " origen")
+    subcomando.add_argument("--demanda", required=True,
+                            help="archivo con el nombre y la demanda de cada"
+                                 " destino")
+    subcomando.add_argument("--salida", default="-",
+                            help="archivo CSV de salida (- para la salida"
+                                 " estándar)")
+    opciones = analizador.parse_args(argumentos)
+
+    try:
+        return _ejecutar_lote(opciones)
+    except BrokenPipeError:
+        # Se cerró la salida (p. ej. con head): se termina sin traza, y sin
+        # que Python avise al cerrar la salida estándar
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+def _ejecutar_lote(opciones):
+    if opciones.problema == "rutas":
+        archivos = [opciones.archivo, opciones.oferta, opciones.demanda]
+    else:
+        archivos = opciones.archivos
+    faltantes = [archivo for archivo in archivos
+                 if archivo != "-" and not os.path.isfile(archivo)]
+    if faltantes:
+        print("No existe el archivo de entrada:", faltantes[0],
+              file=sys.stderr)
+        return 2
+    if opciones.problema == "rutas":
+        return resolver_rutas(opciones.archivo, opciones.oferta,
+                              opciones.demanda, opciones.salida)
+
+    if opciones.problema == "asignacion":
+        funcion = functools.partial(resolver_asignacion,
+                                    metodo=opciones.metodo,
+                                    minimizar=not opciones.maximizar)
+    else:
+        funcion = functools.partial(resolver_transporte,
+                                    metodo=opciones.metodo)
+    problemas = leer_problemas(opciones.archivos, opciones.problema,
+                               opciones.formato_entrada)
+    resultados = resolver_en_flujo(funcion, problemas, opciones.trabajadores)
+
+    formato_salida = opciones.formato_salida
+    if formato_salida is None:
+        formato_salida = "csv" if opciones.salida.lower().endswith(".csv") \
+                         else "jsonl"
+    if opciones.salida == "-":
+        return escribir_resultados(resultados, sys.stdout, formato_salida,
+                                   opciones.problema)
+    try:
+        salida = open(opciones.salida, "w", newline="", encoding="utf-8")
+    except OSError as e:
+        raise SystemExit("No se puede escribir la salida: %s" % e)
+    with salida:
+        return escribir_resultados(resultados, salida, formato_salida,
+                                   opciones.problema)
+
+def leer_problemas(archivos, problema, formato=None):
+    """Generador de los problemas (diccionarios) de los archivos dados.
+
+    Un problema que no se puede leer se produce como {"error": mensaje},
+    para que conserve su índice.
+    """
+    for archivo in archivos:
+        formato_archivo = formato
+        if formato_archivo is None:
+            extension = os.path.splitext(archivo)[1].lower().lstrip(".")
+            formato_archivo = {"ndjson": "jsonl"}.get(extension, extension)
+            if archivo == "-":
+                formato_archivo = "jsonl"
+        if formato_archivo not in FORMATOS_ENTRADA:
+            raise SystemExit("Formato de entrada desconocido: %s" % archivo)
+        if formato_archivo == "npy":
+            if problema != "asignacion":
+                raise SystemExit("El formato npy sólo sirve para asignación")
+            yield from leer_npy(archivo)
+            continue
+        try:
+            entrada = sys.stdin if archivo == "-" else \
+                      open(archivo, newline="", encoding="utf-8")
+        except OSError as e:
+            raise SystemExit("No se puede leer la entrada: %s" % e)
+        try:
+            if formato_archivo == "csv":
+                for filas in leer_bloques_csv(entrada):
+                    yield problema_desde_csv(filas, problema)
+            elif formato_archivo == "json":
+                yield problema_desde_json(entrada.read(), problema)
+            else:
+                for linea in entrada:
+                    if linea.strip():
+                        yield problema_desde_json(linea, problema)
+        finally:
+            if entrada is not sys.stdin:
+                entrada.close()
+
+def leer_npy(archivo):
+    import numpy as np
+
+    if archivo == "-":
+        arreglo = np.load(io.BytesIO(sys.stdin.buffer.read()))
+    else:
+        try:
+            arreglo = np.load(archivo, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            raise SystemExit("No se puede leer la entrada: %s" % e)
+    if arreglo.ndim == 2:
+        arreglo = arreglo[np.newaxis]
+    if arreglo.ndim != 3:
+        raise SystemExit("El arreglo de %s no es una matriz ni una pila de"
+                         " matrices" % archivo)
+    for matriz in arreglo:
+        # Vista sobre el mapeo: las filas se leen a medida que se usan
+        yield {"costos": matriz}
+
+def leer_bloques_csv(entrada):
+    # Produce las listas de filas separadas por filas vacías
+    filas = []
+    for fila in csv.reader(entrada):
+        if any(celda.strip() for celda in fila):
+            filas.append(fila)
+        elif filas:
+            yield filas
+            filas = []
+    if filas:
+        yield filas
+
+def _numero(valor):
+    # Los datos faltantes (celda vacía o null) son rutas inexistentes
+    if valor is None or (isinstance(valor, str) and valor.strip() == ""):
+        return mh.INFINITO
+    if isinstance(valor, str):
+        try:
+            return int(valor)
+        except ValueError:
+            return float(valor.replace(",", "."))
+    return valor
+
+def problema_desde_csv(filas, problema):
+    try:
+        matriz = [[_numero(celda) for celda in fila] for fila in filas]
+    except ValueError:
+        return {"error": "Los elementos no son números"}
+    if problema == "asignacion":
+        return {"costos": matriz}
+    if len(matriz) < 2:
+        return {"error": "Falta la fila de demanda"}
+    return {"oferta": [fila[-1] for fila in matriz[:-1]],
+            "demanda": matriz[-1][:len(matriz[0]) - 1],
+            "costos": [fila[:-1] for fila in matriz[:-1]]}
+
+def problema_desde_json(texto, problema):
+    try:
+        datos = json.loads(texto)
+    except ValueError as e:
+        return {"error": "JSON inválido: %s" % e}
+    if isinstance(datos, list) and problema == "asignacion":
+        datos = {"costos": datos}
+    if not isinstance(datos, dict) or "costos" not in datos:
+        return {"error": "Falta la matriz de costos"}
+    costos = datos["costos"]
+    if isinstance(costos, list):
+        try:
+            datos["costos"] = [[_numero(costo) for costo in fila]
+                               if isinstance(fila, list) else fila
+                               for fila in costos]
+        except ValueError:
+            return {"id": datos.get("id"),
+                    "error": "Los elementos no son números"}
+    return datos
+
+def resolver_asignacion(problema, metodo=mh.METODO_CAMINOS, minimizar=True):
+    """Resuelve un problema leído por leer_problemas y devuelve el resultado
+    como diccionario (con "error" si el problema es inválido)."""
+    resultado = {"id": problema.get("id")}
+    if "error" in problema:
+        resultado["error"] = problema["error"]
+        return resultado
+    costos = problema["costos"]
+    try:
+        asignaciones = mh.hungaro(costos, problema.get("minimizar", minimizar),
+                                  metodo=metodo)
+        # Se descartan las filas o columnas agregadas a una matriz
+        # rectangular, y el costo se toma de la matriz original
+        cant_columnas = len(costos[0])
+        asignaciones = [(i, j) for i, j in asignaciones
+                        if i < len(costos) and j < cant_columnas]
+        pares = [(int(i), int(j), float(costos[i][j]))
+                 for i, j in asignaciones]
+    except (ValueError, TypeError, IndexError) as e:
+        resultado["error"] = str(e)
+        return resultado
+    resultado["asignaciones"] = pares
+    resultado["costo"] = sum(costo for i, j, costo in pares)
+    return resultado
+
+def resolver_transporte(problema, metodo="vogel"):
+    """Análogo a resolver_asignacion para problemas de transporte."""
+    import transporte as trans
+
+    resultado = {"id": problema.get("id")}
+    if "error" in problema:
+        resultado["error"] = problema["error"]
+        return resultado
+    try:
+        solver = trans.transporte_cbc if metodo == "cbc" \
+                 else trans.transporte_vogel
+        solucion = solver(problema["oferta"], problema["demanda"],
+                          problema["costos"])
+    except KeyError as e:
+        resultado["error"] = "Falta el dato %s" % e
+        return resultado
+    except (ValueError, TypeError, IndexError) as e:
+        resultado["error"] = str(e)
+        return resultado
+    except (OSError, subprocess.SubprocessError, RuntimeError) as e:
+        # Fallas del solver (p. ej. de CBC): sólo afectan a este problema
+        resultado["error"] = "Falla del solver: %s" % e
+        return resultado
+    costos = problema["costos"]
+    resultado["estado"] = solucion.estado
+    resultado["envios"] = [
+        (i, j, cantidad, cantidad * costos[i][j])
+        for i, j, cantidad in zip(solucion.origenes.tolist(),
+                                  solucion.destinos.tolist(),
+                                  solucion.cantidades.tolist())]
+    resultado["costo"] = float(solucion.costo_total) \
+                         if solucion.costo_total is not None else None
+    return resultado
+
+def resolver_rutas(archivo_rutas, archivo_oferta, archivo_demanda,
+                   salida="-"):
+    """Resuelve el problema de transporte de una tabla de rutas y escribe
+    los envíos (origen, destino, cantidad, costo) y el costo total en CSV;
+    devuelve el código de salida."""
+    import transporte as trans
+
+    try:
+        instancia = trans.leer_rutas(archivo_rutas, archivo_oferta,
+                                     archivo_demanda)
+        resultado = trans.transporte_vogel(instancia.oferta,
+                                           instancia.demanda,
+                                           instancia.costos)
+    except (ValueError, OSError) as e:
+        print("Los datos son inválidos:", e, file=sys.stderr)
+        return 1
+    if resultado.estado != trans.ESTADO_OPTIMO:
+        print("Estado de la solución:", resultado.estado, file=sys.stderr)
+
+    # Costo de cada envío: posición de la ruta dentro de las de su origen
+    costos = instancia.costos
+    inicio = instancia.inicio[resultado.origenes]
+    fin = instancia.inicio[resultado.origenes + 1]
+    rutas = [k + costos.columnas[k:f].searchsorted(j)
+             for k, f, j in zip(inicio.tolist(), fin.tolist(),
+                                resultado.destinos.tolist())]
+    salida = sys.stdout if salida == "-" else \
+             open(salida, "w", newline="", encoding="utf-8")
+    try:
+        escritor = csv.writer(salida)
+        escritor.writerow(["origen", "destino", "cantidad", "costo"])
+        escritor.writerows(
+            (instancia.origenes[i], instancia.destinos[j], cantidad,
+             cantidad * costo)
+            for i, j, cantidad, costo in zip(
+                resultado.origenes.tolist(), resultado.destinos.tolist(),
+                resultado.cantidades.tolist(), costos.costos[rutas].tolist()))
+        escritor.writerow(["", "", "", resultado.costo_total])
+        salida.flush()
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    return 0 if resultado.estado == trans.ESTADO_OPTIMO else 1
+
+def resolver_en_flujo(funcion, problemas, trabajadores=0):
+    """Aplica 'funcion' a cada problema y produce los resultados en orden.
+
+    Con trabajadores > 0 se usa el pool de procesos de metodo_hungaro, con
+    a lo sumo 2 * trabajadores problemas pendientes a la vez.
+    """
+    if trabajadores <= 0:
+        for problema in problemas:
+            yield funcion(problema)
+        return
+    ejecutor = mh.obtener_pool(trabajadores, mh.POOL_PROCESOS)
+    pendientes = collections.deque()
+    for problema in problemas:
+        pendientes.append(ejecutor.submit(funcion, problema))
+        if len(pendientes) >= 2 * trabajadores:
+            yield pendientes.popleft().result()
+    while pendientes:
+        yield pendientes.popleft().result()
+
+def escribir_resultados(resultados, salida, formato, problema):
+    """Escribe los resultados a medida que llegan; devuelve el código de
+    salida (1 si algún problema falló)."""
+    codigo = 0
+    if formato == "csv":
+        escritor = csv.writer(salida)
+        if problema == "asignacion":
+            escritor.writerow(["indice", "id", "fila", "columna", "costo"])
+        else:
+            escritor.writerow(["indice", "id", "origen", "destino",
+                               "cantidad", "costo"])
+    for indice, resultado in enumerate(resultados):
+        if "error" in resultado:
+            codigo = 1
+        if formato == "jsonl":
+            resultado = dict(indice=indice, **resultado)
+            salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            continue
+        if "error" in resultado:
+            print("Problema %d: %s" % (indice, resultado["error"]),
+                  file=sys.stderr)
+            continue
+        identificador = resultado["id"] if resultado["id"] is not None else ""
+        pares = resultado.get("asignaciones", resultado.get("envios"))
+        for par in pares:
+            escritor.writerow([indice, identificador, *par])
+        total = ["", "", resultado["costo"]] if problema == "asignacion" \
+                else ["", "", "", resultado["costo"]]
+        escritor.writerow([indice, identificador, *total])
+    salida.flush()
+    return codigo
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(lote())
     main()
@@ -0,0 +1,239 @@
+# Flujo de costo mínimo en grafos bipartitos dispersos
+# Compartido por metodo_hungaro y transporte
+
+import collections
+import heapq
+
+INFINITO = float("inf")
+
+# Matriz de costos dispersa en formato coordenado (COO): la ruta k va de la
+# fila filas[k] a la columna columnas[k] con costo costos[k], y 'forma' es
+# la tupla (cantidad de filas, cantidad de columnas).  Las rutas que no
+# figuran no existen.
+MatrizDispersa = collections.namedtuple("MatrizDispersa",
+                                        "filas columnas costos forma")
+
+def validar_dispersa(matriz_costos):
+    """Valida una matriz dispersa y la devuelve como MatrizDispersa de listas.
+
+    Acepta una MatrizDispersa (con secuencias o arreglos) o una matriz
+    dispersa de SciPy, en la que sólo los elementos guardados, aun con
+    valor cero, son rutas.
+    Si se produce un error de validación, se lanza una excepción ValueError.
+    """
+    if not isinstance(matriz_costos, MatrizDispersa):
+        coo = matriz_costos.tocoo()
+        matriz_costos = MatrizDispersa(coo.row, coo.col, coo.data, coo.shape)
+    filas = list(map(int, matriz_costos.filas))
+    columnas = list(map(int, matriz_costos.columnas))
+    cant_filas, cant_columnas = map(int, matriz_costos.forma)
+    try:
+        costos = list(map(float, matriz_costos.costos))
+    except (TypeError, ValueError):
+        raise ValueError("Los elementos no son números")
+    if not (len(filas) == len(columnas) == len(costos)):
+        raise ValueError("Las filas, columnas y costos no tienen el mismo"
+                         " tamaño")
+    if cant_filas == 0 or cant_columnas == 0:
+        raise ValueError("La matriz está vacía")
+    if any(not 0 <= i < cant_filas for i in filas) or \
+       any(not 0 <= j < cant_columnas for j in columnas):
+        raise ValueError("Hay rutas fuera de la forma de la matriz")
+    if any(not costo < INFINITO for costo in costos):  # NaN o infinito
+        raise ValueError("Los elementos no son números")
+    if any(costo < 0 for costo in costos):
+        raise ValueError("No puede haber costos negativos")
+    return MatrizDispersa(filas, columnas, costos, (cant_filas, cant_columnas))
+
+def agregar_problema(problemas, descripcion, casos):
+    """Agrega a 'problemas' la descripción con la cantidad de casos y el
+    primero de ellos, si hay alguno (para los verificadores de
+    certificados)."""
+    if len(casos):
+        caso = casos[0]
+        if hasattr(caso, "item"):
+            caso = caso.item()
+        problemas.append("%s: %d, p. ej. %r" % (descripcion, len(casos),
+                                                 caso))
+
+def ordenar_por(claves, cantidad):
+    """Ordenamiento por conteo de las posiciones de 'claves'.
+
+    Devuelve la tupla (inicio, orden): las posiciones k con claves[k] == c
+    son orden[inicio[c]:inicio[c + 1]], como en el formato CSR.
+    """
+    inicio = [0] * (cantidad + 1)
+    for clave in claves:
+        inicio[clave + 1] += 1
+    for c in range(cantidad):
+        inicio[c + 1] += inicio[c]
+    posicion = inicio[:-1]
+    orden = [0] * len(claves)
+    for k, clave in enumerate(claves):
+        orden[posicion[clave]] = k
+        posicion[clave] += 1
+    return inicio, orden
+
+def flujo_costo_minimo(cantidades, capacidades, inicio, destinos, costos):
+    """Flujo de costo mínimo entre fuentes y sumideros por caminos mínimos.
+
+    Cada fuente s debe enviar exactamente cantidades[s] y cada sumidero t
+    puede recibir a lo sumo capacidades[t].  Las aristas permitidas se dan
+    en formato CSR por fuente: las de la fuente s son las posiciones
+    inicio[s] a inicio[s + 1] - 1 de 'destinos' (sumideros) y 'costos'.
+    Las aristas no tienen límite de capacidad; las rutas que no figuran
+    están prohibidas.
+
+    Luego de una asignación inicial por las aristas más baratas de cada
+    fuente, se usan caminos de aumento más cortos (Dijkstra con
+    potenciales), por lo que cada aumento cuesta a lo sumo
+    O(aristas · log nodos) y no depende del tamaño de la matriz completa.
+
+    Devuelve la tupla (flujo, duales_fuentes, duales_sumideros): el flujo
+    de cada arista, en el mismo orden que 'destinos', y los precios duales
+    de las restricciones de las fuentes (igualdad) y de los sumideros
+    (capacidad, <= 0 y nulos si sobra capacidad), que cumplen
+    duales_fuentes[s] + duales_sumideros[t] <= costo, con igualdad en las
+    aristas con flujo.
+    Si no se pueden enviar todas las cantidades, se lanza ValueError.
+    """
+    cant_fuentes = len(cantidades)
+    cant_sumideros = len(capacidades)
+    destinos = list(destinos)
+    costos = list(costos)
+    cant_aristas = len(destinos)
+    flujo = [0] * cant_aristas
+    excedente = list(cantidades)
+    restante = list(capacidades)
+
+    # Aristas que llegan a cada sumidero, para recorrer las inversas
+    origen_arista = [0] * cant_aristas
+    entrantes = [[] for t in range(cant_sumideros)]
+    for s in range(cant_fuentes):
+        for a in range(inicio[s], inicio[s + 1]):
+            origen_arista[a] = s
+            entrantes[destinos[a]].append(a)
+
+    # Potenciales iniciales factibles (reducción por fuentes): menos el
+    # menor costo saliente en cada fuente y 0 en los sumideros, de modo que
+    # las aristas más baratas quedan ajustadas y se pueden usar directamente
+    # como asignación inicial.  Los sumideros se conectan a un sumidero
+    # final de potencial fijo 0, que nunca se actualiza porque es el último
+    # nodo de cada búsqueda
+    potencial_fuente = [0] * cant_fuentes
+    potencial_sumidero = [0] * cant_sumideros
+    for s in range(cant_fuentes):
+        if inicio[s] == inicio[s + 1]:
+            continue
+        minimo = min(costos[inicio[s]:inicio[s + 1]])
+        potencial_fuente[s] = -minimo
+        for a in range(inicio[s], inicio[s + 1]):
+            if excedente[s] == 0:
+                break
+            t = destinos[a]
+            if costos[a] == minimo and restante[t] > 0:
+                cantidad = min(excedente[s], restante[t])
+                flujo[a] += cantidad
+                excedente[s] -= cantidad
+                restante[t] -= cantidad
+
+    for raiz in range(cant_fuentes):
+        while excedente[raiz] > 0:
+            cantidad = _aumentar(raiz, inicio, destinos, costos, flujo,
+                                 excedente, restante, origen_arista,
+                                 entrantes, potencial_fuente,
+                                 potencial_sumidero)
+            if cantidad == 0:
+                raise ValueError("No existe un flujo factible con las rutas"
+                                 " dadas")
+
+    duales_fuentes = [-p for p in potencial_fuente]
+    duales_sumideros = [min(0, p) for p in potencial_sumidero]
+    return flujo, duales_fuentes, duales_sumideros
+
+def _aumentar(raiz, inicio, destinos, costos, flujo, excedente, restante,
+              origen_arista, entrantes, potencial_fuente, potencial_sumidero):
+    # Dijkstra desde la fuente 'raiz' hasta el sumidero final, pasando por
+    # un sumidero con capacidad restante; los nodos de la cola se codifican
+    # como s (fuentes) y cant_fuentes + t (sumideros).  Aumenta el flujo
+    # por el camino hallado y devuelve la cantidad enviada (0 si no hay)
+    cant_fuentes = len(potencial_fuente)
+    distancia_fuente = {raiz: 0}
+    distancia_sumidero = {}
+    arista_previa = {}
+    sumidero_previo_de = {raiz: -1}
+    cola = [(0, raiz)]
+    # Un nodo fijado no se vuelve a actualizar: con costos reales, el
+    # redondeo puede dar costos reducidos apenas negativos y el camino
+    # guardado formaría un ciclo
+    fijados_fuentes = set()
+    fijados_sumideros = set()
+    distancia_final = INFINITO
+    ultimo = -1
+    while cola:
+        d, nodo = heapq.heappop(cola)
+        if d >= distancia_final:
+            break
+        if nodo < cant_fuentes:
+            s = nodo
+            if d > distancia_fuente[s]:
+                continue
+            fijados_fuentes.add(s)
+            base = d + potencial_fuente[s]
+            for a in range(inicio[s], inicio[s + 1]):
+                t = destinos[a]
+                nueva = base + costos[a] - potencial_sumidero[t]
+                if (nueva < distancia_sumidero.get(t, INFINITO)
+                        and t not in fijados_sumideros):
+                    distancia_sumidero[t] = nueva
+                    arista_previa[t] = a
+                    heapq.heappush(cola, (nueva, cant_fuentes + t))
+        else:
+            t = nodo - cant_fuentes
+            if d > distancia_sumidero[t]:
+                continue
+            fijados_sumideros.add(t)
+            base = d + potencial_sumidero[t]
+            if restante[t] > 0 and base < distancia_final:
+                distancia_final = base
+                ultimo = t
+            for a in entrantes[t]:
+                if flujo[a] > 0:
+                    s = origen_arista[a]
+                    nueva = base - costos[a] - potencial_fuente[s]
+                    if (nueva < distancia_fuente.get(s, INFINITO)
+                            and s not in fijados_fuentes):
+                        distancia_fuente[s] = nueva
+                        sumidero_previo_de[s] = a
+                        heapq.heappush(cola, (nueva, s))
+    if ultimo == -1:
+        return 0
+
+    # Actualización de potenciales de los nodos fijados
+    for s in fijados_fuentes:
+        potencial_fuente[s] += distancia_fuente[s] - distancia_final
+    for t in fijados_sumideros:
+        potencial_sumidero[t] += distancia_sumidero[t] - distancia_final
+
+    # Camino desde el último sumidero hasta la raíz
+    camino = []
+    t = ultimo
+    cantidad = min(restante[t], excedente[raiz])
+    while True:
+        a = arista_previa[t]
+        camino.append(a)
+        a = sumidero_previo_de[origen_arista[a]]
+        if a == -1:
+            break
+        camino.append(a)
+        if flujo[a] < cantidad:
+            cantidad = flujo[a]
+        t = destinos[a]
+    for k, a in enumerate(camino):
+        if k % 2 == 0:
+            flujo[a] += cantidad
+        else:
+            flujo[a] -= cantidad
+    restante[ultimo] -= cantidad
+    excedente[raiz] -= cantidad
+    return cantidad
@@ -0,0 +1,219 @@
+# Memoización de resultados de asignación y transporte
+#
+# Un servicio que recibe muchas veces la misma matriz puede resolverla una
+# sola vez: CacheResultados guarda los resultados indexados por una huella
+# del contenido de los datos.
+
+import array
+import collections
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+import flujo
+import metodo_hungaro as mh
+
+def huella_matriz(matriz_costos, disponibilidad_uniforme=True):
+    """Resumen (BLAKE2b, en hexadecimal) del contenido de una matriz.
+
+    La matriz se valida y se convierte como en hungaro, por lo que los
+    errores de validación lanzan ValueError.  Se resume la matriz ya
+    procesada: dos listas con los mismos números (aunque unos sean textos o
+    enteros y otros reales) tienen la misma huella.  Los arreglos se
+    recorren por bloques de filas, sin copiarlos completos, y su huella
+    incluye el tipo de dato; las listas, los arreglos y las matrices
+    dispersas nunca comparten huella, ya que los métodos pueden resolver
+    los empates de forma distinta para cada representación.
+    """
+    resumen = hashlib.blake2b(digest_size=20)
+    if mh.es_dispersa(matriz_costos):
+        dispersa = flujo.validar_dispersa(matriz_costos)
+        resumen.update(b"dispersa %r " % (dispersa.forma,))
+        resumen.update(array.array("q", dispersa.filas).tobytes())
+        resumen.update(array.array("q", dispersa.columnas).tobytes())
+        resumen.update(array.array("d", dispersa.costos).tobytes())
+    elif mh.es_arreglo(matriz_costos):
+        arreglo = mh.convertir_arreglo(matriz_costos, disponibilidad_uniforme)
+        resumen.update(b"arreglo %s %r " % (arreglo.dtype.str.encode(),
+                                             arreglo.shape))
+        for bloque in mh.bloques_filas(arreglo):
+            resumen.update(bloque.tobytes())
+    else:
+        mh.validar_matriz(matriz_costos, disponibilidad_uniforme)
+        procesada = mh.procesar_matriz(matriz_costos, True,
+                                       disponibilidad_uniforme)
+        resumen.update(b"lista %d " % len(procesada))
+        for fila in procesada:
+            resumen.update(array.array("d", fila).tobytes())
+    return resumen.hexdigest()
+
+class CacheResultados:
+    """Caché LRU de resultados de hungaro y de los solvers de transporte.
+
+    La clave de cada resultado combina la huella de los datos (ver
+    huella_matriz) con los parámetros que influyen en él; los que no lo
+    hacen, como 'estadisticas', sólo se usan cuando hay que resolver.
+
+    Se conservan a lo sumo 'max_entradas' resultados y, si se indica,
+    'max_bytes' bytes (según el tamaño del resultado serializado con
+    pickle); al superarse, se descartan los usados hace más tiempo.  Si se
+    da 'directorio', cada resultado nuevo también se escribe allí y los que
+    no están en memoria se buscan en él antes de resolver, de modo que
+    sobreviven entre ejecuciones; el directorio no tiene límite de tamaño
+    y se puede vaciar con limpiar(disco=True).
+
+    Los resultados guardados se devuelven tal cual, así que no deben
+    modificarse.  Se puede usar desde varios hilos.
+    """
+
+    def __init__(self, max_entradas=256, max_bytes=None, directorio=None):
+        if max_entradas is not None and max_entradas < 1:
+            raise ValueError("El caché debe admitir al menos una entrada")
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.directorio = directorio
+        if directorio is not None:
+            os.makedirs(directorio, exist_ok=True)
+        self._entradas = collections.OrderedDict()  # clave -> (valor, bytes)
+        self._bytes = 0
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def hungaro(self, matriz_costos, minimizar=True,
+                disponibilidad_uniforme=True, metodo=mh.METODO_MARCADO,
+                asignacion_inicial=mh.ASIGNACION_VORAZ, estadisticas=None,
+                salida=mh.SALIDA_PARES, costo_maximo=None, tolerancia=None,
+                duales=False, numerico=mh.NUMERICO_AUTOMATICO, epsilon=None):
+        """Versión de mh.hungaro que reutiliza los resultados guardados.
+
+        Acepta los mismos argumentos salvo 'funcion_pasos', ya que los
+        resultados guardados no pasan por los pasos del método.  Con
+        SALIDA_PARES sin duales se devuelve una copia de la lista; los
+        demás resultados se devuelven tal cual.
+        """
+        clave = ("asignacion", huella_matriz(matriz_costos,
+                                             disponibilidad_uniforme),
+                 bool(minimizar), bool(disponibilidad_uniforme), metodo,
+                 asignacion_inicial, salida, costo_maximo, tolerancia,
+                 bool(duales), numerico, epsilon)
+        resultado = self.obtener(clave)
+        if resultado is None:
+            resultado = mh.hungaro(matriz_costos, minimizar,
+                                   disponibilidad_uniforme=
+                                   disponibilidad_uniforme, metodo=metodo,
+                                   asignacion_inicial=asignacion_inicial,
+                                   estadisticas=estadisticas, salida=salida,
+                                   costo_maximo=costo_maximo,
+                                   tolerancia=tolerancia, duales=duales,
+                                   numerico=numerico, epsilon=epsilon)
+            self.guardar(clave, resultado)
+        if isinstance(resultado, list):
+            return list(resultado)
+        return resultado
+
+    def transporte(self, oferta, demanda, costos, duales=False,
+                   metodo="vogel"):
+        """Resuelve con transporte_vogel (metodo "vogel") o transporte_cbc
+        (metodo "cbc"), reutilizando los resultados guardados.
+
+        La clave incluye la oferta y la demanda además de la huella de los
+        costos; los 'tiempos' del resultado son los de la resolución
+        original.
+        """
+        import numpy as np
+        import transporte as trans
+
+        if metodo not in ("vogel", "cbc"):
+            raise ValueError("Método desconocido: %r" % (metodo,))
+        if not mh.es_dispersa(costos):
+            costos = np.asarray(costos, dtype=np.float64)
+        resumen = hashlib.blake2b(digest_size=20)
+        resumen.update(np.asarray(oferta, dtype=np.float64).tobytes())
+        resumen.update(b"|")
+        resumen.update(np.asarray(demanda, dtype=np.float64).tobytes())
+        clave = ("transporte", huella_matriz(costos, False),
+                 resumen.hexdigest(), bool(duales), metodo)
+        resultado = self.obtener(clave)
+        if resultado is None:
+            solver = trans.transporte_cbc if metodo == "cbc" \
+                     else trans.transporte_vogel
+            resultado = solver(oferta, demanda, costos, duales)
+            self.guardar(clave, resultado)
+        return resultado
+
+    def obtener(self, clave):
+        """Devuelve el valor guardado con 'clave', o None si no está."""
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave][0]
+        if self.directorio is not None:
+            try:
+                with open(self._archivo(clave), "rb") as archivo:
+                    datos = archivo.read()
+            except FileNotFoundError:
+                pass
+            else:
+                with self._candado:
+                    self.aciertos_disco += 1
+                valor = pickle.loads(datos)
+                self._guardar_en_memoria(clave, valor, len(datos))
+                return valor
+        with self._candado:
+            self.fallos += 1
+        return None
+
+    def guardar(self, clave, valor):
+        """Guarda 'valor' con 'clave', en memoria y en el directorio."""
+        datos = pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+        self._guardar_en_memoria(clave, valor, len(datos))
+        if self.directorio is not None:
+            # Se escribe en un temporal y se renombra, para que otro proceso
+            # nunca lea un archivo a medio escribir
+            descriptor, temporal = tempfile.mkstemp(dir=self.directorio,
+                                                    suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(datos)
+            os.replace(temporal, self._archivo(clave))
+
+    def limpiar(self, disco=False):
+        """Vacía el caché en memoria y, si 'disco' es True, el directorio."""
+        with self._candado:
+            self._entradas.clear()
+            self._bytes = 0
+        if disco and self.directorio is not None:
+            for nombre in os.listdir(self.directorio):
+                if nombre.endswith(".pickle"):
+                    os.remove(os.path.join(self.directorio, nombre))
+
+    def estadisticas(self):
+        with self._candado:
+            return {"entradas": len(self._entradas), "bytes": self._bytes,
+                    "aciertos": self.aciertos,
+                    "aciertos_disco": self.aciertos_disco,
+                    "fallos": self.fallos, "desalojos": self.desalojos}
+
+    def _guardar_en_memoria(self, clave, valor, tamano):
+        with self._candado:
+            if clave in self._entradas:
+                self._bytes -= self._entradas.pop(clave)[1]
+            self._entradas[clave] = (valor, tamano)
+            self._bytes += tamano
+            while self._entradas and (
+                    (self.max_entradas is not None
+                     and len(self._entradas) > self.max_entradas)
+                    or (self.max_bytes is not None
+                        and self._bytes > self.max_bytes)):
+                self._bytes -= self._entradas.popitem(last=False)[1][1]
+                self.desalojos += 1
+
+    def _archivo(self, clave):
+        nombre = hashlib.blake2b(repr(clave).encode(),
+                                 digest_size=20).hexdigest()
+        return os.path.join(self.directorio, nombre + ".pickle")
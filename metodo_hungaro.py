@@ -1,8 +1,39 @@
 # Método húngaro
 # Autor: Andrés Gallegos y Santiago Pinto                Fecha: 2024-07-17
 
+import array
+import atexit
+import bisect
+import collections
+import concurrent.futures
+import heapq
+import itertools
+import operator
+import os
+import threading
+from time import perf_counter
+
+import flujo
+from flujo import MatrizDispersa
+
 INFINITO = float("inf")
 
+# Pasos de METODO_MARCADO en los que se llama a 'funcion_pasos' de hungaro.
+# La función recibe, en orden, la matriz de costos, la matriz de ceros
+# marcados, el vector de filas marcadas, el de columnas marcadas, las
+# asignaciones y el código de paso; según el paso, algunos argumentos son
+# None.  Recibe los objetos originales, que no debe modificar.  Si devuelve
+# True desde PASO_ASIGNACION_INICIAL en adelante, hungaro se detiene y
+# devuelve las asignaciones tal cual.
+# PASO_PROCESAR: luego de validar, copiar y procesar la matriz; sólo se da
+#     la matriz de costos.
+# PASO_REDUCCION_FILAS y PASO_REDUCCION_COLUMNAS: luego de restar el menor
+#     costo de cada fila o columna.
+# PASO_ASIGNACION_INICIAL: luego de la asignación inicial, que puede ser la
+#     final (entonces no hay más pasos); desde aquí se dan las asignaciones.
+# PASO_INICIO_MARCADO y PASO_FIN_MARCADO: antes y después de cada pasada de
+#     marcado, con todos los argumentos; pueden no ocurrir nunca.
+# PASO_ASIGNACION_FINAL: con la asignación final.
 PASO_PROCESAR = 1
 PASO_REDUCCION_FILAS = 2
 PASO_REDUCCION_COLUMNAS = 3
@@ -11,71 +42,231 @@ PASO_INICIO_MARCADO = 5
 PASO_FIN_MARCADO = 6
 PASO_ASIGNACION_FINAL = 7
 
+METODO_MARCADO = "marcado"
+METODO_CAMINOS = "caminos"
+METODO_SUBASTA = "subasta"
+
+NUMERICO_AUTOMATICO = "automatico"
+NUMERICO_ENTERO = "entero"
+NUMERICO_REAL = "real"
+# Cifras decimales que el modo entero puede llevar a enteros escalando
+DECIMALES_MAXIMOS = 6
+
+# Divisor de epsilon entre fases del método de subasta
+FACTOR_EPSILON = 6
+
+ASIGNACION_VORAZ = "voraz"
+ASIGNACION_MAXIMA = "maxima"
+
+SALIDA_PARES = "pares"
+SALIDA_PERMUTACION = "permutacion"
+
+POOL_PROCESOS = "procesos"
+POOL_HILOS = "hilos"
+
+_pools = {}
+_candado_pools = threading.Lock()
+
 def hungaro(matriz_costos, minimizar=True, funcion_pasos=None,
-            disponibilidad_uniforme=True):
+            disponibilidad_uniforme=True, metodo=METODO_MARCADO,
+            asignacion_inicial=ASIGNACION_VORAZ, estadisticas=None,
+            salida=SALIDA_PARES, costo_maximo=None, tolerancia=None,
+            duales=False, numerico=NUMERICO_AUTOMATICO, epsilon=None):
     """Calcula la asignación óptima con el método húngaro.
 
     La función acepta matrices de costo cuadradas y rectangulares; en el último
-    caso, completa las filas o columnas faltantes con ceros.
-
-    'funcion_pasos' es una función que debe tener estos parámetros
-    en orden: matriz de costos, matriz de ceros marcados,
-    vector de filas marcadas, vector de columnas marcadas,
-    asignaciones, código de paso.
-    El código de paso corresponde a las constantes PASO_* definidas
-    en el módulo.
-
-    PASO_PROCESAR ocurre luego de validar, copiar y procesar la matriz de costos.
-        Sólo la matriz de costos no es None
-    PASO_REDUCCION_FILAS ocurre luego de restar los menores de cada fila a sus
-        filas respectivas.
-    PASO_REDUCCION_COLUMNAS ocurre de manera similar que el anterior, pero con
-        columnas.
-    PASO_ASIGNACION_INICIAL ocurre luego de la búsqueda de la asignación
-        inicial, que podría coincidir con la final si satisface las condiciones;
-        en este caso, no ocurriría ningún paso siguiente.
-        Desde este paso se da el argumento de asignaciones.
-    PASO_INICIO_MARCADO ocurre varias veces, antes del subalgoritmo de marcado
-        que busca la posibilidad de realizar una reasignación, y luego de
-        la primera iteración coincide luego de la ejecución de los pasos
-        restantes excepto el final.
-        Desde este paso se dan todos los argumentos.
-    PASO_FIN_MARCADO ocurre varias veces, luego del marcado y antes de la
-        ejecución condicional entre la reasignación y el aligeramiento
-        de condiciones óptimas.
-    Estos pasos de marcado pueden nunca ocurrir.
-    PASO_ASIGNACION_FINAL ocurre luego de obtener la asignación final.
-
-    La función será llamada en cada paso indicado con los argumentos
-    correspondientes; dependiendo del paso, algunos pueden ser nulos.
-    La función recibe los objetos originales, por lo que no debe modificarlos;
-    de lo contrario el programa podría entrar en un estado indefinido.
-    Si la función devuelve True a partir de la asignacion inicial, se detiene
-    el programa y se devuelve las asignaciones 'tal cual'.
-    Si el argumento es None, no se realiza ninguna llamada.
-    Se puede utilizar una función predefinida que muestra información
-    en la salida estándar pasando True como argumento.
+    caso, completa las filas o columnas faltantes con ceros.  La matriz puede
+    ser una lista de listas, un arreglo de NumPy o cualquier objeto que lo
+    exponga, p. ej. un DataFrame (ver convertir_arreglo; cargar_matriz abre
+    como arreglo mapeado una matriz que no cabe en memoria), o una matriz
+    dispersa con sólo las rutas existentes (ver asignacion_dispersa).  Los
+    costos infinitos representan rutas inexistentes: si no hay una
+    asignación que las evite, se lanza ValueError.
 
     'disponibilidad_uniforme' indica si todas las filas de la matriz deberían
     tener el mismo tamaño (relevante para una lista de listas).  Si es True
     y la matriz no cumple las restricciones, se genera una excepción.
-    Si es False, los datos faltantes se rellenan con infinito positivo.
+    Si es False, los datos faltantes y las celdas NaN de los arreglos se
+    rellenan con infinito positivo.
+
+    'metodo' selecciona el motor de resolución: METODO_MARCADO (reducción y
+    marcado de líneas, ver _marcado), METODO_CAMINOS (caminos de aumento más
+    cortos, ver caminos_minimos) o METODO_SUBASTA (ver subasta).  Todos
+    devuelven la misma lista ordenada de pares (fila, columna), aunque ante
+    empates pueden elegir asignaciones distintas de igual costo.
+    Sólo METODO_MARCADO admite 'funcion_pasos', que se llama en cada paso
+    del método (ver las constantes PASO_*; True usa mostrar_pasos), y
+    'asignacion_inicial' (ver asignar).  Sólo METODO_SUBASTA admite
+    'tolerancia', el error aceptado en el costo total.
+
+    'estadisticas' es un objeto Estadisticas que acumula contadores y
+    tiempos por fase de la resolución; si es None, no se mide nada.
+
+    'salida' elige la forma del resultado: SALIDA_PARES devuelve la lista
+    de pares (fila, columna), ordenada por fila, y SALIDA_PERMUTACION el
+    vector con la columna asignada a cada fila (-1 si queda sin asignar),
+    que es el estado interno del método, sin copias (ver pares_asignados).
+
+    'costo_maximo' es un tope por ruta: las celdas con costo mayor se
+    tratan como rutas inexistentes.  El tope se compara con los costos
+    originales, también al maximizar; con el valor de
+    asignacion_cuello_botella se obtiene, entre las asignaciones de menor
+    costo máximo, la de menor costo total.
+
+    Si 'duales' es True, se devuelve la tupla (resultado, u, v) con
+    potenciales duales que certifican la optimalidad (ver
+    verificar_asignacion).  No se admite con METODO_SUBASTA, cuyos precios
+    sólo son óptimos a menos de epsilon.
+
+    'numerico' (NUMERICO_AUTOMATICO, NUMERICO_ENTERO o NUMERICO_REAL) elige
+    la aritmética de las matrices densas, y 'epsilon' la tolerancia de los
+    ceros en el modo real (ver convertir_numerico).  Con 'funcion_pasos', el
+    modo automático usa el real, para mostrar los costos originales.
 
     Si se produce un error de validación, se lanza una excepción ValueError.
     """
+    if salida not in (SALIDA_PARES, SALIDA_PERMUTACION):
+        raise ValueError("Salida desconocida: %r" % (salida,))
+    if duales and metodo == METODO_SUBASTA and not es_dispersa(matriz_costos):
+        raise ValueError("El método de subasta no da duales exactos")
+    if estadisticas is None:
+        columna_de_fila, u, v = _hungaro(matriz_costos, minimizar,
+                                         funcion_pasos,
+                                         disponibilidad_uniforme, metodo,
+                                         asignacion_inicial, costo_maximo,
+                                         tolerancia, numerico, epsilon, None)
+    else:
+        medicion = estadisticas.iniciar()
+        columna_de_fila, u, v = _hungaro(matriz_costos, minimizar,
+                                         funcion_pasos,
+                                         disponibilidad_uniforme, metodo,
+                                         asignacion_inicial, costo_maximo,
+                                         tolerancia, numerico, epsilon,
+                                         medicion)
+        estadisticas.registrar(medicion.terminar())
+    resultado = columna_de_fila
+    if salida == SALIDA_PARES:
+        resultado = pares_asignados(columna_de_fila)
+    if not duales:
+        return resultado
+    if not minimizar:
+        u, v = duales_maximizacion(matriz_costos, columna_de_fila, u, v)
+    return resultado, u, v
+
+def _hungaro(matriz_costos, minimizar, funcion_pasos, disponibilidad_uniforme,
+             metodo, asignacion_inicial, costo_maximo, tolerancia, numerico,
+             epsilon, medicion):
+    # Devuelve la tupla (columna_de_fila, u, v) con los potenciales de la
+    # matriz procesada, en su escala original (None con METODO_SUBASTA)
+    if metodo not in (METODO_MARCADO, METODO_CAMINOS, METODO_SUBASTA):
+        raise ValueError("Método desconocido: %r" % (metodo,))
+    if tolerancia is not None and (metodo != METODO_SUBASTA
+                                   or not tolerancia >= 0):
+        raise ValueError("La tolerancia debe ser un número no negativo y"
+                         " sólo la admite el método de subasta")
+    if asignacion_inicial not in (ASIGNACION_VORAZ, ASIGNACION_MAXIMA):
+        raise ValueError("Asignación inicial desconocida: %r"
+                         % (asignacion_inicial,))
+    validar_numerico(numerico, epsilon)
     if funcion_pasos is True:
         funcion_pasos = mostrar_pasos
+    if funcion_pasos is not None and (metodo != METODO_MARCADO
+                                      or es_dispersa(matriz_costos)):
+        raise ValueError("Sólo el método de marcado admite funcion_pasos")
 
-    validar_matriz(matriz_costos, disponibilidad_uniforme)
-    matriz_costos = procesar_matriz(matriz_costos, minimizar,
-                                    disponibilidad_uniforme)
+    if es_dispersa(matriz_costos):
+        resultado = _asignacion_dispersa(matriz_costos, minimizar,
+                                         costo_maximo)
+        if medicion is not None:
+            medicion.metricas["metodo"] = "disperso"
+            medicion.fase("flujo")
+        return resultado
+
+    if es_arreglo(matriz_costos):
+        matriz_costos = convertir_arreglo(matriz_costos,
+                                          disponibilidad_uniforme)
+        matriz_costos = procesar_arreglo(matriz_costos, minimizar,
+                                         costo_maximo)
+    else:
+        validar_matriz(matriz_costos, disponibilidad_uniforme)
+        matriz_costos = procesar_matriz(matriz_costos, minimizar,
+                                        disponibilidad_uniforme, costo_maximo)
+    if funcion_pasos is not None and numerico == NUMERICO_AUTOMATICO:
+        numerico = NUMERICO_REAL
+    matriz_costos, escala, epsilon, numerico = convertir_numerico(
+        matriz_costos, numerico, epsilon)
+    arreglo = None
+    if metodo == METODO_MARCADO and es_arreglo(matriz_costos):
+        arreglo = matriz_costos
+        matriz_costos = filas_compactas(arreglo)
+    if medicion is not None:
+        medicion.metricas["metodo"] = metodo
+        medicion.metricas["orden"] = len(matriz_costos)
+        medicion.metricas["numerico"] = numerico
+        medicion.fase("procesar")
+    if metodo == METODO_SUBASTA:
+        import numpy as np
+        if tolerancia is not None:
+            tolerancia *= escala
+        return subasta(np.asarray(matriz_costos, dtype=np.float64)
+                       if isinstance(matriz_costos, list) else matriz_costos,
+                       tolerancia, medicion), None, None
+    if metodo == METODO_CAMINOS:
+        columna_de_fila, u, v = caminos_minimos(matriz_costos, medicion)
+    else:
+        try:
+            columna_de_fila, u, v = _marcado(matriz_costos, funcion_pasos,
+                                             asignacion_inicial, epsilon,
+                                             medicion)
+        except OverflowError:
+            if arreglo is None:
+                raise
+            # Un costo reducido no entra en el tipo del arreglo: se repite
+            # con filas de 8 bytes
+            matriz_costos = filas_compactas(arreglo, ancho=True)
+            columna_de_fila, u, v = _marcado(matriz_costos, funcion_pasos,
+                                             asignacion_inicial, epsilon,
+                                             medicion)
+    if escala != 1:
+        if isinstance(u, list):
+            u = [potencial / escala for potencial in u]
+            v = [potencial / escala for potencial in v]
+        else:
+            u = u / escala
+            v = v / escala
+    return columna_de_fila, u, v
+
+def _marcado(matriz_costos, funcion_pasos, asignacion_inicial, epsilon,
+             medicion):
+    """Método clásico de reducción y marcado de líneas (METODO_MARCADO).
+
+    Recibe la matriz cuadrada ya procesada, que modifica: se reducen filas
+    y columnas, se asignan los ceros con asignar (ASIGNACION_VORAZ asigna
+    primero las filas con menos ceros; ASIGNACION_MAXIMA además completa
+    esa asignación por caminos alternantes, lo que evita reasignaciones
+    cuando hay muchos ceros) y se alternan marcado, reasignación y ajuste
+    de los costos hasta asignar todas las filas.  Es el único motor que
+    llama a 'funcion_pasos' (ver las constantes PASO_*).  Los costos
+    reducidos de valor absoluto a lo sumo 'epsilon' cuentan como ceros.
+
+    Devuelve la tupla (columna_de_fila, u, v), con los potenciales que
+    mantienen la matriz reducida igual a costo - u[i] - v[j].
+    """
     if funcion_pasos is not None:
         argumentos_pasos = [matriz_costos, None, None, None, None]
         funcion_pasos(*argumentos_pasos, PASO_PROCESAR)
     orden = len(matriz_costos)
+    if (any(min(fila) == INFINITO for fila in matriz_costos)
+            or any(min(columna) == INFINITO
+                   for columna in zip(*matriz_costos))):
+        raise ValueError("No existe una asignación de costo finito")
 
-    for fila in matriz_costos:
+    # Potenciales: la matriz reducida es siempre costo - u[i] - v[j]
+    u = [0] * orden
+    v = [0] * orden
+    for k, fila in enumerate(matriz_costos):
         minimo = min(fila)
+        u[k] = minimo
         for i, costo in enumerate(fila):
             fila[i] = costo - minimo
     if funcion_pasos is not None:
@@ -83,34 +274,54 @@ def hungaro(matriz_costos, minimizar=True, funcion_pasos=None,
 
     for j in range(orden):
         minimo = min(matriz_costos[i][j] for i in range(orden))
+        v[j] = minimo
         for i in range(orden):
             matriz_costos[i][j] = matriz_costos[i][j] - minimo
     if funcion_pasos is not None:
         funcion_pasos(*argumentos_pasos, PASO_REDUCCION_COLUMNAS)
+    if medicion is not None:
+        medicion.fase("reduccion")
 
     columnas_marcadas = [False] * orden
-    asignaciones = asignar(matriz_costos, columnas_marcadas)
+    columna_de_fila = _asignar(matriz_costos, columnas_marcadas,
+                               asignacion_inicial == ASIGNACION_MAXIMA,
+                               epsilon)
+    asignadas = orden - columna_de_fila.count(-1)
+    if medicion is not None:
+        medicion.contar("filas_asignacion_inicial", asignadas)
+        medicion.fase("asignacion_inicial")
     if funcion_pasos is not None:
-        argumentos_pasos[4] = asignaciones
+        argumentos_pasos[4] = pares_asignados(columna_de_fila)
         if funcion_pasos(*argumentos_pasos, PASO_ASIGNACION_INICIAL) == True:
-            return asignaciones
-    if len(asignaciones) == orden:
-        return asignaciones
+            return columna_de_fila, u, v
+    if asignadas == orden:
+        return columna_de_fila, u, v
 
+    # El estado del marcado se guarda por fila y por columna, en O(n): la
+    # columna asignada (*) a cada fila, la fila asignada a cada columna y la
+    # columna del cero candidato (') de cada fila, que es a lo sumo uno
+    fila_de_columna = [-1] * orden
+    for i, j in enumerate(columna_de_fila):
+        if j != -1:
+            fila_de_columna[j] = i
+    prima_de_fila = [-1] * orden
     filas_marcadas = [False] * orden
-    matriz_ceros = [[0] * orden for i in range(orden)]
-    for i, j in asignaciones:
-        matriz_ceros[i][j] = 1  # Ceros asignados (*)
     falta_reasignar = False
+    # Filas a recorrer en la próxima pasada; las recorridas sin ceros
+    # descubiertos quedan en 'revisadas', con su mínimo entre las columnas
+    # sin marcar, hasta la próxima reasignación
+    pendientes = range(orden)
+    revisadas = []
+    minimo_de_fila = {}
     if funcion_pasos is not None:
-        argumentos_pasos[1:4] = [matriz_ceros, filas_marcadas, columnas_marcadas]
-    while len(asignaciones) < orden:
+        argumentos_pasos[1:4] = [None, filas_marcadas, columnas_marcadas]
+    while asignadas < orden:
         if funcion_pasos is not None:
+            argumentos_pasos[1] = matriz_marcas(columna_de_fila, prima_de_fila)
             if funcion_pasos(*argumentos_pasos, PASO_INICIO_MARCADO) == True:
-                return sorted(asignaciones)
+                return columna_de_fila, u, v
 
-        minimo = INFINITO
-        for i in range(orden):
+        for i in pendientes:
             if filas_marcadas[i]:
                 continue
             fila = matriz_costos[i]
@@ -119,49 +330,583 @@ def hungaro(matriz_costos, minimizar=True, funcion_pasos=None,
             for j in range(orden):
                 if not columnas_marcadas[j]:
                     costo = fila[j]
-                    if costo == 0:
+                    if costo <= epsilon:
                         quedan_ceros = True
                         break
                     elif costo < minimo_fila:
                         minimo_fila = costo
             if not quedan_ceros:
-                if minimo_fila < minimo:
-                    minimo = minimo_fila
+                revisadas.append(i)
+                minimo_de_fila[i] = minimo_fila
                 continue
-            matriz_ceros[i][j] = 2  # Ceros candidatos (')
-            try:
-                j = matriz_ceros[i].index(1)
-            except ValueError:
-                falta_reasignar = True
+            # Al marcar una fila se libera su columna: de las filas ya
+            # recorridas basta revisar esa columna, que puede darles un cero
+            ceros = [(i, j)]
+            while ceros:
+                i, j = ceros.pop()
+                if filas_marcadas[i]:
+                    continue
+                prima_de_fila[i] = j
+                j = columna_de_fila[i]
+                if j == -1:
+                    falta_reasignar = True
+                    break
+                filas_marcadas[i] = True
+                columnas_marcadas[j] = False
+                for k in revisadas:
+                    if not filas_marcadas[k]:
+                        costo = matriz_costos[k][j]
+                        if costo <= epsilon:
+                            ceros.append((k, j))
+                        elif costo < minimo_de_fila[k]:
+                            minimo_de_fila[k] = costo
+            if falta_reasignar:
                 break
-            filas_marcadas[i] = True
-            columnas_marcadas[j] = False
+        if medicion is not None:
+            medicion.contar("pasadas_marcado")
+            medicion.fase("marcado")
         if funcion_pasos is not None:
+            argumentos_pasos[1] = matriz_marcas(columna_de_fila, prima_de_fila)
             if funcion_pasos(*argumentos_pasos, PASO_FIN_MARCADO) == True:
-                return sorted(asignaciones)
+                return columna_de_fila, u, v
 
         if falta_reasignar:
-            asignaciones = reasignar(matriz_ceros, (i, j), columnas_marcadas)
+            reasignar(i, columna_de_fila, fila_de_columna, prima_de_fila,
+                      columnas_marcadas)
+            asignadas += 1
             filas_marcadas = [False] * orden
+            pendientes = range(orden)
+            revisadas = []
+            minimo_de_fila = {}
             if funcion_pasos is not None:
                 argumentos_pasos[2] = filas_marcadas
-                argumentos_pasos[4] = asignaciones
+                argumentos_pasos[4] = pares_asignados(columna_de_fila)
             falta_reasignar = False
+            if medicion is not None:
+                medicion.contar("reasignaciones")
+                medicion.fase("reasignacion")
             continue
+        revisadas = [k for k in revisadas if not filas_marcadas[k]]
+        minimo = min((minimo_de_fila[k] for k in revisadas),
+                     default=INFINITO)
+        if minimo == INFINITO:  # Sólo quedan rutas inexistentes sin cubrir
+            raise ValueError("No existe una asignación de costo finito")
+        marcadas = [j for j in range(orden) if columnas_marcadas[j]]
+        libres = [j for j in range(orden) if not columnas_marcadas[j]]
         for i, fila in enumerate(matriz_costos):
             if filas_marcadas[i]:
-                for j in range(orden):
-                    if columnas_marcadas[j]:
-                        fila[j] += minimo
+                for j in marcadas:
+                    fila[j] += minimo
             else:
-                for j in range(orden):
-                    if not columnas_marcadas[j]:
-                        fila[j] -= minimo
+                u[i] += minimo
+                for j in libres:
+                    fila[j] -= minimo
+        for j in marcadas:
+            v[j] -= minimo
+        # Los costos sin cubrir bajan todos en 'minimo': sólo las filas que
+        # lo alcanzaban tienen ceros nuevos, y sólo ésas se recorren de nuevo
+        pendientes = []
+        for k in revisadas:
+            minimo_de_fila[k] -= minimo
+            if minimo_de_fila[k] <= epsilon:
+                pendientes.append(k)
+        if pendientes:
+            revisadas = [k for k in revisadas if minimo_de_fila[k] > epsilon]
+        if medicion is not None:
+            medicion.contar("ajustes_duales")
+            medicion.fase("ajuste_dual")
 
-    asignaciones.sort()
     if funcion_pasos is not None:
+        argumentos_pasos[1] = matriz_marcas(columna_de_fila, prima_de_fila)
+        argumentos_pasos[4] = pares_asignados(columna_de_fila)
         funcion_pasos(*argumentos_pasos, PASO_ASIGNACION_FINAL)
-    return asignaciones
+    return columna_de_fila, u, v
+
+def pares_asignados(columna_de_fila):
+    """Convierte un vector de permutación en la lista de pares (fila,
+    columna), ordenada por fila, omitiendo las filas sin asignar (-1).
+
+    El vector que devuelve hungaro con SALIDA_PERMUTACION es una lista, o
+    un arreglo de NumPy con METODO_SUBASTA o si METODO_CAMINOS recibe un
+    arreglo; tiene filas sin asignar al detenerse desde 'funcion_pasos' o
+    en matrices dispersas rectangulares.
+    """
+    if hasattr(columna_de_fila, "tolist"):
+        columna_de_fila = columna_de_fila.tolist()
+    return [(i, j) for i, j in enumerate(columna_de_fila) if j != -1]
+
+def matriz_marcas(columna_de_fila, prima_de_fila):
+    """Matriz de ceros marcados para funcion_pasos: 1 en los ceros
+    asignados (*), 2 en los candidatos (') y 0 en el resto."""
+    orden = len(columna_de_fila)
+    matriz_ceros = [bytearray(orden) for i in range(orden)]
+    for i, j in enumerate(prima_de_fila):
+        if j != -1:
+            matriz_ceros[i][j] = 2
+    for i, j in enumerate(columna_de_fila):
+        if j != -1:
+            matriz_ceros[i][j] = 1
+    return matriz_ceros
+
+def duales_maximizacion(matriz_costos, columna_de_fila, u, v):
+    """Convierte los potenciales de la matriz procesada al maximizar en
+    potenciales de los costos originales (u[i] + v[j] >= costo).
+
+    La matriz procesada tiene 'maximo - costo', así que basta invertir los
+    signos y sumar 'maximo' a un lado; como 'maximo' no se conserva, los
+    potenciales del lado que se asigna completo (las filas, salvo en
+    matrices dispersas con más filas que columnas) se recalculan con los
+    costos originales de las rutas asignadas.
+    """
+    if hasattr(columna_de_fila, "tolist"):
+        columna_de_fila = columna_de_fila.tolist()
+    costos = _costos_asignados(matriz_costos, columna_de_fila)
+    u_original = [-potencial for potencial in u]
+    v_original = [-potencial for potencial in v]
+    if es_dispersa(matriz_costos) and len(u) > len(v):
+        for i, j in enumerate(columna_de_fila):
+            if j != -1:
+                v_original[j] = costos[i] - u_original[i]
+    else:
+        for i, j in enumerate(columna_de_fila):
+            if j != -1:
+                u_original[i] = costos[i] - v_original[j]
+    if hasattr(u, "tolist"):
+        import numpy as np
+
+        return (np.array(u_original, dtype=np.float64),
+                np.array(v_original, dtype=np.float64))
+    return u_original, v_original
+
+def _costos_asignados(matriz_costos, columna_de_fila):
+    # Costo original de la ruta asignada a cada fila (None si no tiene); las
+    # celdas de relleno cuestan 0 y, entre rutas dispersas repetidas, vale
+    # la más cara, que es la que elige la maximización
+    costos = [None] * len(columna_de_fila)
+    if es_dispersa(matriz_costos):
+        dispersa = flujo.validar_dispersa(matriz_costos)
+        for i, j, costo in zip(dispersa.filas, dispersa.columnas,
+                               dispersa.costos):
+            if columna_de_fila[i] == j and (costos[i] is None
+                                            or costo > costos[i]):
+                costos[i] = costo
+        return costos
+    if es_arreglo(matriz_costos):
+        import numpy as np
+
+        matriz_costos = np.asarray(matriz_costos)
+    cant_filas = len(matriz_costos)
+    for i, j in enumerate(columna_de_fila):
+        if j == -1:
+            continue
+        if i < cant_filas and j < len(matriz_costos[i]):
+            costos[i] = float(matriz_costos[i][j])
+        else:
+            costos[i] = 0
+    return costos
+
+def verificar_asignacion(matriz_costos, asignaciones, u, v, minimizar=True,
+                         disponibilidad_uniforme=True, costo_maximo=None,
+                         tolerancia=None):
+    """Verifica un certificado de optimalidad de una asignación.
+
+    'asignaciones' es la lista de pares (fila, columna) o el vector de
+    permutación que devuelve hungaro, y 'u', 'v' los potenciales que da con
+    duales=True: en matrices densas, uno por fila y columna de la matriz
+    completada (cuadrada); en dispersas, uno por fila y columna reales.
+    Sin resolver de nuevo, se comprueba:
+    - factibilidad primal: cada fila y columna se asigna a lo sumo una vez
+      por una ruta existente, y se asignan todas las del lado menor (en
+      matrices densas, todas las de la matriz completada);
+    - factibilidad dual: u[i] + v[j] <= costo (>= al maximizar) en cada
+      ruta y, en matrices dispersas rectangulares, potenciales <= 0 (>= 0
+      al maximizar) en el lado mayor;
+    - holgura complementaria: igualdad en las rutas asignadas y potencial
+      nulo en las filas o columnas del lado mayor que quedan libres.
+    Si todo se cumple, la asignación es óptima.  El costo es O(n²) en
+    matrices densas, recorridas por bloques de filas, y O(rutas) en
+    dispersas: una fracción del de resolver, así que se puede verificar
+    cada resolución.
+
+    'minimizar', 'disponibilidad_uniforme' y 'costo_maximo' deben ser los
+    usados al resolver.  'tolerancia' es el error absoluto admitido en cada
+    comparación; por omisión, 1e-9 veces el mayor costo finito (al menos
+    1e-9).
+
+    Devuelve la lista de problemas encontrados, vacía si el certificado es
+    válido.  Si la matriz no es válida, se lanza ValueError.
+    """
+    import numpy as np
+
+    signo = 1 if minimizar else -1
+    dispersa = es_dispersa(matriz_costos)
+    if dispersa:
+        matriz_costos = convertir_dispersa(matriz_costos, True, costo_maximo)
+        cant_filas, cant_columnas = matriz_costos.forma
+        filas = np.array(matriz_costos.filas, dtype=np.int64)
+        columnas = np.array(matriz_costos.columnas, dtype=np.int64)
+        costos = np.array(matriz_costos.costos, dtype=np.float64)
+        escala = np.abs(costos).max(initial=1)
+    else:
+        if es_arreglo(matriz_costos):
+            arreglo = convertir_arreglo(matriz_costos, disponibilidad_uniforme)
+            arreglo = procesar_arreglo(arreglo, True, costo_maximo)
+        else:
+            validar_matriz(matriz_costos, disponibilidad_uniforme)
+            arreglo = np.array(procesar_matriz(matriz_costos, True,
+                                               disponibilidad_uniforme,
+                                               costo_maximo),
+                               dtype=np.float64)
+        cant_filas = cant_columnas = len(arreglo)
+        escala = max(np.abs(bloque, dtype=np.float64).max(
+                         where=np.isfinite(bloque), initial=1)
+                     for bloque in bloques_filas(arreglo))
+    if tolerancia is None:
+        tolerancia = 1e-9 * escala
+    u = signo * np.asarray(u, dtype=np.float64)
+    v = signo * np.asarray(v, dtype=np.float64)
+    if u.shape != (cant_filas,) or v.shape != (cant_columnas,):
+        return ["Los potenciales no tienen el tamaño de la matriz"]
+
+    asignaciones = np.asarray(asignaciones, dtype=np.int64)
+    if asignaciones.ndim == 2 and asignaciones.shape[1] == 2:
+        filas_asignadas, columnas_asignadas = asignaciones.T
+    elif asignaciones.ndim == 1 and (len(asignaciones) == cant_filas
+                                     or len(asignaciones) == 0):
+        filas_asignadas = np.flatnonzero(asignaciones != -1)
+        columnas_asignadas = asignaciones[filas_asignadas]
+    else:
+        raise ValueError("Las asignaciones no son pares ni un vector de"
+                         " permutación")
+    if ((filas_asignadas < 0) | (filas_asignadas >= cant_filas)
+            | (columnas_asignadas < 0)
+            | (columnas_asignadas >= cant_columnas)).any():
+        return ["Hay asignaciones fuera de la matriz"]
+
+    problemas = []
+    veces_fila = np.bincount(filas_asignadas, minlength=cant_filas)
+    veces_columna = np.bincount(columnas_asignadas, minlength=cant_columnas)
+    flujo.agregar_problema(problemas, "Filas asignadas más de una vez",
+                           np.flatnonzero(veces_fila > 1))
+    flujo.agregar_problema(problemas, "Columnas asignadas más de una vez",
+                           np.flatnonzero(veces_columna > 1))
+    if not dispersa or cant_filas <= cant_columnas:
+        flujo.agregar_problema(problemas, "Filas sin asignar",
+                               np.flatnonzero(veces_fila == 0))
+    if not dispersa or cant_columnas <= cant_filas:
+        flujo.agregar_problema(problemas, "Columnas sin asignar",
+                               np.flatnonzero(veces_columna == 0))
+    columna_de_fila = np.full(cant_filas, -1)
+    columna_de_fila[filas_asignadas] = columnas_asignadas
+
+    descripcion = ("Rutas con u + v mayor que el costo" if minimizar
+                   else "Rutas con u + v menor que el costo")
+    if dispersa:
+        reducidos = signo * costos - u[filas] - v[columnas]
+        infactibles = np.flatnonzero(reducidos < -tolerancia)
+        flujo.agregar_problema(problemas, descripcion,
+                               list(zip(filas[infactibles].tolist(),
+                                        columnas[infactibles].tolist())))
+        # Si una ruta asignada está repetida, basta que una cumpla
+        asignada = columna_de_fila[filas] == columnas
+        reducido_asignado = np.full(cant_filas, INFINITO)
+        np.minimum.at(reducido_asignado, filas[asignada], reducidos[asignada])
+        reducido_asignado = reducido_asignado[filas_asignadas]
+        sin_ruta = np.isinf(reducido_asignado)
+        if cant_filas != cant_columnas:
+            mayor, veces = (v, veces_columna) if cant_filas < cant_columnas \
+                           else (u, veces_fila)
+            flujo.agregar_problema(problemas, "Potenciales del lado mayor con"
+                                   " signo incorrecto",
+                                   np.flatnonzero(mayor > tolerancia))
+            flujo.agregar_problema(problemas, "Potenciales no nulos en el lado"
+                                   " mayor sin asignar",
+                                   np.flatnonzero((veces == 0)
+                                                  & (mayor < -tolerancia)))
+    else:
+        cantidad = 0
+        inicio = 0
+        for bloque in bloques_filas(arreglo):
+            reducidos = signo * bloque.astype(np.float64)
+            reducidos -= u[inicio:inicio + len(bloque), None]
+            reducidos -= v
+            infactibles = np.isfinite(reducidos) & (reducidos < -tolerancia)
+            if infactibles.any():
+                if not cantidad:
+                    i, j = np.argwhere(infactibles)[0].tolist()
+                    primera = (i + inicio, j)
+                cantidad += int(infactibles.sum())
+            inicio += len(bloque)
+        if cantidad:
+            problemas.append("%s: %d, p. ej. %r" % (descripcion, cantidad,
+                                                     primera))
+        costos_asignados = arreglo[filas_asignadas, columnas_asignadas]
+        sin_ruta = np.isinf(costos_asignados)
+        reducido_asignado = signo * costos_asignados.astype(np.float64) \
+                            - u[filas_asignadas] - v[columnas_asignadas]
+    holgura = ~sin_ruta & (reducido_asignado > tolerancia)
+    pares = list(zip(filas_asignadas.tolist(), columnas_asignadas.tolist()))
+    flujo.agregar_problema(problemas, "Asignaciones por rutas inexistentes",
+                           [par for par, falta in zip(pares, sin_ruta)
+                            if falta])
+    flujo.agregar_problema(problemas, "Asignaciones con u + v distinto del"
+                           " costo",
+                           [par for par, mala in zip(pares, holgura) if mala])
+    return problemas
+
+def hungaro_lote(matrices, minimizar=True, disponibilidad_uniforme=True,
+                 metodo=METODO_CAMINOS, trabajadores=None,
+                 tipo_pool=POOL_PROCESOS, tamano_grupo=16, ejecutor=None,
+                 estadisticas=None):
+    """Resuelve muchas matrices de costos y devuelve sus asignaciones.
+
+    Devuelve una lista con el resultado de hungaro para cada matriz, en el
+    mismo orden de entrada.  Ver hungaro_flujo para los parámetros (el
+    método por omisión es METODO_CAMINOS, a diferencia de hungaro) y para
+    obtener los resultados a medida que terminan.
+    """
+    resultados = []
+    for indice, asignaciones in hungaro_flujo(
+            matrices, minimizar, disponibilidad_uniforme, metodo,
+            trabajadores, tipo_pool, tamano_grupo, ejecutor, estadisticas):
+        if indice >= len(resultados):
+            resultados.extend([None] * (indice + 1 - len(resultados)))
+        resultados[indice] = asignaciones
+    return resultados
+
+def hungaro_flujo(matrices, minimizar=True, disponibilidad_uniforme=True,
+                  metodo=METODO_CAMINOS, trabajadores=None,
+                  tipo_pool=POOL_PROCESOS, tamano_grupo=16, ejecutor=None,
+                  estadisticas=None):
+    """Resuelve muchas matrices de costos en paralelo, a medida que terminan.
+
+    Es un generador de pares (índice, asignaciones), donde el índice es la
+    posición de la matriz en 'matrices' (cualquier iterable, que se consume
+    de a poco); los pares se producen en el orden en que terminan.
+
+    'minimizar' puede ser un único valor para todas las matrices (bool,
+    numpy.bool_...) o un iterable con exactamente un valor por matriz.
+    'disponibilidad_uniforme' y 'metodo' tienen el mismo significado que en
+    hungaro, pero 'metodo' es por omisión METODO_CAMINOS, cuyo tiempo O(n³)
+    garantizado conviene en los lotes, y no METODO_MARCADO.
+
+    Las matrices se agrupan de a 'tamano_grupo' por tarea, para repartir
+    el costo de comunicación con los trabajadores; si las de un grupo son
+    arreglos de NumPy de igual forma, se envían apilados en un solo arreglo.
+
+    El trabajo se reparte en un pool de 'tipo_pool' (POOL_PROCESOS o
+    POOL_HILOS) con 'trabajadores' trabajadores (por omisión, la cantidad
+    de procesadores).  Los pools se conservan entre llamadas para no pagar
+    su arranque en cada ciclo; cerrar_pools los libera.  Con 0 trabajadores
+    todo se resuelve en el proceso actual.  Alternativamente se puede pasar
+    un 'ejecutor' propio (concurrent.futures.Executor), que no se cierra.
+
+    Si se da 'estadisticas', los trabajadores miden cada resolución y sus
+    métricas se registran en el proceso actual al recibir los resultados.
+
+    Si alguna matriz es inválida, la excepción ValueError correspondiente
+    se propaga al consumir el generador.
+    """
+    if isinstance(minimizar, (str, bytes)):
+        raise ValueError("'minimizar' debe ser un booleano o un iterable de "
+                         "booleanos, no una cadena")
+    try:
+        valores = iter(minimizar)
+    except TypeError:  # Un único valor, también numpy.bool_
+        tareas = zip(matrices, itertools.repeat(minimizar))
+    else:
+        tareas = _emparejar_minimizar(matrices, valores)
+
+    if ejecutor is None and trabajadores == 0:
+        for indice, (matriz, minimizar_matriz) in enumerate(tareas):
+            yield indice, hungaro(matriz, minimizar_matriz,
+                                  disponibilidad_uniforme=
+                                  disponibilidad_uniforme, metodo=metodo,
+                                  estadisticas=estadisticas)
+        return
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+    if ejecutor is None:
+        ejecutor = obtener_pool(trabajadores, tipo_pool)
+
+    # Se mantienen pocas tareas pendientes para no cargar toda la entrada
+    max_pendientes = 2 * trabajadores
+    pendientes = {}
+    inicio = 0
+    while True:
+        grupo = list(itertools.islice(tareas, tamano_grupo))
+        if grupo:
+            grupo_matrices, grupo_minimizar = zip(*grupo)
+            futuro = ejecutor.submit(
+                _resolver_grupo, apilar_matrices(grupo_matrices),
+                grupo_minimizar, disponibilidad_uniforme, metodo,
+                estadisticas is not None)
+            pendientes[futuro] = inicio
+            inicio += len(grupo)
+            if len(pendientes) < max_pendientes:
+                continue
+        if not pendientes:
+            return
+        listos, _ = concurrent.futures.wait(
+            pendientes, return_when=concurrent.futures.FIRST_COMPLETED)
+        for futuro in listos:
+            primero = pendientes.pop(futuro)
+            resultados, metricas = futuro.result()
+            for metricas_matriz in metricas:
+                estadisticas.registrar(metricas_matriz)
+            for k, asignaciones in enumerate(resultados):
+                yield primero + k, asignaciones
+
+def _emparejar_minimizar(matrices, valores):
+    # Como zip, pero exige un valor de 'minimizar' por matriz
+    for matriz in matrices:
+        valor = next(valores, _FALTANTE)
+        if valor is _FALTANTE:
+            raise ValueError("Hay menos valores de 'minimizar' que matrices")
+        yield matriz, valor
+    if next(valores, _FALTANTE) is not _FALTANTE:
+        raise ValueError("Hay más valores de 'minimizar' que matrices")
+
+_FALTANTE = object()
+
+def apilar_matrices(matrices):
+    """Apila arreglos de igual forma y tipo en un solo arreglo 3-D.
+
+    Si no todas las matrices son arreglos compatibles, devuelve la
+    secuencia tal cual.
+    """
+    primera = matrices[0]
+    if not all(es_arreglo(matriz) for matriz in matrices):
+        return matrices
+    forma = getattr(primera, "shape", None)
+    tipo = getattr(primera, "dtype", None)
+    if forma is None or any(matriz.shape != forma or matriz.dtype != tipo
+                            for matriz in matrices):
+        return matrices
+    import numpy as np
+    return np.stack(matrices)
+
+def _resolver_grupo(matrices, minimizar, disponibilidad_uniforme, metodo,
+                    medir=False):
+    # Devuelve las asignaciones y la lista de métricas de cada resolución
+    # (vacía si no se mide), para registrarlas en el proceso principal
+    metricas = []
+    estadisticas = Estadisticas(metricas.append) if medir else None
+    resultados = [hungaro(matriz, minimizar_matriz,
+                          disponibilidad_uniforme=disponibilidad_uniforme,
+                          metodo=metodo, estadisticas=estadisticas)
+                  for matriz, minimizar_matriz in zip(matrices, minimizar)]
+    return resultados, metricas
+
+def obtener_pool(trabajadores=None, tipo_pool=POOL_PROCESOS):
+    """Devuelve un pool reutilizable del tipo y tamaño indicados."""
+    if tipo_pool == POOL_PROCESOS:
+        clase = concurrent.futures.ProcessPoolExecutor
+    elif tipo_pool == POOL_HILOS:
+        clase = concurrent.futures.ThreadPoolExecutor
+    else:
+        raise ValueError("Tipo de pool desconocido: %r" % (tipo_pool,))
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+    with _candado_pools:
+        pool = _pools.get((tipo_pool, trabajadores))
+        if pool is None:
+            pool = clase(max_workers=trabajadores)
+            _pools[tipo_pool, trabajadores] = pool
+    return pool
+
+@atexit.register
+def cerrar_pools():
+    """Cierra los pools creados por obtener_pool."""
+    with _candado_pools:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+class Estadisticas:
+    """Contadores y tiempos por fase de las resoluciones de hungaro.
+
+    Se pasa a hungaro, hungaro_lote o hungaro_flujo con el argumento
+    'estadisticas', y acumula los datos de todas las resoluciones:
+    'resoluciones' es la cantidad, 'contadores' y 'tiempos' (en segundos)
+    son diccionarios por nombre.  Puede compartirse entre hilos.  A
+    diferencia de 'funcion_pasos', no expone las matrices y su costo es de
+    unas pocas mediciones de tiempo por fase.
+
+    Cada resolución produce un diccionario plano de métricas con el
+    'metodo' ("disperso" para matrices dispersas), el 'orden' de la matriz,
+    el modo 'numerico' (salvo en las dispersas; ver convertir_numerico),
+    'tiempo_total', un 'tiempo_<fase>' por fase recorrida y los contadores
+    del método:
+    marcado: fases reduccion, asignacion_inicial, marcado, reasignacion y
+        ajuste_dual; contadores filas_asignacion_inicial, pasadas_marcado,
+        reasignaciones (caminos de aumento) y ajustes_duales.
+    caminos: fases reduccion y aumento; contadores filas_asignacion_inicial
+        y aumentos.
+    subasta: fase subasta; contadores fases_epsilon y rondas_subasta.
+    Todas miden además la fase procesar (validación y conversión), salvo
+    las dispersas, que sólo tienen la fase flujo.
+    Si se da 'funcion_metricas', se la llama con ese diccionario al final
+    de cada resolución, p. ej. para escribirlo en un registro estructurado
+    o enviarlo a un sistema de métricas.
+    """
+
+    def __init__(self, funcion_metricas=None):
+        self.funcion_metricas = funcion_metricas
+        self._candado = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.resoluciones = 0
+        self.contadores = collections.Counter()
+        self.tiempos = collections.Counter()
+
+    def iniciar(self):
+        """Comienza la medición de una resolución."""
+        return _Medicion()
+
+    def registrar(self, metricas):
+        """Suma las métricas de una resolución a los acumulados."""
+        with self._candado:
+            self.resoluciones += 1
+            for nombre, valor in metricas.items():
+                if nombre.startswith("tiempo_"):
+                    self.tiempos[nombre[len("tiempo_"):]] += valor
+                elif nombre not in ("metodo", "orden", "numerico"):
+                    self.contadores[nombre] += valor
+        if self.funcion_metricas is not None:
+            self.funcion_metricas(metricas)
+
+    def como_diccionario(self):
+        with self._candado:
+            return {"resoluciones": self.resoluciones,
+                    "contadores": dict(self.contadores),
+                    "tiempos": dict(self.tiempos)}
+
+class _Medicion:
+    # Métricas de una resolución en curso; cada llamada a fase atribuye el
+    # tiempo transcurrido desde la anterior a la fase indicada
+
+    __slots__ = ("metricas", "_inicio", "_ultimo")
+
+    def __init__(self):
+        self.metricas = {}
+        self._inicio = self._ultimo = perf_counter()
+
+    def fase(self, nombre):
+        ahora = perf_counter()
+        clave = "tiempo_" + nombre
+        self.metricas[clave] = (self.metricas.get(clave, 0) + ahora
+                                - self._ultimo)
+        self._ultimo = ahora
+
+    def contar(self, nombre, cantidad=1):
+        self.metricas[nombre] = self.metricas.get(nombre, 0) + cantidad
+
+    def terminar(self):
+        self.metricas["tiempo_total"] = perf_counter() - self._inicio
+        return self.metricas
 
 def validar_matriz(matriz_costos, disponibilidad_uniforme=True):
     ERROR_MATRIZ_VACIA = "La matriz está vacía"
@@ -187,7 +932,8 @@ def validar_matriz(matriz_costos, disponibilidad_uniforme=True):
     if not disponibilidad_uniforme and cant_elementos == 0:
         raise ValueError(ERROR_MATRIZ_VACIA)
 
-def procesar_matriz(matriz_costos, minimizar, disponibilidad_uniforme=True):
+def procesar_matriz(matriz_costos, minimizar, disponibilidad_uniforme=True,
+                    costo_maximo=None):
     falta_conversion = True
     if isinstance(matriz_costos[0][0], (str, bytes, bytearray)):
         try:
@@ -198,6 +944,11 @@ def procesar_matriz(matriz_costos, minimizar, disponibilidad_uniforme=True):
     if falta_conversion:
         matriz_costos = \
                   [[float(costo) for costo in fila] for fila in matriz_costos]
+    if costo_maximo is not None:
+        for fila in matriz_costos:
+            for j, costo in enumerate(fila):
+                if costo > costo_maximo:
+                    fila[j] = INFINITO
     cant_filas = len(matriz_costos)
     if disponibilidad_uniforme:
         orden = max(cant_filas, len(matriz_costos[0]))
@@ -219,50 +970,740 @@ def procesar_matriz(matriz_costos, minimizar, disponibilidad_uniforme=True):
                 if faltante > 0:
                     fila.extend([0] * faltante)
     else:
+        if not disponibilidad_uniforme:
+            for fila in matriz_costos:
+                fila.extend([INFINITO] * (orden - len(fila)))
         matriz_costos.extend([[0] * orden for i in range(orden - cant_filas)])
     if not minimizar:
-        maximo = max(map(max, matriz_costos))
+        # El máximo sólo considera costos finitos; las rutas inexistentes
+        # siguen siéndolo
+        maximo = max((costo for fila in matriz_costos for costo in fila
+                      if costo < INFINITO), default=0)
         for fila in matriz_costos:
             for j in range(orden):
-                fila[j] = maximo - fila[j]
+                if fila[j] < INFINITO:
+                    fila[j] = maximo - fila[j]
     return matriz_costos
 
-def asignar(matriz_costos, columnas_excluidas=None):
-    ceros_por_fila = [fila.count(0) for fila in matriz_costos]
-    asignaciones = []
+def es_arreglo(matriz_costos):
+    """Indica si la matriz se debe tratar como arreglo en vez de lista."""
+    return (not isinstance(matriz_costos, (list, tuple))
+            and hasattr(matriz_costos, "__array__"))
+
+def convertir_arreglo(matriz_costos, disponibilidad_uniforme=True):
+    """Valida la matriz de costos como arreglo y elige su tipo numérico.
+
+    Equivale a validar_matriz más la conversión de procesar_matriz, pero
+    con operaciones sobre el arreglo por bloques de filas, sin copias
+    temporales del tamaño de la matriz.  Los arreglos de enteros o reales
+    conservan su tipo (p. ej. int32 o float32, que ocupan la mitad), así
+    que no se copian y pueden ser mapeos de archivos (ver cargar_matriz);
+    los textos que representan enteros quedan como int64, los booleanos
+    como uint8 y el resto como float64.
+
+    Si 'disponibilidad_uniforme' es False, se admiten celdas NaN, que
+    procesar_arreglo reemplaza por infinito positivo.
+    Si se produce un error de validación, se lanza una excepción ValueError.
+    """
+    import numpy as np
+
+    try:
+        arreglo = np.asarray(matriz_costos)
+    except ValueError:
+        raise ValueError("Las filas no tienen el mismo tamaño")
+    if arreglo.ndim != 2:
+        raise ValueError("La matriz debe tener dos dimensiones")
+    if arreglo.size == 0:
+        raise ValueError("La matriz está vacía")
+
+    tipo = arreglo.dtype.kind
+    try:
+        if tipo == "b":
+            arreglo = arreglo.view(np.uint8)
+        elif tipo in "US":
+            try:
+                arreglo = arreglo.astype(np.int64)
+            except ValueError:
+                arreglo = arreglo.astype(np.float64)
+        elif tipo == "O":
+            arreglo = arreglo.astype(np.float64)
+        elif tipo not in "iuf":
+            raise TypeError
+    except (TypeError, ValueError):
+        raise ValueError("Los elementos no son números")
+
+    tipo = arreglo.dtype.kind
+    for bloque in bloques_filas(arreglo):
+        if tipo == "f" and disponibilidad_uniforme and np.isnan(bloque).any():
+            raise ValueError("Los elementos no son números")
+        if tipo != "u" and (bloque < 0).any():
+            raise ValueError("No puede haber costos negativos")
+    return arreglo
+
+def procesar_arreglo(arreglo, minimizar, costo_maximo=None):
+    """Completa el arreglo a una matriz cuadrada y lo prepara para resolver.
+
+    Es el equivalente de procesar_matriz para un arreglo ya validado por
+    convertir_arreglo: las filas o columnas faltantes se completan con ceros,
+    los NaN se reemplazan por infinito y, si no se minimiza, cada costo se
+    reemplaza por 'maximo - costo' (el máximo sólo considera costos finitos).
+    Todo se escribe en una única matriz nueva del mismo tipo; si el arreglo
+    ya es cuadrado, sin NaN y se minimiza, se devuelve el mismo objeto, que
+    no debe modificarse (así un arreglo mapeado desde un archivo nunca se
+    carga completo en memoria).
+
+    Si se da 'costo_maximo', las celdas con costo mayor pasan a infinito,
+    lo que requiere una copia real (float64) del arreglo.
+    """
+    import numpy as np
+
+    if costo_maximo is not None:
+        arreglo = np.where(arreglo > costo_maximo, INFINITO,
+                           arreglo.astype(np.float64, copy=False))
+    cant_filas, cant_columnas = arreglo.shape
+    orden = max(cant_filas, cant_columnas)
+    es_real = arreglo.dtype.kind == "f"
+    if minimizar:
+        if (cant_filas == cant_columnas
+                and not (es_real
+                         and any(np.isnan(bloque).any()
+                                 for bloque in bloques_filas(arreglo)))):
+            return arreglo
+        resultado = np.zeros((orden, orden), dtype=arreglo.dtype)
+        resultado[:cant_filas, :cant_columnas] = arreglo
+    else:
+        if es_real:
+            maximo = max(np.max(bloque, where=np.isfinite(bloque), initial=0)
+                         for bloque in bloques_filas(arreglo))
+        else:
+            maximo = arreglo.max()
+        resultado = np.full((orden, orden), maximo, dtype=arreglo.dtype)
+        np.subtract(maximo, arreglo,
+                    out=resultado[:cant_filas, :cant_columnas])
+        if es_real:
+            # maximo - infinito daría -infinito; las rutas siguen faltando
+            resultado[np.isinf(resultado)] = INFINITO
+    if es_real:
+        resultado[np.isnan(resultado)] = INFINITO
+    return resultado
+
+def bloques_filas(arreglo, elementos=1 << 20):
+    """Divide un arreglo 2-D en vistas de filas consecutivas de a lo sumo
+    'elementos' celdas (al menos una fila), para recorrerlo sin crear
+    temporales del tamaño de la matriz."""
+    filas = max(1, elementos // max(1, arreglo.shape[1]))
+    for inicio in range(0, arreglo.shape[0], filas):
+        yield arreglo[inicio:inicio + filas]
+
+def filas_compactas(arreglo, ancho=False):
+    """Convierte un arreglo cuadrado en una lista de filas array.array.
+
+    Es la representación que usa el método de marcado para arreglos: cada
+    fila admite las mismas operaciones que una lista, pero guarda los
+    costos con el mismo tipo que el arreglo (p. ej. 'i' para int32 o 'f'
+    para float32), de modo que sólo hay un objeto de Python por fila en
+    lugar de uno por celda y la copia, que el marcado modifica, ocupa lo
+    mismo que el arreglo.  Las filas se copian de a una, por lo que un
+    arreglo mapeado no se carga completo.  Si 'ancho' es True, o el tipo
+    no tiene equivalente en array (p. ej. float16), se usan números de 8
+    bytes ('q' para enteros, 'd' para reales).
+    """
+    import numpy as np
+
+    tipo = arreglo.dtype.char
+    if (ancho or tipo not in array.typecodes
+            or array.array(tipo).itemsize != arreglo.dtype.itemsize):
+        tipo = "d" if arreglo.dtype.kind == "f" else "q"
+    tipo_numpy = np.dtype(tipo)
+    return [array.array(tipo, np.asarray(fila, dtype=tipo_numpy).tobytes())
+            for fila in arreglo]
+
+def validar_numerico(numerico, epsilon=None):
+    """Valida el modo numérico y el epsilon de hungaro."""
+    if numerico not in (NUMERICO_AUTOMATICO, NUMERICO_ENTERO, NUMERICO_REAL):
+        raise ValueError("Modo numérico desconocido: %r" % (numerico,))
+    if epsilon is not None and (numerico == NUMERICO_ENTERO
+                                or not epsilon >= 0):
+        raise ValueError("epsilon debe ser un número no negativo y no se"
+                         " admite con el modo entero")
+
+def convertir_numerico(matriz_costos, numerico=NUMERICO_AUTOMATICO,
+                       epsilon=None):
+    """Elige la aritmética con que se resuelve una matriz ya procesada.
+
+    Recibe el resultado de procesar_matriz o procesar_arreglo y devuelve la
+    tupla (matriz, escala, epsilon, modo):
+    NUMERICO_ENTERO multiplica los costos por la menor potencia de 10 (a lo
+        sumo 10 ** DECIMALES_MAXIMOS) que los vuelve enteros y los
+        redondea, de modo que las reducciones son exactas: enteros de
+        Python en listas e int64 en arreglos (float64 de valores enteros si
+        hay rutas inexistentes, exactos hasta 2 ** 53).  'escala' es ese
+        factor y 'epsilon' es 0.  Si los costos no son decimales de a lo
+        sumo DECIMALES_MAXIMOS cifras, o un arreglo escalado no entra en su
+        tipo, se lanza ValueError.
+    NUMERICO_REAL deja los costos como están y toma como cero todo costo
+        reducido de valor absoluto a lo sumo 'epsilon' (por omisión, 1e-9
+        veces el mayor costo finito, o 4 épsilon de máquina veces para
+        arreglos float32), para que el redondeo de las restas no oculte
+        ceros ni agregue iteraciones al marcado.  La asignación queda a lo
+        sumo a n·epsilon del óptimo.
+    NUMERICO_AUTOMATICO, con listas, usa el modo entero si los costos lo
+        admiten y el real en otro caso.  Los arreglos no se copian: los de
+        enteros quedan en el modo entero y los de reales en el real.
+    """
+    import numpy as np
+
+    validar_numerico(numerico, epsilon)
+    arreglo = es_arreglo(matriz_costos)
+    orden = len(matriz_costos)
+    if arreglo:
+        if matriz_costos.dtype.kind != "f" and numerico != NUMERICO_REAL:
+            return matriz_costos, 1, 0, NUMERICO_ENTERO
+        bloques = (bloque.astype(np.float64, copy=False)
+                   for bloque in bloques_filas(matriz_costos))
+    else:
+        filas_bloque = max(1, (1 << 20) // orden)
+        bloques = (np.array(matriz_costos[inicio:inicio + filas_bloque],
+                            dtype=np.float64)
+                   for inicio in range(0, orden, filas_bloque))
+    if numerico == NUMERICO_REAL or (arreglo
+                                     and numerico == NUMERICO_AUTOMATICO):
+        if epsilon is None:
+            maximo = max(np.max(np.abs(bloque), where=np.isfinite(bloque),
+                                initial=0) for bloque in bloques)
+            # Las filas float32 de filas_compactas redondean cada costo
+            # reducido a su precisión
+            precision = 1e-9
+            if arreglo and matriz_costos.dtype == np.float32:
+                precision = 4 * float(np.finfo(np.float32).eps)
+            epsilon = precision * float(maximo)
+        return matriz_costos, 1, epsilon, NUMERICO_REAL
+
+    ### Menor potencia de 10 que vuelve enteros todos los costos finitos:
+    ### si vale para un bloque, también valen las mayores
+    decimales = 0
+    maximo = 0
+    infinitos = False
+    for bloque in bloques:
+        finitos = np.isfinite(bloque)
+        infinitos = infinitos or not finitos.all()
+        bloque = bloque[finitos]
+        maximo = max(maximo, float(np.abs(bloque).max(initial=0)))
+        while decimales <= DECIMALES_MAXIMOS:
+            escalado = bloque * 10 ** decimales
+            if (np.abs(escalado - np.rint(escalado))
+                    <= 1e-9 * np.maximum(1, np.abs(escalado))).all():
+                break
+            decimales += 1
+        else:
+            break
+    escala = 10 ** decimales
+    if decimales > DECIMALES_MAXIMOS:
+        if numerico == NUMERICO_AUTOMATICO:
+            return convertir_numerico(matriz_costos, NUMERICO_REAL, epsilon)
+        raise ValueError("Los costos no son decimales de a lo sumo %d"
+                         " cifras" % DECIMALES_MAXIMOS)
+
+    if not arreglo:
+        matriz_costos = [[costo if costo == INFINITO else round(costo * escala)
+                          for costo in fila] for fila in matriz_costos]
+        return matriz_costos, escala, 0, NUMERICO_ENTERO
+    ### Las sumas de potenciales llegan a unas 2·n veces el mayor costo
+    if maximo * escala * 2 * (orden + 1) >= (2 ** 53 if infinitos
+                                              else 2 ** 62):
+        raise ValueError("Los costos escalados no entran en enteros de 64"
+                         " bits")
+    resultado = np.empty(matriz_costos.shape,
+                         dtype=np.float64 if infinitos else np.int64)
+    inicio = 0
+    for bloque in bloques_filas(matriz_costos):
+        resultado[inicio:inicio + len(bloque)] = np.rint(bloque * escala)
+        inicio += len(bloque)
+    return resultado, escala, 0, NUMERICO_ENTERO
+
+def cargar_matriz(archivo, forma=None, tipo=None):
+    """Abre una matriz de costos guardada en un archivo sin leerla completa.
+
+    Los archivos .npy se abren con np.load en modo mmap; cualquier otro se
+    toma como datos binarios sin encabezado, de tipo 'tipo' (p. ej.
+    "float32" o "int32") y forma 'forma' (filas, columnas) en orden de
+    filas.  El resultado es un arreglo de sólo lectura que se puede pasar a
+    hungaro: con METODO_CAMINOS, si la matriz es cuadrada y se minimiza, el
+    sistema operativo lee las filas a medida que se necesitan y la memoria
+    adicional es O(n).  METODO_MARCADO, que modifica la matriz, trabaja
+    sobre una copia del mismo tipo (ver filas_compactas).
+    """
+    import numpy as np
+
+    if str(archivo).lower().endswith(".npy"):
+        return np.load(archivo, mmap_mode="r")
+    if forma is None or tipo is None:
+        raise ValueError("Un archivo binario necesita forma y tipo")
+    return np.memmap(archivo, dtype=tipo, mode="r", shape=tuple(forma))
+
+def es_dispersa(matriz_costos):
+    """Indica si la matriz es una MatrizDispersa o una matriz de SciPy."""
+    return (isinstance(matriz_costos, MatrizDispersa)
+            or hasattr(matriz_costos, "tocoo"))
+
+def convertir_dispersa(matriz_costos, minimizar=True, costo_maximo=None):
+    """Valida una matriz dispersa y la prepara para asignacion_dispersa.
+
+    Ver flujo.validar_dispersa; además, si se da 'costo_maximo', se quitan
+    las rutas más caras, y si no se minimiza, cada costo se reemplaza por
+    'maximo - costo' sobre las rutas existentes.
+    """
+    matriz_costos = flujo.validar_dispersa(matriz_costos)
+    if costo_maximo is not None:
+        rutas = [k for k, costo in enumerate(matriz_costos.costos)
+                 if costo <= costo_maximo]
+        matriz_costos = matriz_costos._replace(
+            filas=[matriz_costos.filas[k] for k in rutas],
+            columnas=[matriz_costos.columnas[k] for k in rutas],
+            costos=[matriz_costos.costos[k] for k in rutas])
+    if not minimizar and matriz_costos.costos:
+        maximo = max(matriz_costos.costos)
+        matriz_costos = matriz_costos._replace(
+            costos=[maximo - costo for costo in matriz_costos.costos])
+    return matriz_costos
+
+def asignacion_dispersa(matriz_costos, minimizar=True):
+    """Asignación óptima sobre una matriz de costos dispersa.
+
+    Resuelve el problema como un flujo de costo mínimo (ver
+    flujo.flujo_costo_minimo) en el que cada fila de la dimensión menor
+    debe asignarse a una columna por una ruta existente.  A diferencia de
+    hungaro con matrices rectangulares densas, no se agregan filas ni
+    columnas de relleno: sólo se devuelven los pares (fila, columna) de
+    rutas reales, ordenados.  Si no hay asignación posible con las rutas
+    dadas, se lanza ValueError.
+    """
+    return pares_asignados(_asignacion_dispersa(matriz_costos, minimizar)[0])
+
+def _asignacion_dispersa(matriz_costos, minimizar, costo_maximo=None):
+    # Cuerpo de asignacion_dispersa; devuelve la tupla (columna_de_fila, u,
+    # v), con -1 en las filas sin asignar y los duales del flujo
+    matriz_costos = convertir_dispersa(matriz_costos, minimizar, costo_maximo)
+    cant_filas, cant_columnas = matriz_costos.forma
+    columna_de_fila = [-1] * cant_filas
+    envios, u, v = flujo_rutas(matriz_costos, [1] * cant_filas,
+                               [1] * cant_columnas, duales=True)
+    for k, cantidad in envios:
+        columna_de_fila[matriz_costos.filas[k]] = matriz_costos.columnas[k]
+    return columna_de_fila, u, v
+
+def flujo_rutas(matriz_costos, capacidades_filas, capacidades_columnas,
+                duales=False):
+    """Flujo de costo mínimo por las rutas de una MatrizDispersa validada.
+
+    El lado (filas o columnas) de menor capacidad total envía toda su
+    capacidad, y el otro recibe a lo sumo la suya, por las rutas de la
+    matriz y sin límite por ruta (ver flujo.flujo_costo_minimo).  Devuelve
+    la lista de pares (k, cantidad) de las rutas k con envío no nulo.  Si
+    no se puede enviar todo, se lanza ValueError.
+
+    Si 'duales' es True, devuelve la tupla (envios, duales_filas,
+    duales_columnas) con los duales de flujo.flujo_costo_minimo; los del
+    lado que recibe son <= 0.
+    """
+    fuentes, sumideros = matriz_costos.filas, matriz_costos.columnas
+    cantidades, capacidades = capacidades_filas, capacidades_columnas
+    transpuesta = sum(cantidades) > sum(capacidades)
+    if transpuesta:
+        fuentes, sumideros = sumideros, fuentes
+        cantidades, capacidades = capacidades, cantidades
+
+    inicio, orden_aristas = flujo.ordenar_por(fuentes, len(cantidades))
+    try:
+        flujo_aristas, duales_fuentes, duales_sumideros = \
+            flujo.flujo_costo_minimo(
+                cantidades, capacidades, inicio,
+                [sumideros[k] for k in orden_aristas],
+                [matriz_costos.costos[k] for k in orden_aristas])
+    except ValueError:
+        raise ValueError("No existe una asignación con las rutas dadas")
+    envios = [(k, cantidad)
+              for k, cantidad in zip(orden_aristas, flujo_aristas)
+              if cantidad > 0]
+    if not duales:
+        return envios
+    if transpuesta:
+        return envios, duales_sumideros, duales_fuentes
+    return envios, duales_fuentes, duales_sumideros
+
+def asignacion_capacitada(matriz_costos, capacidades_filas,
+                          capacidades_columnas, minimizar=True,
+                          disponibilidad_uniforme=True):
+    """Asignación en la que cada fila y columna admite varias unidades.
+
+    La fila i puede recibir a lo sumo capacidades_filas[i] unidades y la
+    columna j a lo sumo capacidades_columnas[j], y una misma ruta puede
+    llevar varias.  Se asigna la mayor cantidad posible, es decir, toda la
+    capacidad del lado de menor capacidad total, al menor costo total (o
+    al mayor, si 'minimizar' es False).  Devuelve la lista ordenada de
+    tuplas (fila, columna, cantidad) de las rutas usadas.
+
+    En lugar de repetir cada fila o columna tantas veces como su capacidad,
+    se resuelve un flujo de costo mínimo (ver flujo_rutas) sobre las rutas
+    finitas, así que el tamaño del problema no crece con las capacidades:
+    cada camino de aumento envía de una vez todo lo que admite, y la
+    asignación inicial por las rutas más baratas cubre la mayor parte.
+
+    La matriz puede ser cualquiera de las que acepta hungaro, y los costos
+    infinitos o faltantes son rutas inexistentes.  Las capacidades deben
+    ser enteros no negativos.  Si se produce un error de validación o no
+    hay asignación posible con las rutas dadas, se lanza ValueError.
+    """
+    if es_dispersa(matriz_costos):
+        matriz_costos = convertir_dispersa(matriz_costos, minimizar)
+    else:
+        matriz_costos = rutas_finitas(matriz_costos, minimizar,
+                                      disponibilidad_uniforme)
+    cant_filas, cant_columnas = matriz_costos.forma
+    capacidades_filas = validar_capacidades(capacidades_filas, cant_filas)
+    capacidades_columnas = validar_capacidades(capacidades_columnas,
+                                               cant_columnas)
+    envios = flujo_rutas(matriz_costos, capacidades_filas,
+                         capacidades_columnas)
+    return sorted((matriz_costos.filas[k], matriz_costos.columnas[k], cantidad)
+                  for k, cantidad in envios)
+
+def rutas_finitas(matriz_costos, minimizar=True, disponibilidad_uniforme=True):
+    """Valida una matriz densa y devuelve sus rutas finitas como
+    MatrizDispersa, sin filas ni columnas de relleno.  Si no se minimiza,
+    los costos se transforman como en procesar_matriz."""
+    if es_arreglo(matriz_costos):
+        import numpy as np
+
+        arreglo = convertir_arreglo(matriz_costos, disponibilidad_uniforme)
+        cant_filas, cant_columnas = arreglo.shape
+        arreglo = procesar_arreglo(arreglo, minimizar)
+        arreglo = arreglo[:cant_filas, :cant_columnas]
+        filas, columnas = np.nonzero(np.isfinite(arreglo))
+        return MatrizDispersa(filas.tolist(), columnas.tolist(),
+                              arreglo[filas, columnas].tolist(),
+                              (cant_filas, cant_columnas))
+    validar_matriz(matriz_costos, disponibilidad_uniforme)
+    cant_filas = len(matriz_costos)
+    cant_columnas = max(map(len, matriz_costos))
+    matriz = procesar_matriz(matriz_costos, minimizar, disponibilidad_uniforme)
+    filas, columnas, costos = [], [], []
+    for i in range(cant_filas):
+        for j, costo in enumerate(matriz[i][:cant_columnas]):
+            if costo < INFINITO:
+                filas.append(i)
+                columnas.append(j)
+                costos.append(costo)
+    return MatrizDispersa(filas, columnas, costos, (cant_filas, cant_columnas))
+
+def validar_capacidades(capacidades, cantidad):
+    """Valida un vector de capacidades y lo devuelve como lista de enteros."""
+    enteras = []
+    for capacidad in capacidades:
+        try:
+            entera = int(capacidad)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError("Las capacidades deben ser enteras")
+        if entera != capacidad:
+            raise ValueError("Las capacidades deben ser enteras")
+        if entera < 0:
+            raise ValueError("Las capacidades no pueden ser negativas")
+        enteras.append(entera)
+    if len(enteras) != cantidad:
+        raise ValueError("La cantidad de capacidades no coincide con la"
+                         " matriz")
+    return enteras
+
+def asignacion_cuello_botella(matriz_costos, minimizar=True,
+                              disponibilidad_uniforme=True):
+    """Asignación de cuello de botella: minimiza el mayor costo asignado.
+
+    Si 'minimizar' es False, maximiza en cambio el menor costo asignado.
+    Devuelve la tupla (valor, asignaciones), donde valor es ese costo
+    extremo y asignaciones la lista ordenada de pares (fila, columna).  Como
+    en asignacion_dispersa, no se agregan filas ni columnas de relleno: se
+    asigna cada fila (o cada columna, si hay más filas que columnas) por
+    una ruta real.  Acepta las mismas matrices que hungaro, y los costos
+    infinitos o faltantes son rutas inexistentes; si no hay asignación
+    posible, se lanza ValueError.
+
+    Se hace una búsqueda binaria del umbral entre los costos distintos: en
+    cada prueba sólo se permiten las rutas que no lo superan y se busca un
+    emparejamiento completo con Hopcroft-Karp (ver emparejamiento_maximo).
+    El emparejamiento de una prueba se reutiliza en la siguiente, quitando
+    sólo las rutas que el nuevo umbral excluye, y las rutas de cada fila se
+    ordenan una vez, de modo que cada umbral es un prefijo de ellas.  En
+    total se hacen O(log n) pruebas en lugar de un método húngaro por
+    umbral.
+
+    Para desempatar por costo total, se puede resolver luego
+    hungaro(matriz_costos, costo_maximo=valor).
+    """
+    transpuesta = False
+    if es_dispersa(matriz_costos):
+        dispersa = flujo.validar_dispersa(matriz_costos)
+        cant_filas, cant_columnas = dispersa.forma
+        filas, columnas = dispersa.filas, dispersa.columnas
+        if cant_filas > cant_columnas:
+            filas, columnas = columnas, filas
+            cant_filas, cant_columnas = cant_columnas, cant_filas
+            transpuesta = True
+        inicio, orden_rutas = flujo.ordenar_por(filas, cant_filas)
+        rutas = [sorted((dispersa.costos[k], columnas[k])
+                        for k in orden_rutas[inicio[i]:inicio[i + 1]])
+                 for i in range(cant_filas)]
+    elif es_arreglo(matriz_costos):
+        import numpy as np
+
+        arreglo = convertir_arreglo(matriz_costos, disponibilidad_uniforme)
+        if arreglo.shape[0] > arreglo.shape[1]:
+            arreglo = arreglo.T
+            transpuesta = True
+        rutas = []
+        for fila in arreglo:
+            orden_fila = np.argsort(fila, kind="stable")
+            costos_fila = fila[orden_fila]
+            if costos_fila.dtype.kind == "f":
+                # NaN e infinito quedan al final del orden
+                finitos = int(np.isfinite(costos_fila).sum())
+                costos_fila = costos_fila[:finitos]
+                orden_fila = orden_fila[:finitos]
+            rutas.append(list(zip(costos_fila.tolist(), orden_fila.tolist())))
+    else:
+        validar_matriz(matriz_costos, disponibilidad_uniforme)
+        cant_filas = len(matriz_costos)
+        # procesar_matriz completa las celdas faltantes con infinito; las
+        # filas y columnas de relleno se descartan
+        matriz = procesar_matriz(matriz_costos, True, disponibilidad_uniforme)
+        cant_columnas = max(map(len, matriz_costos))
+        matriz = [fila[:cant_columnas] for fila in matriz[:cant_filas]]
+        if cant_filas > cant_columnas:
+            matriz = [list(columna) for columna in zip(*matriz)]
+            transpuesta = True
+        rutas = [sorted((costo, j) for j, costo in enumerate(fila)
+                        if costo < INFINITO)
+                 for fila in matriz]
+    if not minimizar:
+        # Maximizar el menor costo es minimizar el mayor costo negado
+        rutas = [[(-costo, j) for costo, j in reversed(rutas_fila)]
+                 for rutas_fila in rutas]
+
+    cant_filas = len(rutas)
+    cant_columnas = 1 + max((j for rutas_fila in rutas
+                             for costo, j in rutas_fila), default=-1)
+    if cant_filas > cant_columnas or not all(rutas):
+        raise ValueError("No existe una asignación con las rutas dadas")
+    columnas_fila = [[j for costo, j in rutas_fila] for rutas_fila in rutas]
+    costos_fila = [[costo for costo, j in rutas_fila] for rutas_fila in rutas]
+    umbrales = sorted({costo for costos in costos_fila for costo in costos})
+
+    # Toda fila se asigna, así que el umbral no es menor que el menor costo
+    # de cada una
+    bajo = bisect.bisect_left(umbrales,
+                              max(costos[0] for costos in costos_fila))
+    alto = len(umbrales) - 1
+    columna_de_fila = [-1] * cant_filas
+    fila_de_columna = [-1] * cant_columnas
+    mejor = None
+    while bajo <= alto:
+        medio = (bajo + alto) // 2
+        umbral = umbrales[medio]
+        limite = [bisect.bisect_right(costos, umbral)
+                  for costos in costos_fila]
+        for i, j in enumerate(columna_de_fila):
+            if j != -1 and columnas_fila[i].index(j) >= limite[i]:
+                columna_de_fila[i] = -1
+                fila_de_columna[j] = -1
+        if emparejamiento_maximo(columnas_fila, limite, columna_de_fila,
+                                 fila_de_columna) == cant_filas:
+            mejor = list(columna_de_fila)
+            alto = medio - 1
+        else:
+            bajo = medio + 1
+    if mejor is None:
+        raise ValueError("No existe una asignación con las rutas dadas")
+
+    valor = umbrales[alto + 1]
+    if not minimizar:
+        valor = -valor
+    if transpuesta:
+        asignaciones = sorted((j, i) for i, j in enumerate(mejor))
+    else:
+        asignaciones = list(enumerate(mejor))
+    return valor, asignaciones
+
+def asignar(matriz_costos, columnas_excluidas=None, completar=False,
+            epsilon=0):
+    """Asignación inicial sobre los ceros de la matriz reducida.
+
+    Se asigna primero la fila con menos ceros disponibles (la de menor
+    índice ante empates) en su primer cero de una columna no excluida, y se
+    repite hasta que no queden ceros libres.  Las cuentas de ceros se
+    guardan en un cola con borrado diferido y los ceros se indexan por
+    fila y por columna, de modo que cada asignación sólo actualiza las filas
+    con un cero en la columna tomada: el costo total es O(n² + z·log z) con
+    z ceros, en lugar de recorrer la matriz completa en cada asignación.
+
+    Si 'completar' es True, la asignación se extiende luego por caminos
+    alternantes sobre los ceros hasta que sea máxima; cada fila que se
+    agrega así es una reasignación menos en el algoritmo de marcado.
+
+    Los costos de valor a lo sumo 'epsilon' cuentan como ceros.
+    'columnas_excluidas' se modifica: al final, indica las columnas asignadas.
+    Devuelve la lista ordenada de pares (fila, columna) asignados.
+    """
+    return pares_asignados(_asignar(matriz_costos, columnas_excluidas,
+                                    completar, epsilon))
+
+def _asignar(matriz_costos, columnas_excluidas, completar, epsilon=0):
+    # Cuerpo de asignar; devuelve la columna asignada a cada fila, o -1
     orden = len(matriz_costos)
     if columnas_excluidas is None:
         columnas_excluidas = [False] * orden
+    ceros_fila = [[j for j, costo in enumerate(fila)
+                   if costo <= epsilon and not columnas_excluidas[j]]
+                  for fila in matriz_costos]
+    ceros_columna = [[] for j in range(orden)]
+    for i, columnas in enumerate(ceros_fila):
+        for j in columnas:
+            ceros_columna[j].append(i)
+    ceros_por_fila = [len(columnas) for columnas in ceros_fila]
+    cola = [(cuenta, i) for i, cuenta in enumerate(ceros_por_fila)
+                 if cuenta > 0]
+    heapq.heapify(cola)
 
-    while len(asignaciones) < orden:
-        try:
-            i = obtener_siguiente_asignacion(ceros_por_fila)
-        except ValueError as e:  # Hay error si y solo si no quedan ceros
-            asignaciones.sort()
-            return asignaciones
-        fila = matriz_costos[i]
-        #quedan_ceros = False
-        for j, costo in enumerate(fila):
-            if costo == 0 and not columnas_excluidas[j]:
-                #quedan_ceros = True
+    columna_de_fila = [-1] * orden
+    while cola:
+        cuenta, i = heapq.heappop(cola)
+        if cuenta != ceros_por_fila[i]:  # Entrada vieja o fila asignada
+            continue
+        for j in ceros_fila[i]:
+            if not columnas_excluidas[j]:
                 break
-        #if not quedan_ceros:
-        #    asignaciones.sort()
-        #    return asignaciones
         columnas_excluidas[j] = True
-        ceros_por_fila[i] = 0  # Esto implica [1]
-        for k, fila in enumerate(matriz_costos):
-            if k != i and fila[j] == 0:  #<- Se puede evitar [1] con un extra
-                ceros_por_fila[k] -= 1  # [1] que la cuenta puede dar negativa
-        asignaciones.append((i, j))
+        columna_de_fila[i] = j
+        ceros_por_fila[i] = 0
+        for k in ceros_columna[j]:
+            if ceros_por_fila[k] > 0:
+                ceros_por_fila[k] -= 1
+                if ceros_por_fila[k] > 0:
+                    heapq.heappush(cola, (ceros_por_fila[k], k))
 
-    asignaciones.sort()
-    return asignaciones
+    if completar:
+        completar_asignacion(ceros_fila, columna_de_fila, columnas_excluidas)
+    return columna_de_fila
 
-def obtener_siguiente_asignacion(ceros_por_fila):
-    indice_fila = min((cuenta, i) for i, cuenta in enumerate(ceros_por_fila)
-                                  if cuenta > 0)[1]
-    return indice_fila
+def completar_asignacion(ceros_fila, columna_de_fila, columnas_excluidas):
+    """Extiende una asignación sobre ceros hasta que sea máxima.
+
+    Para cada fila sin asignar, busca en anchura un camino alternante por
+    los ceros (ceros_fila[i] son las columnas con cero de la fila i) que
+    termine en una columna libre, es decir, no excluida, e invierte las
+    asignaciones a lo largo del camino.  Modifica 'columna_de_fila' y
+    'columnas_excluidas' y devuelve la cantidad de filas agregadas.
+    """
+    orden = len(columna_de_fila)
+    fila_de_columna = [-1] * len(columnas_excluidas)
+    for i, j in enumerate(columna_de_fila):
+        if j != -1:
+            fila_de_columna[j] = i
+    agregadas = 0
+    for raiz in range(orden):
+        if columna_de_fila[raiz] != -1 or not ceros_fila[raiz]:
+            continue
+        fila_previa = {}  # Columna visitada -> fila desde la que se llegó
+        pendientes = [raiz]
+        libre = -1
+        while pendientes and libre == -1:
+            siguientes = []
+            for i in pendientes:
+                for j in ceros_fila[i]:
+                    if j in fila_previa:
+                        continue
+                    fila_previa[j] = i
+                    if not columnas_excluidas[j]:
+                        libre = j
+                        break
+                    if fila_de_columna[j] != -1:
+                        siguientes.append(fila_de_columna[j])
+                if libre != -1:
+                    break
+            pendientes = siguientes
+        if libre == -1:
+            continue
+        columnas_excluidas[libre] = True
+        j = libre
+        while j != -1:
+            i = fila_previa[j]
+            j_anterior = columna_de_fila[i]
+            columna_de_fila[i] = j
+            fila_de_columna[j] = i
+            j = j_anterior
+        agregadas += 1
+    return agregadas
+
+def emparejamiento_maximo(columnas_fila, limite, columna_de_fila,
+                          fila_de_columna):
+    """Emparejamiento máximo en un grafo bipartito (Hopcroft-Karp).
+
+    Las columnas adyacentes a la fila i son columnas_fila[i][:limite[i]].
+    Parte del emparejamiento dado por columna_de_fila y fila_de_columna
+    (-1 en las filas y columnas libres), que se modifican en el lugar, y
+    devuelve la cantidad de filas emparejadas.  En cada fase, una búsqueda
+    en anchura desde las filas libres arma los niveles de los caminos
+    alternantes más cortos, y una búsqueda en profundidad por esos niveles
+    aumenta por caminos disjuntos; hay O(√n) fases de O(aristas) cada una.
+    """
+    cant_filas = len(columnas_fila)
+    emparejadas = cant_filas - columna_de_fila.count(-1)
+    while True:
+        nivel = [-1] * cant_filas
+        pendientes = [i for i in range(cant_filas)
+                      if columna_de_fila[i] == -1]
+        for i in pendientes:
+            nivel[i] = 0
+        nivel_libre = -1  # Nivel de la primera fila que llega a una libre
+        k = 0
+        while k < len(pendientes):
+            i = pendientes[k]
+            k += 1
+            if nivel_libre != -1 and nivel[i] >= nivel_libre:
+                break
+            columnas = columnas_fila[i]
+            for posicion in range(limite[i]):
+                siguiente = fila_de_columna[columnas[posicion]]
+                if siguiente == -1:
+                    nivel_libre = nivel[i]
+                elif nivel[siguiente] == -1:
+                    nivel[siguiente] = nivel[i] + 1
+                    pendientes.append(siguiente)
+        if nivel_libre == -1:
+            return emparejadas
+
+        proxima = [0] * cant_filas  # Próxima arista a probar de cada fila
+        for raiz in range(cant_filas):
+            if columna_de_fila[raiz] != -1:
+                continue
+            camino = [raiz]
+            while camino:
+                i = camino[-1]
+                if proxima[i] == limite[i]:
+                    nivel[i] = -1  # Sin salida: no se vuelve a visitar
+                    camino.pop()
+                    continue
+                j = columnas_fila[i][proxima[i]]
+                proxima[i] += 1
+                siguiente = fila_de_columna[j]
+                if siguiente == -1:
+                    # Cada fila del camino toma la columna que estaba probando
+                    for i in camino:
+                        j = columnas_fila[i][proxima[i] - 1]
+                        columna_de_fila[i] = j
+                        fila_de_columna[j] = i
+                    emparejadas += 1
+                    break
+                if nivel[siguiente] == nivel[i] + 1:
+                    camino.append(siguiente)
 
 ##def obtener_asignaciones_faltantes(ceros_por_fila):
 ##    filas_por_asignar = [(cuenta, i) for i, cuenta in enumerate(ceros_por_fila)
@@ -270,37 +1711,626 @@ def obtener_siguiente_asignacion(ceros_por_fila):
 ##    filas_por_asignar.sort(reverse=True)
 ##    return filas_por_asignar
 
-def reasignar(matriz_ceros, posicion_cero, columnas_marcadas):
-    orden = len(matriz_ceros)
-    #camino = [posicion_cero]
-    i_previo, j = posicion_cero
-    hay_asignado = True
-    while hay_asignado:
-        hay_asignado = False
-        for i in range(orden):
-            fila = matriz_ceros[i]
-            if fila[j] == 1:
-                matriz_ceros[i_previo][j] = 1
-                matriz_ceros[i][j] = 0
-                #camino.append((i, j))
-                j = fila.index(2)
-                #camino.append((i, j))
-                i_previo = i
-                hay_asignado = True
+def reasignar(fila, columna_de_fila, fila_de_columna, prima_de_fila,
+              columnas_marcadas):
+    """Aumenta la asignación por el camino alternante que empieza en el cero
+    candidato de 'fila', una fila sin asignar.
+
+    Cada cero candidato del camino pasa a ser asignado y la fila que tenía
+    asignada esa columna sigue con su propio candidato, hasta llegar a una
+    columna libre.  Sólo se recorre el camino: columna_de_fila y
+    fila_de_columna se actualizan en el lugar, y luego se borran los
+    candidatos y las columnas marcadas pasan a ser las asignadas, en O(n).
+    """
+    i = fila
+    while i != -1:
+        j = prima_de_fila[i]
+        i_siguiente = fila_de_columna[j]
+        columna_de_fila[i] = j
+        fila_de_columna[j] = i
+        i = i_siguiente
+
+    for j, i in enumerate(fila_de_columna):
+        columnas_marcadas[j] = i != -1
+        prima_de_fila[j] = -1
+
+def caminos_minimos(matriz_costos, medicion=None):
+    """Resuelve la asignación con caminos de aumento más cortos.
+
+    Es METODO_CAMINOS, al estilo de Jonker-Volgenant, con tiempo O(n³)
+    garantizado.  Recibe una matriz cuadrada ya procesada (ver
+    procesar_matriz) y asigna las filas una por una: para cada fila libre
+    se busca, al estilo de Dijkstra sobre los costos reducidos
+    costo - u[i] - v[j], el camino alternante más barato hasta una columna
+    libre, se actualizan los potenciales de las filas y columnas recorridas
+    y se invierte el camino.
+    Los costos infinitos se tratan como rutas inexistentes.
+
+    Devuelve la tupla (columna_de_fila, u, v), donde columna_de_fila[i] es
+    la columna asignada a la fila i, y u, v son los potenciales duales
+    (u[i] + v[j] <= costo[i][j], con igualdad en las asignaciones).
+    Si alguna fila no puede asignarse con costo finito, lanza ValueError.
+
+    Si la matriz es un arreglo de NumPy, la búsqueda de cada paso se hace
+    con operaciones vectorizadas sobre la fila completa, y los resultados
+    son arreglos.
+
+    'medicion' es la medición en curso de Estadisticas.iniciar, o None.
+    """
+    if es_arreglo(matriz_costos):
+        return caminos_minimos_arreglo(matriz_costos, medicion)
+    orden = len(matriz_costos)
+    u = [0] * orden
+    columna_de_fila = [-1] * orden
+    fila_de_columna = [-1] * orden
+
+    # Reducción por columnas: cada columna se asigna a su fila de menor
+    # costo si ésta sigue libre, lo que ahorra la mayoría de los caminos.
+    v = list(map(min, zip(*matriz_costos)))
+    if INFINITO in v:
+        raise ValueError("No existe una asignación de costo finito")
+    for j, columna in enumerate(zip(*matriz_costos)):
+        i = columna.index(v[j])
+        if columna_de_fila[i] == -1:
+            columna_de_fila[i] = j
+            fila_de_columna[j] = i
+    if medicion is not None:
+        asignadas = orden - columna_de_fila.count(-1)
+        medicion.contar("filas_asignacion_inicial", asignadas)
+        medicion.fase("reduccion")
+
+    aumentar_caminos(matriz_costos, u, v, columna_de_fila, fila_de_columna)
+    if medicion is not None:
+        medicion.contar("aumentos", orden - asignadas)
+        medicion.fase("aumento")
+    return columna_de_fila, u, v
+
+def aumentar_caminos(matriz_costos, u, v, columna_de_fila, fila_de_columna):
+    """Asigna las filas libres partiendo de una asignación parcial.
+
+    Los potenciales deben ser factibles (u[i] + v[j] <= costo[i][j]) y
+    ajustados en las asignaciones existentes; se modifican en el lugar,
+    al igual que columna_de_fila y fila_de_columna (con -1 para las filas
+    y columnas libres).  Es el paso principal de caminos_minimos, y permite
+    retomar una solución anterior luego de liberar algunas filas.
+    """
+    if es_arreglo(matriz_costos):
+        return aumentar_caminos_arreglo(matriz_costos, u, v, columna_de_fila,
+                                        fila_de_columna)
+    orden = len(matriz_costos)
+    previa = [-1] * orden
+    for fila_actual in range(orden):
+        if columna_de_fila[fila_actual] != -1:
+            continue
+        # Búsqueda del camino de aumento más corto desde fila_actual
+        distancia = [INFINITO] * orden
+        restantes = list(range(orden - 1, -1, -1))
+        filas_visitadas = [fila_actual]
+        columnas_visitadas = []
+        minimo = 0
+        i = fila_actual
+        sumidero = -1
+        while sumidero == -1:
+            fila = matriz_costos[i]
+            base = minimo - u[i]
+            menor = INFINITO
+            indice = -1
+            for k, j in enumerate(restantes):
+                reducido = base + fila[j] - v[j]
+                if reducido < distancia[j]:
+                    previa[j] = i
+                    distancia[j] = reducido
+                else:
+                    reducido = distancia[j]
+                if reducido < menor or (reducido == menor
+                                        and fila_de_columna[j] == -1):
+                    menor = reducido
+                    indice = k
+            if menor == INFINITO:
+                raise ValueError("No existe una asignación de costo finito")
+            minimo = menor
+            j = restantes[indice]
+            restantes[indice] = restantes[-1]
+            restantes.pop()
+            columnas_visitadas.append(j)
+            if fila_de_columna[j] == -1:
+                sumidero = j
+            else:
+                i = fila_de_columna[j]
+                filas_visitadas.append(i)
+
+        # Actualización de potenciales sobre lo recorrido
+        u[fila_actual] += minimo
+        for i in filas_visitadas[1:]:
+            u[i] += minimo - distancia[columna_de_fila[i]]
+        for j in columnas_visitadas:
+            v[j] -= minimo - distancia[j]
+
+        # Inversión del camino de aumento
+        j = sumidero
+        while True:
+            i = previa[j]
+            fila_de_columna[j] = i
+            columna_de_fila[i], j = j, columna_de_fila[i]
+            if i == fila_actual:
+                break
+
+def caminos_minimos_arreglo(costos, medicion=None):
+    """Versión vectorizada de caminos_minimos para un arreglo cuadrado."""
+    import numpy as np
+
+    orden = len(costos)
+    u = np.zeros(orden)
+    # Mínimos por columna recorriendo bloques de filas: argmin(axis=0)
+    # sobre la matriz completa haría una copia transpuesta de ella
+    v = np.full(orden, INFINITO)
+    fila_minima = np.zeros(orden, dtype=np.int64)
+    inicio = 0
+    for bloque in bloques_filas(costos):
+        minimos = bloque.min(axis=0)
+        mejora = minimos < v
+        v[mejora] = minimos[mejora]
+        fila_minima[mejora] = bloque.argmin(axis=0)[mejora] + inicio
+        inicio += len(bloque)
+    if np.isinf(v).any():
+        raise ValueError("No existe una asignación de costo finito")
+    columna_de_fila = np.full(orden, -1)
+    fila_de_columna = np.full(orden, -1)
+
+    for j, i in enumerate(fila_minima.tolist()):
+        if columna_de_fila[i] == -1:
+            columna_de_fila[i] = j
+            fila_de_columna[j] = i
+    if medicion is not None:
+        asignadas = int((columna_de_fila != -1).sum())
+        medicion.contar("filas_asignacion_inicial", asignadas)
+        medicion.fase("reduccion")
+
+    aumentar_caminos_arreglo(costos, u, v, columna_de_fila, fila_de_columna)
+    if medicion is not None:
+        medicion.contar("aumentos", orden - asignadas)
+        medicion.fase("aumento")
+    return columna_de_fila, u, v
+
+def aumentar_caminos_arreglo(costos, u, v, columna_de_fila, fila_de_columna):
+    """Versión vectorizada de aumentar_caminos; u y v deben ser float64."""
+    import numpy as np
+
+    orden = len(costos)
+    previa = np.full(orden, -1)
+    distancia = np.empty(orden)
+    visitada = np.empty(orden, dtype=bool)
+
+    for fila_actual in np.flatnonzero(columna_de_fila == -1).tolist():
+        distancia.fill(INFINITO)
+        visitada.fill(False)
+        filas_visitadas = [fila_actual]
+        columnas_visitadas = []
+        minimo = 0.0
+        i = fila_actual
+        while True:
+            reducido = costos[i] - v
+            reducido += minimo - u[i]
+            mejora = reducido < distancia
+            mejora &= ~visitada
+            distancia[mejora] = reducido[mejora]
+            previa[mejora] = i
+            clave = np.where(visitada, INFINITO, distancia)
+            j = int(clave.argmin())
+            menor = clave[j]
+            if menor == INFINITO:
+                raise ValueError("No existe una asignación de costo finito")
+            if fila_de_columna[j] != -1:
+                # Ante empates conviene terminar en una columna libre
+                empates = np.flatnonzero(clave == menor)
+                libres = empates[fila_de_columna[empates] == -1]
+                if libres.size:
+                    j = int(libres[0])
+            minimo = menor
+            visitada[j] = True
+            columnas_visitadas.append(j)
+            i = int(fila_de_columna[j])
+            if i == -1:
                 break
-    matriz_ceros[i_previo][j] = 1
-
-    for i in range(orden):
-        columnas_marcadas[i] = False
-    asignaciones = []
-    for i, fila in enumerate(matriz_ceros):
-        for j, marca in enumerate(fila):
-            if marca == 1:
-                columnas_marcadas[j] = True
-                asignaciones.append((i, j))
-            elif marca == 2:
-                fila[j] = 0
-    return asignaciones
+            filas_visitadas.append(i)
+
+        u[fila_actual] += minimo
+        filas = filas_visitadas[1:]
+        u[filas] += minimo - distancia[columna_de_fila[filas]]
+        v[columnas_visitadas] -= minimo - distancia[columnas_visitadas]
+
+        while True:
+            i = int(previa[j])
+            fila_de_columna[j] = i
+            columna_de_fila[i], j = j, int(columna_de_fila[i])
+            if i == fila_actual:
+                break
+
+def subasta(costos, tolerancia=None, medicion=None):
+    """Resuelve la asignación con el algoritmo de subasta de Bertsekas.
+
+    Es METODO_SUBASTA, que conviene en matrices densas grandes de costos
+    enteros.  Recibe un arreglo cuadrado ya procesado (ver procesar_arreglo)
+    y devuelve el arreglo columna_de_fila.  Cada fila libre ofrece por su
+    columna de mayor beneficio (menos costo menos precio) lo suficiente
+    para superar a la segunda mejor más 'epsilon', y cada columna queda con
+    la mayor oferta; el precio de una columna sólo sube.  Las ofertas de
+    una ronda se calculan a la vez para todas las filas libres (estilo
+    Jacobi), con operaciones vectorizadas por bloques de filas, sin copiar
+    el arreglo completo.
+
+    Epsilon empieza grande y se divide por FACTOR_EPSILON en cada fase
+    (escalamiento), conservando los precios de la fase anterior.  Los
+    costos se escalan por n + 1, de modo que la asignación final está a lo
+    sumo a n·epsilon / (n + 1) del óptimo: con costos enteros y epsilon 1,
+    es óptima.  Si se da 'tolerancia', las fases terminan en cuanto ese
+    error garantizado no la supera, lo que ahorra las últimas fases, las
+    más costosas; sin ella, los costos deben ser enteros.
+
+    Las rutas inexistentes (infinitas) se reemplazan por un costo mayor
+    que el de cualquier asignación finita; si la asignación final usa
+    alguna, se lanza ValueError.
+
+    'medicion' es la medición en curso de Estadisticas.iniciar, o None.
+    """
+    import numpy as np
+
+    orden = len(costos)
+    maximo = 0
+    enteros = True
+    hay_faltantes = False
+    for bloque in bloques_filas(costos):
+        if costos.dtype.kind == "f":
+            finitos = np.isfinite(bloque)
+            hay_faltantes = hay_faltantes or not finitos.all()
+            bloque = bloque[finitos]
+            enteros = enteros and bool((bloque == np.floor(bloque)).all())
+        if bloque.size:
+            maximo = max(maximo, float(bloque.max()))
+    if tolerancia is None:
+        tolerancia = 0
+    if not enteros and tolerancia <= 0:
+        raise ValueError("El método de subasta necesita costos enteros o"
+                         " una tolerancia positiva")
+    escala = orden + 1
+    faltante = orden * (maximo + 1) + tolerancia
+    amplitud = escala * (faltante if hay_faltantes else maximo)
+    if amplitud >= 2 ** 53:  # Los reales ya no representan enteros exactos
+        raise ValueError("Los costos son demasiado grandes para el método de"
+                         " subasta")
+
+    filas_bloque = max(1, (1 << 20) // orden)
+    epsilon_final = tolerancia * escala / orden
+    if enteros:  # Con epsilon 1 la asignación ya es óptima
+        epsilon_final = max(1.0, epsilon_final)
+    epsilon = max(epsilon_final, amplitud / FACTOR_EPSILON)
+    precios = np.zeros(orden)
+    while True:
+        columna_de_fila = np.full(orden, -1)
+        fila_de_columna = np.full(orden, -1)
+        libres = np.arange(orden)
+        while libres.size:
+            columnas_ofertas = []
+            ofertas = []
+            for inicio in range(0, libres.size, filas_bloque):
+                filas = libres[inicio:inicio + filas_bloque]
+                valores = np.asarray(costos[filas], dtype=np.float64)
+                if hay_faltantes:
+                    valores[np.isinf(valores)] = faltante
+                valores *= -escala
+                valores -= precios
+                indices = np.arange(len(filas))
+                mejores = valores.argmax(axis=1)
+                primero = valores[indices, mejores]
+                if orden > 1:
+                    valores[indices, mejores] = -INFINITO
+                    segundo = valores.max(axis=1)
+                else:
+                    segundo = primero
+                columnas_ofertas.append(mejores)
+                ofertas.append(precios[mejores] + (primero - segundo)
+                               + epsilon)
+            columnas_ofertas = np.concatenate(columnas_ofertas)
+            ofertas = np.concatenate(ofertas)
+
+            # Cada columna se queda con la mayor oferta recibida; la fila
+            # que la tenía vuelve a estar libre
+            orden_ofertas = np.argsort(ofertas, kind="stable")[::-1]
+            columnas, primeras = np.unique(columnas_ofertas[orden_ofertas],
+                                           return_index=True)
+            ganadoras = orden_ofertas[primeras]
+            anteriores = fila_de_columna[columnas]
+            columna_de_fila[anteriores[anteriores != -1]] = -1
+            filas = libres[ganadoras]
+            columna_de_fila[filas] = columnas
+            fila_de_columna[columnas] = filas
+            precios[columnas] = ofertas[ganadoras]
+            libres = np.flatnonzero(columna_de_fila == -1)
+            if medicion is not None:
+                medicion.contar("rondas_subasta")
+        if medicion is not None:
+            medicion.contar("fases_epsilon")
+        if epsilon <= epsilon_final:
+            break
+        epsilon = max(epsilon_final, epsilon / FACTOR_EPSILON)
+    if medicion is not None:
+        medicion.fase("subasta")
+
+    if hay_faltantes and np.isinf(
+            costos[np.arange(orden), columna_de_fila]).any():
+        raise ValueError("No existe una asignación de costo finito")
+    return columna_de_fila
+
+def mejores_asignaciones(matriz_costos, minimizar=True,
+                         disponibilidad_uniforme=True):
+    """Generador de las asignaciones ordenadas por costo (algoritmo de Murty).
+
+    Produce pares (costo, asignaciones) empezando por la óptima de hungaro
+    y siguiendo con las demás asignaciones distintas en orden de costo
+    (creciente al minimizar, decreciente al maximizar), sin repetir
+    ninguna.  Se calculan a medida que se piden, así que las k mejores se
+    obtienen con itertools.islice(mejores_asignaciones(...), k).  El costo
+    es el de la matriz original; las asignaciones incluyen las filas y
+    columnas de relleno de una matriz rectangular, como en hungaro.
+
+    Cada asignación producida divide el resto del espacio en subproblemas,
+    uno por par no fijado: el par se prohíbe y los anteriores se fijan.
+    Los subproblemas entran a una cola de prioridad con una cota inferior
+    de su costo, obtenida en O(n) de los potenciales duales de la solución
+    padre, y sólo se resuelven al llegar al frente de la cola.  Resolver
+    uno parte de la asignación y los potenciales del padre, que siguen
+    siendo factibles: basta un único camino de aumento (ver
+    aumentar_caminos) desde la fila del par prohibido.
+
+    Los parámetros tienen el mismo significado que en hungaro; las
+    matrices dispersas no se admiten.  Si no existe ninguna asignación de
+    costo finito, se lanza ValueError.
+    """
+    if es_dispersa(matriz_costos):
+        raise ValueError("mejores_asignaciones no admite matrices dispersas")
+    if es_arreglo(matriz_costos):
+        arreglo = convertir_arreglo(matriz_costos, disponibilidad_uniforme)
+        originales = procesar_arreglo(arreglo, True).tolist()
+        matriz = procesar_arreglo(arreglo, minimizar).tolist()
+    else:
+        validar_matriz(matriz_costos, disponibilidad_uniforme)
+        originales = procesar_matriz(matriz_costos, True,
+                                     disponibilidad_uniforme)
+        matriz = procesar_matriz(matriz_costos, minimizar,
+                                 disponibilidad_uniforme)
+    orden = len(matriz)
+
+    # Un nodo es una solución exacta: (costo, columna_de_fila, u, v, pares
+    # fijados, pares prohibidos).  En la cola hay nodos resueltos y
+    # subproblemas pendientes (padre, t), ordenados por costo o por cota
+    columna_de_fila, u, v = caminos_minimos(matriz)
+    costo = sum(matriz[i][j] for i, j in enumerate(columna_de_fila))
+    contador = itertools.count()
+    cola = [(costo, next(contador), (costo, columna_de_fila, u, v, (), ()),
+             None)]
+    while cola:
+        _, _, nodo, pendiente = heapq.heappop(cola)
+        if nodo is None:
+            nodo = _resolver_subproblema(matriz, *pendiente)
+            if nodo is not None:
+                heapq.heappush(cola, (nodo[0], next(contador), nodo, None))
+            continue
+
+        costo, columna_de_fila, u, v, fijas, prohibidas = nodo
+        yield (sum(originales[i][j] for i, j in enumerate(columna_de_fila)),
+               list(enumerate(columna_de_fila)))
+
+        # Cotas de los hijos: el hijo t debe dar otra columna a la fila del
+        # par prohibido y otra fila a su columna, en celdas distintas y de
+        # costo reducido no negativo, sin usar filas ni columnas fijadas
+        libres = _pares_libres(columna_de_fila, fijas)
+        prohibidos = set(prohibidas)
+        filas_fijas = {i for i, j in fijas}
+        columnas_fijas = {j for i, j in fijas}
+        for t, (r, c) in enumerate(libres[:-1]):
+            # El último hijo fijaría todo salvo un par prohibido: no existe
+            fila = matriz[r]
+            minimo_fila = min((fila[j] - v[j] for j in range(orden)
+                               if j != c and j not in columnas_fijas
+                               and (r, j) not in prohibidos),
+                              default=INFINITO) - u[r]
+            minimo_columna = min((matriz[i][c] - u[i] for i in range(orden)
+                                  if i != r and i not in filas_fijas
+                                  and (i, c) not in prohibidos),
+                                 default=INFINITO) - v[c]
+            cota = costo + minimo_fila + minimo_columna
+            if cota < INFINITO:
+                heapq.heappush(cola, (cota, next(contador), None, (nodo, t)))
+            filas_fijas.add(r)
+            columnas_fijas.add(c)
+
+def _pares_libres(columna_de_fila, fijas):
+    filas_fijas = {i for i, j in fijas}
+    return [(i, j) for i, j in enumerate(columna_de_fila)
+            if i not in filas_fijas]
+
+def _resolver_subproblema(matriz, padre, t):
+    # Resuelve el hijo t de 'padre' (ver mejores_asignaciones) y devuelve
+    # su nodo, o None si no tiene asignación de costo finito
+    costo, columna_de_fila, u, v, fijas, prohibidas = padre
+    libres = _pares_libres(columna_de_fila, fijas)
+    r, c = libres[t]
+    fijas = fijas + tuple(libres[:t])
+    prohibidas = prohibidas + ((r, c),)
+
+    # Sólo se copian las filas que cambian: las fijadas quedan con un único
+    # costo finito y las prohibiciones pasan a costo infinito
+    orden = len(matriz)
+    filas = list(matriz)
+    for i, j in fijas:
+        filas[i] = [INFINITO] * orden
+        filas[i][j] = matriz[i][j]
+    for i, j in prohibidas:
+        if filas[i] is matriz[i]:
+            filas[i] = list(matriz[i])
+        filas[i][j] = INFINITO
+
+    columna_de_fila = list(columna_de_fila)
+    fila_de_columna = [-1] * orden
+    for i, j in enumerate(columna_de_fila):
+        fila_de_columna[j] = i
+    columna_de_fila[r] = -1
+    fila_de_columna[c] = -1
+    u = list(u)
+    v = list(v)
+    try:
+        aumentar_caminos(filas, u, v, columna_de_fila, fila_de_columna)
+    except ValueError:
+        return None
+    costo = sum(matriz[i][j] for i, j in enumerate(columna_de_fila))
+    return costo, columna_de_fila, u, v, fijas, prohibidas
+
+class AsignacionIncremental:
+    """Asignación óptima que se mantiene al cambiar algunos costos.
+
+    Resuelve la matriz con caminos_minimos y conserva la matriz procesada,
+    los potenciales duales 'u' y 'v' y la asignación en 'columna_de_fila'
+    y 'fila_de_columna'.  Cada cambio de costos sólo libera las filas cuya
+    asignación deja de ser válida y corrige los potenciales afectados; al
+    pedir las asignaciones se buscan caminos de aumento únicamente para
+    esas filas, por lo que el resultado coincide en costo con un hungaro
+    completo a una fracción de su costo.
+
+    Los parámetros del constructor tienen el mismo significado que en
+    hungaro, y los costos de los cambios se indican igual que en la matriz
+    original (sin invertir al maximizar).  Las filas y columnas de relleno
+    de una matriz rectangular también pueden modificarse.
+    """
+
+    def __init__(self, matriz_costos, minimizar=True,
+                 disponibilidad_uniforme=True):
+        if es_arreglo(matriz_costos):
+            import numpy as np
+            arreglo = convertir_arreglo(matriz_costos, disponibilidad_uniforme)
+            matriz = procesar_arreglo(arreglo, True)
+            # Copia propia en float64: los cambios no deben truncarse ni
+            # modificar el arreglo recibido
+            matriz = matriz.astype(np.float64)
+            maximo = np.max(matriz, where=np.isfinite(matriz), initial=0)
+        else:
+            validar_matriz(matriz_costos, disponibilidad_uniforme)
+            matriz = procesar_matriz(matriz_costos, True,
+                                     disponibilidad_uniforme)
+            maximo = max((costo for fila in matriz for costo in fila
+                          if costo != INFINITO), default=0)
+        self.minimizar = minimizar
+        self.maximo = maximo
+        if not minimizar:
+            if es_arreglo(matriz):
+                finitos = np.isfinite(matriz)
+                np.subtract(maximo, matriz, out=matriz, where=finitos)
+            else:
+                matriz = [[self._procesar_costo(costo) for costo in fila]
+                          for fila in matriz]
+        self.matriz_costos = matriz
+        self.orden = len(matriz)
+        self.columna_de_fila, self.u, self.v = caminos_minimos(matriz)
+        if es_arreglo(matriz):
+            self.fila_de_columna = np.empty_like(self.columna_de_fila)
+            self.fila_de_columna[self.columna_de_fila] = np.arange(self.orden)
+        else:
+            self.fila_de_columna = [0] * self.orden
+            for i, j in enumerate(self.columna_de_fila):
+                self.fila_de_columna[j] = i
+
+    def asignaciones(self):
+        """Devuelve la asignación óptima actual, como hungaro.
+
+        Si algún cambio dejó filas sin asignar, primero se reparan con
+        caminos de aumento desde el estado anterior.  Si no existe una
+        asignación de costo finito, se lanza ValueError.
+        """
+        aumentar_caminos(self.matriz_costos, self.u, self.v,
+                         self.columna_de_fila, self.fila_de_columna)
+        return list(enumerate(map(int, self.columna_de_fila)))
+
+    def cambiar_costo(self, i, j, costo):
+        """Cambia el costo de la fila i y la columna j."""
+        costo = self._procesar_costo(costo)
+        self.matriz_costos[i][j] = costo
+        if self.columna_de_fila[i] == j:
+            self._liberar_fila(i)
+            self._ajustar_u(i)
+        elif costo - self.u[i] - self.v[j] < 0:
+            # Bajar v[j] mantiene factible al resto de la columna, pero la
+            # asignación de la columna deja de estar ajustada
+            self._liberar_columna(j)
+            self.v[j] = costo - self.u[i]
+
+    def cambiar_fila(self, i, costos):
+        """Reemplaza los costos de la fila i.
+
+        Si hay menos costos que columnas, las faltantes (de relleno) cuestan
+        cero, como en procesar_matriz.
+        """
+        fila = self.matriz_costos[i]
+        for j in range(self.orden):
+            fila[j] = self._procesar_costo(costos[j] if j < len(costos)
+                                           else 0)
+        self._liberar_fila(i)
+        self._ajustar_u(i)
+
+    def cambiar_columna(self, j, costos):
+        """Reemplaza los costos de la columna j, como cambiar_fila."""
+        for i in range(self.orden):
+            self.matriz_costos[i][j] = self._procesar_costo(
+                costos[i] if i < len(costos) else 0)
+        self._liberar_columna(j)
+        self._ajustar_v(j)
+
+    def quitar_fila(self, i):
+        """Convierte la fila i en una fila de relleno (todos costos cero)."""
+        self.cambiar_fila(i, ())
+
+    def quitar_columna(self, j):
+        """Convierte la columna j en una columna de relleno."""
+        self.cambiar_columna(j, ())
+
+    def _procesar_costo(self, costo):
+        costo = float(costo)
+        if costo < 0:
+            raise ValueError("No puede haber costos negativos")
+        if self.minimizar or costo == INFINITO:
+            return costo
+        # Si el costo supera al máximo inicial el resultado es negativo, lo
+        # que no afecta al método: sólo importan las diferencias
+        return self.maximo - costo
+
+    def _liberar_fila(self, i):
+        j = self.columna_de_fila[i]
+        if j != -1:
+            self.columna_de_fila[i] = -1
+            self.fila_de_columna[j] = -1
+
+    def _liberar_columna(self, j):
+        i = self.fila_de_columna[j]
+        if i != -1:
+            self.fila_de_columna[j] = -1
+            self.columna_de_fila[i] = -1
+
+    def _ajustar_u(self, i):
+        # Si la fila es toda infinita cualquier potencial es factible, y
+        # aumentar_caminos informará que no hay asignación
+        if es_arreglo(self.matriz_costos):
+            minimo = (self.matriz_costos[i] - self.v).min()
+        else:
+            minimo = min(map(operator.sub, self.matriz_costos[i], self.v))
+        if minimo != INFINITO:
+            self.u[i] = minimo
+
+    def _ajustar_v(self, j):
+        if es_arreglo(self.matriz_costos):
+            minimo = (self.matriz_costos[:, j] - self.u).min()
+        else:
+            minimo = min(fila[j] - u for fila, u in zip(self.matriz_costos,
+                                                        self.u))
+        if minimo != INFINITO:
+            self.v[j] = minimo
 
 def mostrar_matriz(matriz):
     for fila in matriz:
@@ -380,9 +2410,11 @@ def main():
             for i in range(int(size)):
                 fila = []
                 for j in range(int(size)):
-                    costo = input(f">>> Ingrese el costo de la fila {i+1} y columna {j+1}: ")
+                    costo = input(f">>> Ingrese el costo de la fila {i+1} "
+                                  f"y columna {j+1}: ")
                     while costo == "" or not costo.isdigit():
-                        costo = input(f">>> Ingrese un costo válido de la fila {i+1} y columna {j+1}: ")
+                        costo = input(f">>> Ingrese un costo válido de la "
+                                      f"fila {i+1} y columna {j+1}: ")
                     fila.append(int(costo))
                 matriz_costos.append(fila)
 
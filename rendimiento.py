@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# Pruebas de rendimiento de los métodos de asignación y transporte
+#
+# Uso:
+#   python rendimiento.py ejecutar --tamanos 10 100 1000 --salida base.json
+#   python rendimiento.py comparar base.json nuevo.json
+#   python rendimiento.py arranque --presupuesto 0.2
+
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import metodo_hungaro as mh
+from flujo import MatrizDispersa
+
+PROBLEMA_ASIGNACION = "asignacion"
+PROBLEMA_TRANSPORTE = "transporte"
+
+INSTANCIA_ALEATORIA = "aleatoria"
+INSTANCIA_MACHOL_WAGNER = "machol_wagner"
+INSTANCIA_RANGO_BAJO = "rango_bajo"
+INSTANCIA_EMPATES = "empates"
+INSTANCIA_DISPERSA = "dispersa"
+INSTANCIAS = (INSTANCIA_ALEATORIA, INSTANCIA_MACHOL_WAGNER,
+              INSTANCIA_RANGO_BAJO, INSTANCIA_EMPATES, INSTANCIA_DISPERSA)
+
+MOTOR_MARCADO = mh.METODO_MARCADO
+MOTOR_CAMINOS = mh.METODO_CAMINOS
+MOTOR_CAMINOS_ARREGLO = "caminos_arreglo"  # Caminos con entrada de NumPy
+MOTOR_SUBASTA = mh.METODO_SUBASTA  # Con entrada de NumPy
+MOTOR_PULP = "pulp"
+MOTOR_CBC = "cbc"
+MOTOR_VOGEL = "vogel"
+MOTORES = {
+    PROBLEMA_ASIGNACION: (MOTOR_MARCADO, MOTOR_CAMINOS, MOTOR_CAMINOS_ARREGLO,
+                          MOTOR_SUBASTA),
+    PROBLEMA_TRANSPORTE: (MOTOR_PULP, MOTOR_CBC, MOTOR_VOGEL),
+}
+# Motores que no aceptan rutas prohibidas (matrices dispersas)
+MOTORES_DENSOS = (MOTOR_MARCADO, MOTOR_CAMINOS_ARREGLO, MOTOR_SUBASTA,
+                  MOTOR_PULP, MOTOR_CBC)
+
+TAMANOS = (10, 50, 100, 500, 1000, 2000, 5000)
+# Mayor tamaño que se prueba con cada motor: PuLP y CBC arman modelos
+# densos de n² variables, y el marcado en Python puro es O(n³) con
+# constantes altas
+TAMANOS_MAXIMOS = {MOTOR_MARCADO: 2000, MOTOR_PULP: 1000, MOTOR_CBC: 2000}
+LIMITE = 60.0  # Segundos tras los cuales un motor no sigue con tamaños mayores
+COSTO_MAXIMO = 1000
+RUTAS_POR_FILA = 8  # En las instancias dispersas, además de una permutación
+
+# Ejecuciones cortas de cli.py para medir el arranque: (nombre, argumentos,
+# entrada estándar).  Ninguna debería cargar los módulos de
+# MODULOS_PESADOS
+CASOS_ARRANQUE = (
+    ("asignacion", ("asignacion", "-"), '{"costos": [[4, 1], [2, 3]]}\n'),
+    ("transporte", ("transporte", "-"),
+     '{"oferta": [3, 4], "demanda": [5, 2], "costos": [[1, 2], [3, 1]]}\n'),
+)
+MODULOS_PESADOS = ("pandas", "pulp")
+PRESUPUESTO_ARRANQUE = 0.25  # Segundos por sobre el intérprete vacío
+
+CAMPOS = ("problema", "instancia", "tamano", "motor", "repeticion",
+          "tiempo", "memoria_pico", "iteraciones", "costo")
+
+def generar_costos(instancia, tamano, aleatorio):
+    """Matriz de costos cuadrada de la clase 'instancia'.
+
+    Las instancias densas son listas de listas de enteros; la dispersa es
+    una MatrizDispersa que contiene siempre una permutación, para que
+    exista una asignación factible.
+    """
+    n = tamano
+    if instancia == INSTANCIA_ALEATORIA:
+        return [[aleatorio.randint(0, COSTO_MAXIMO) for j in range(n)]
+                for i in range(n)]
+    if instancia == INSTANCIA_MACHOL_WAGNER:
+        # c[i][j] = (i + 1)·(j + 1), el peor caso conocido del método
+        # húngaro
+        return [[(i + 1) * (j + 1) for j in range(n)] for i in range(n)]
+    if instancia == INSTANCIA_RANGO_BAJO:
+        # Suma de dos productos externos: muchas soluciones casi óptimas
+        a = [[aleatorio.randint(0, 30) for i in range(n)] for k in range(2)]
+        b = [[aleatorio.randint(0, 30) for j in range(n)] for k in range(2)]
+        return [[a[0][i] * b[0][j] + a[1][i] * b[1][j] for j in range(n)]
+                for i in range(n)]
+    if instancia == INSTANCIA_EMPATES:
+        return [[aleatorio.randint(0, 2) for j in range(n)] for i in range(n)]
+    if instancia == INSTANCIA_DISPERSA:
+        permutacion = list(range(n))
+        aleatorio.shuffle(permutacion)
+        filas, columnas, costos = [], [], []
+        for i in range(n):
+            elegidas = {permutacion[i]}
+            for k in range(min(n, RUTAS_POR_FILA)):
+                elegidas.add(aleatorio.randrange(n))
+            for j in sorted(elegidas):
+                filas.append(i)
+                columnas.append(j)
+                costos.append(aleatorio.randint(0, COSTO_MAXIMO))
+        return MatrizDispersa(filas, columnas, costos, (n, n))
+    raise ValueError("Instancia desconocida: %r" % (instancia,))
+
+def generar_transporte(instancia, tamano, aleatorio):
+    """Problema de transporte con 'tamano' orígenes y destinos.
+
+    Devuelve la tupla (oferta, demanda, costos).  La oferta total alcanza
+    para la demanda; en las instancias dispersas, cada origen puede cubrir
+    por sí solo la demanda de cualquiera de sus destinos, en particular la
+    del que le toca en la permutación incluida.
+    """
+    costos = generar_costos(instancia, tamano, aleatorio)
+    demanda = [aleatorio.randint(1, 100) for j in range(tamano)]
+    if isinstance(costos, MatrizDispersa):
+        destino_de = {}
+        for i, j in zip(costos.filas, costos.columnas):
+            destino_de.setdefault(i, []).append(j)
+        oferta = [max(demanda[j] for j in destino_de[i])
+                  + aleatorio.randint(0, 20) for i in range(tamano)]
+    else:
+        oferta = [aleatorio.randint(1, 100) for i in range(tamano)]
+        faltante = sum(demanda) - sum(oferta)
+        if faltante > 0:
+            oferta[aleatorio.randrange(tamano)] += faltante
+    return oferta, demanda, costos
+
+def costo_asignacion(costos, asignaciones):
+    if isinstance(costos, MatrizDispersa):
+        costo_de = {(i, j): c for i, j, c in zip(costos.filas, costos.columnas,
+                                                  costos.costos)}
+        return sum(costo_de[par] for par in asignaciones)
+    return sum(costos[i][j] for i, j in asignaciones)
+
+def preparar(problema, motor, datos):
+    """Devuelve (resolver, contar): funciones sin argumentos que resuelven
+    el problema y que devuelven el costo y las iteraciones.
+
+    'contar' vuelve a resolver con mh.Estadisticas para obtener las
+    iteraciones (pasadas de marcado, caminos de aumento en el método de
+    caminos o rondas de ofertas en el de subasta; None si el motor no las
+    informa); no se cronometra.
+    """
+    if problema == PROBLEMA_ASIGNACION:
+        costos = datos
+        if motor in (MOTOR_CAMINOS_ARREGLO, MOTOR_SUBASTA):
+            import numpy as np
+            arreglo = np.array(costos)
+            metodo = (MOTOR_CAMINOS if motor == MOTOR_CAMINOS_ARREGLO
+                      else motor)
+            def resolver():
+                return costo_asignacion(costos,
+                                        mh.hungaro(arreglo, metodo=metodo))
+        else:
+            def resolver():
+                return costo_asignacion(costos,
+                                        mh.hungaro(costos, metodo=motor))
+        def contar():
+            if isinstance(costos, MatrizDispersa):
+                return None
+            estadisticas = mh.Estadisticas()
+            if motor == MOTOR_MARCADO:
+                mh.hungaro(costos, estadisticas=estadisticas)
+                return estadisticas.contadores["pasadas_marcado"]
+            if motor == MOTOR_SUBASTA:
+                mh.hungaro(arreglo, metodo=motor, estadisticas=estadisticas)
+                return estadisticas.contadores["rondas_subasta"]
+            mh.hungaro(arreglo if motor == MOTOR_CAMINOS_ARREGLO else costos,
+                       metodo=MOTOR_CAMINOS, estadisticas=estadisticas)
+            return estadisticas.contadores["aumentos"]
+        return resolver, contar
+
+    import transporte as trans
+    oferta, demanda, costos = datos
+    if motor == MOTOR_PULP:
+        nombres_origen = ["O%d" % i for i in range(len(oferta))]
+        nombres_destino = ["D%d" % j for j in range(len(demanda))]
+        def resolver():
+            resultado = trans.costo_transporte_ruta_minima(
+                dict(zip(nombres_origen, oferta)),
+                dict(zip(nombres_destino, demanda)),
+                nombres_origen, nombres_destino,
+                {o: dict(zip(nombres_destino, fila))
+                 for o, fila in zip(nombres_origen, costos)},
+                mensajes=False)
+            return resultado.costo_total
+    elif motor == MOTOR_CBC:
+        def resolver():
+            return trans.transporte_cbc(oferta, demanda, costos).costo_total
+    else:
+        def resolver():
+            return trans.transporte_vogel(oferta, demanda, costos).costo_total
+    return resolver, lambda: None
+
+def medir(resolver, contar, memoria=True, limite=None):
+    """Ejecuta una medición y devuelve (costo, tiempo, memoria_pico,
+    iteraciones).
+
+    El tiempo se toma en una ejecución sin seguimiento; la memoria pico
+    (en bytes, según tracemalloc: no incluye procesos externos como CBC)
+    y las iteraciones, en ejecuciones aparte, que se omiten (None) si la
+    primera tardó más de 'limite' segundos.
+    """
+    gc.collect()
+    inicio = time.perf_counter()
+    costo = resolver()
+    tiempo = time.perf_counter() - inicio
+    if limite is not None and tiempo > limite:
+        return costo, tiempo, None, None
+    memoria_pico = None
+    if memoria:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            resolver()
+            memoria_pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return costo, tiempo, memoria_pico, contar()
+
+def ejecutar(problemas=(PROBLEMA_ASIGNACION, PROBLEMA_TRANSPORTE),
+             instancias=INSTANCIAS, tamanos=TAMANOS, motores=None,
+             repeticiones=1, semilla=0, limite=LIMITE, memoria=True,
+             funcion_avance=None):
+    """Generador de mediciones, un diccionario con los CAMPOS por ejecución.
+
+    Cada instancia depende sólo de la semilla, la clase y el tamaño, así
+    que todos los motores y todas las corridas con la misma semilla
+    resuelven los mismos datos.  Si un motor tarda más de 'limite'
+    segundos en un tamaño (None: sin límite), no se prueba con tamaños
+    mayores de esa clase; tampoco se prueba con tamaños mayores que los de
+    TAMANOS_MAXIMOS.  'funcion_avance', si se da, recibe cada medición al
+    terminarla.
+    """
+    for problema in problemas:
+        motores_problema = [motor for motor in MOTORES[problema]
+                            if motores is None or motor in motores]
+        for instancia in instancias:
+            excedidos = set()
+            for tamano in sorted(tamanos):
+                motores_tamano = [
+                    motor for motor in motores_problema
+                    if motor not in excedidos
+                    and tamano <= TAMANOS_MAXIMOS.get(motor, tamano)
+                    and not (instancia == INSTANCIA_DISPERSA
+                             and motor in MOTORES_DENSOS)]
+                if not motores_tamano:
+                    continue
+                aleatorio = random.Random("%s-%s-%s-%s" % (
+                    semilla, problema, instancia, tamano))
+                if problema == PROBLEMA_ASIGNACION:
+                    datos = generar_costos(instancia, tamano, aleatorio)
+                else:
+                    datos = generar_transporte(instancia, tamano, aleatorio)
+                for motor in motores_tamano:
+                    resolver, contar = preparar(problema, motor, datos)
+                    for repeticion in range(repeticiones):
+                        costo, tiempo, memoria_pico, iteraciones = \
+                            medir(resolver, contar, memoria, limite)
+                        medicion = dict(zip(CAMPOS, (
+                            problema, instancia, tamano, motor, repeticion,
+                            tiempo, memoria_pico, iteraciones, costo)))
+                        if funcion_avance is not None:
+                            funcion_avance(medicion)
+                        yield medicion
+                        if limite is not None and tiempo > limite:
+                            excedidos.add(motor)
+                            break
+
+def escribir_resultados(mediciones, archivo):
+    """Guarda las mediciones en CSV si 'archivo' termina en .csv, y si no
+    en JSON junto con los datos del entorno."""
+    if archivo.lower().endswith(".csv"):
+        with open(archivo, "w", newline="", encoding="utf-8") as salida:
+            escritor = csv.DictWriter(salida, CAMPOS)
+            escritor.writeheader()
+            escritor.writerows(mediciones)
+        return
+    with open(archivo, "w", encoding="utf-8") as salida:
+        json.dump({"python": sys.version,
+                   "plataforma": platform.platform(),
+                   "mediciones": list(mediciones)}, salida, indent=1)
+
+def leer_resultados(archivo):
+    """Lee las mediciones guardadas con escribir_resultados."""
+    if archivo.lower().endswith(".csv"):
+        with open(archivo, newline="", encoding="utf-8") as entrada:
+            mediciones = list(csv.DictReader(entrada))
+        for medicion in mediciones:
+            medicion["tamano"] = int(medicion["tamano"])
+            for campo in ("tiempo", "memoria_pico", "iteraciones", "costo"):
+                valor = medicion[campo]
+                medicion[campo] = float(valor) if valor != "" else None
+        return mediciones
+    with open(archivo, encoding="utf-8") as entrada:
+        return json.load(entrada)["mediciones"]
+
+def resumir(mediciones):
+    """Agrupa las repeticiones: {(problema, instancia, tamano, motor):
+    (menor tiempo, mayor memoria pico, iteraciones, costo)}."""
+    resumen = {}
+    for medicion in mediciones:
+        clave = tuple(medicion[campo] for campo in CAMPOS[:4])
+        tiempo, memoria_pico = medicion["tiempo"], medicion["memoria_pico"]
+        if clave in resumen:
+            anterior = resumen[clave]
+            tiempo = min(tiempo, anterior[0])
+            if anterior[1] is not None:
+                memoria_pico = max(memoria_pico or 0, anterior[1])
+        resumen[clave] = (tiempo, memoria_pico, medicion["iteraciones"],
+                          medicion["costo"])
+    return resumen
+
+def comparar(base, nueva, umbral=0.1, diferencia_minima=1e-3):
+    """Compara dos listas de mediciones caso por caso.
+
+    Devuelve una lista ordenada de tuplas (clave, tiempo_base, tiempo_nuevo,
+    razon, regresion), con la clave de resumir; 'regresion' es True si el
+    menor tiempo nuevo supera al de base en más de 'umbral' (fracción) y
+    en más de 'diferencia_minima' segundos, para no confundir el ruido de
+    los casos pequeños con regresiones, o si el costo obtenido cambió.
+    """
+    resumen_base = resumir(base)
+    resumen_nuevo = resumir(nueva)
+    filas = []
+    for clave in sorted(resumen_base.keys() & resumen_nuevo.keys(),
+                        key=lambda clave: tuple(map(str, clave[:2]))
+                                          + (clave[2], clave[3])):
+        tiempo_base, _, _, costo_base = resumen_base[clave]
+        tiempo_nuevo, _, _, costo_nuevo = resumen_nuevo[clave]
+        razon = tiempo_nuevo / tiempo_base if tiempo_base > 0 else 1.0
+        regresion = (razon > 1 + umbral
+                     and tiempo_nuevo - tiempo_base > diferencia_minima) or (
+            costo_base is not None and costo_nuevo is not None
+            and abs(costo_nuevo - costo_base) > 1e-6 * max(1, abs(costo_base)))
+        filas.append((clave, tiempo_base, tiempo_nuevo, razon, regresion))
+    return filas
+
+def medir_arranque(argumentos, entrada="", repeticiones=5):
+    """Mide el arranque de cli.py en procesos nuevos.
+
+    Ejecuta cli.py con 'argumentos' y 'entrada' como entrada estándar, y
+    devuelve la tupla (tiempo, modulos): el menor tiempo de las
+    repeticiones menos el de un intérprete que no hace nada, y el conjunto
+    de paquetes de primer nivel importados (según -X importtime).
+    """
+    programa = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "cli.py")
+    def ejecutar_proceso(comando):
+        inicio = time.perf_counter()
+        proceso = subprocess.run(comando, input=entrada, capture_output=True,
+                                 text=True, check=True)
+        return time.perf_counter() - inicio, proceso.stderr
+    vacio = min(ejecutar_proceso([sys.executable, "-c", "pass"])[0]
+                for repeticion in range(repeticiones))
+    tiempo = min(ejecutar_proceso([sys.executable, programa, *argumentos])[0]
+                 for repeticion in range(repeticiones))
+    registro = ejecutar_proceso([sys.executable, "-X", "importtime",
+                                 programa, *argumentos])[1]
+    modulos = {linea.rsplit("|", 1)[1].strip().split(".")[0]
+               for linea in registro.splitlines()
+               if linea.startswith("import time:") and "|" in linea}
+    return max(0.0, tiempo - vacio), modulos
+
+def mostrar_medicion(medicion):
+    memoria_pico = medicion["memoria_pico"]
+    print("%-11s %-14s %5d %-16s %10.4f s %10s %8s" % (
+        medicion["problema"], medicion["instancia"], medicion["tamano"],
+        medicion["motor"], medicion["tiempo"],
+        "-" if memoria_pico is None else "%.1f MiB" % (memoria_pico / 2**20),
+        "-" if medicion["iteraciones"] is None else medicion["iteraciones"]),
+        flush=True)
+
+def mostrar_comparacion(filas):
+    for clave, tiempo_base, tiempo_nuevo, razon, regresion in filas:
+        print("%-11s %-14s %5d %-16s %10.4f s %10.4f s %6.2fx%s" % (
+            clave + (tiempo_base, tiempo_nuevo, razon,
+                     "  <- REGRESIÓN" if regresion else "")))
+
+def main(argumentos=None):
+    analizador = argparse.ArgumentParser(
+        description="Mide el rendimiento de los métodos de asignación y"
+                    " transporte.")
+    subcomandos = analizador.add_subparsers(dest="comando", required=True)
+
+    ejecucion = subcomandos.add_parser("ejecutar", help="realiza mediciones")
+    ejecucion.add_argument("--problemas", nargs="+", choices=tuple(MOTORES),
+                           default=tuple(MOTORES))
+    ejecucion.add_argument("--instancias", nargs="+", choices=INSTANCIAS,
+                           default=INSTANCIAS)
+    ejecucion.add_argument("--tamanos", nargs="+", type=int, default=TAMANOS)
+    ejecucion.add_argument("--motores", nargs="+",
+                           choices=sum(MOTORES.values(), ()))
+    ejecucion.add_argument("--repeticiones", type=int, default=1)
+    ejecucion.add_argument("--semilla", type=int, default=0)
+    ejecucion.add_argument("--limite", type=float, default=LIMITE,
+                           help="segundos tras los cuales un motor no se"
+                                " prueba con tamaños mayores (0: sin"
+                                " límite)")
+    ejecucion.add_argument("--sin-memoria", action="store_true",
+                           help="no mide la memoria pico (más rápido)")
+    ejecucion.add_argument("--salida", help="archivo .json o .csv")
+
+    comparacion = subcomandos.add_parser(
+        "comparar", help="compara dos archivos de mediciones")
+    comparacion.add_argument("base")
+    comparacion.add_argument("nuevo")
+    comparacion.add_argument("--umbral", type=float, default=0.1,
+                             help="aumento de tiempo tolerado (fracción)")
+    comparacion.add_argument("--diferencia-minima", type=float, default=1e-3,
+                             help="aumento de tiempo tolerado (segundos)")
+
+    arranque = subcomandos.add_parser(
+        "arranque", help="mide el arranque de cli.py; falla si supera el"
+                         " presupuesto o carga módulos pesados")
+    arranque.add_argument("--presupuesto", type=float,
+                          default=PRESUPUESTO_ARRANQUE,
+                          help="segundos tolerados por sobre el intérprete")
+    arranque.add_argument("--repeticiones", type=int, default=5)
+
+    opciones = analizador.parse_args(argumentos)
+    if opciones.comando == "arranque":
+        fallas = 0
+        for nombre, argumentos_cli, entrada in CASOS_ARRANQUE:
+            tiempo, modulos = medir_arranque(argumentos_cli, entrada,
+                                             opciones.repeticiones)
+            pesados = sorted(modulos.intersection(MODULOS_PESADOS))
+            falla = tiempo > opciones.presupuesto or pesados
+            fallas += bool(falla)
+            print("%-11s %10.4f s  %s%s" % (
+                nombre, tiempo, " ".join(pesados) or "-",
+                "  <- EXCEDE" if falla else ""))
+        return 1 if fallas else 0
+    if opciones.comando == "comparar":
+        filas = comparar(leer_resultados(opciones.base),
+                         leer_resultados(opciones.nuevo), opciones.umbral,
+                         opciones.diferencia_minima)
+        mostrar_comparacion(filas)
+        return 1 if any(fila[4] for fila in filas) else 0
+
+    mediciones = list(ejecutar(
+        opciones.problemas, opciones.instancias, opciones.tamanos,
+        opciones.motores, opciones.repeticiones, opciones.semilla,
+        opciones.limite or None, not opciones.sin_memoria, mostrar_medicion))
+    if opciones.salida is not None:
+        escribir_resultados(mediciones, opciones.salida)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
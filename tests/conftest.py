@@ -0,0 +1,6 @@
+# Los módulos del programa están en la raíz del repositorio, sin paquete
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+import pytest
+
+import rendimiento
+from conftest import RAIZ
+
+@pytest.mark.parametrize("nombre, argumentos, entrada",
+                         rendimiento.CASOS_ARRANQUE,
+                         ids=[caso[0] for caso in rendimiento.CASOS_ARRANQUE])
+def test_arranque_cli(nombre, argumentos, entrada):
+    tiempo, modulos = rendimiento.medir_arranque(argumentos, entrada,
+                                                 repeticiones=3)
+    assert tiempo <= rendimiento.PRESUPUESTO_ARRANQUE
+    assert not modulos & set(rendimiento.MODULOS_PESADOS)
+
+@pytest.mark.parametrize("modulo", ["metodo_hungaro", "transporte", "cli"])
+def test_importar_no_carga_dependencias(modulo):
+    # En un proceso nuevo, sin las importaciones de las demás pruebas
+    codigo = ("import sys, %s; print(*sorted(nombre for nombre in "
+              "('numpy', 'pulp', 'pandas') if nombre in sys.modules))"
+              % modulo)
+    proceso = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ,
+                             capture_output=True, text=True, check=True)
+    assert proceso.stdout.split() == []
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+import metodo_hungaro as mh
+from asincrono import METODO_CBC, METODO_VOGEL, SolucionadorAsincrono
+
+def resolver(corrutina):
+    return asyncio.run(corrutina)
+
+def test_hungaro_concurrente():
+    matrices = [[[k, 1], [1, k]] for k in range(6)]
+    async def todas():
+        solucionador = SolucionadorAsincrono(2, tipo_pool=mh.POOL_HILOS)
+        return await asyncio.gather(*(solucionador.hungaro(matriz)
+                                      for matriz in matrices))
+    assert resolver(todas()) == [mh.hungaro(matriz) for matriz in matrices]
+
+@pytest.mark.parametrize("metodo", [METODO_VOGEL, METODO_CBC])
+def test_transporte(metodo):
+    async def una():
+        solucionador = SolucionadorAsincrono(1, tipo_pool=mh.POOL_HILOS)
+        return await solucionador.transporte([20, 30], [25, 25],
+                                             [[8, 6], [9, 12]],
+                                             metodo=metodo)
+    assert resolver(una()).costo_total == 20 * 6 + 25 * 9 + 5 * 12
+
+def test_cbc_falla(tmp_path):
+    ruta_cbc = tmp_path / "cbc"
+    ruta_cbc.write_text("#!/bin/sh\nexit 3\n")
+    ruta_cbc.chmod(0o755)
+    async def una():
+        solucionador = SolucionadorAsincrono(1, tipo_pool=mh.POOL_HILOS)
+        return await solucionador.transporte([1], [1], [[1]],
+                                             metodo=METODO_CBC,
+                                             ruta_cbc=str(ruta_cbc))
+    with pytest.raises(RuntimeError):
+        resolver(una())
+
+def test_funcion_pasos_no_admitida():
+    async def una():
+        solucionador = SolucionadorAsincrono(1, tipo_pool=mh.POOL_HILOS)
+        return await solucionador.hungaro([[1]], funcion_pasos=True)
+    with pytest.raises(ValueError):
+        resolver(una())
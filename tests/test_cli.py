@@ -0,0 +1,92 @@
+import csv
+import json
+import subprocess
+import sys
+
+import cli
+from conftest import RAIZ
+
+def leer_jsonl(texto):
+    return [json.loads(linea) for linea in texto.splitlines()]
+
+def test_lote_asignacion(tmp_path, capsys):
+    entrada = tmp_path / "problemas.jsonl"
+    entrada.write_text('{"id": "a", "costos": [[4, 1], [2, 3]]}\n'
+                       '[[1, 2], [3]]\n'
+                       '\n'
+                       '{"costos": [[1, 2], [3, 4]], "minimizar": false}\n')
+    assert cli.lote(["asignacion", str(entrada)]) == 1
+    resultados = leer_jsonl(capsys.readouterr().out)
+    assert [resultado["indice"] for resultado in resultados] == [0, 1, 2]
+    assert resultados[0]["id"] == "a"
+    assert resultados[0]["costo"] == 3
+    assert "error" in resultados[1]
+    assert resultados[2]["costo"] == 5
+
+def test_lote_transporte_csv(tmp_path):
+    # La última columna es la oferta y la última fila la demanda; las
+    # celdas vacías son rutas inexistentes
+    entrada = tmp_path / "problemas.csv"
+    entrada.write_text(",6,20\n9,12,30\n25,25\n\n1,5\n5\n")
+    salida = tmp_path / "resultados.csv"
+    for metodo in ("vogel", "cbc"):
+        assert cli.lote(["transporte", str(entrada), "--salida", str(salida),
+                         "--metodo", metodo]) == 0
+        with open(salida, newline="") as archivo:
+            filas = list(csv.DictReader(archivo))
+        totales = [float(fila["costo"]) for fila in filas
+                   if fila["origen"] == ""]
+        assert totales == [25 * 9 + 20 * 6 + 5 * 12, 5]
+        assert all(fila["origen"] != "0" or fila["destino"] != "0"
+                   for fila in filas if fila["indice"] == "0")
+
+def test_lote_falla_del_solver(tmp_path, monkeypatch, capsys):
+    def falla(*argumentos, **opciones):
+        raise RuntimeError("CBC terminó con el código 1")
+    import transporte
+    monkeypatch.setattr(transporte, "transporte_cbc", falla)
+    entrada = tmp_path / "problemas.jsonl"
+    entrada.write_text(
+        '{"oferta": [1], "demanda": [1], "costos": [[1]]}\n' * 2)
+    assert cli.lote(["transporte", str(entrada), "--metodo", "cbc"]) == 1
+    resultados = leer_jsonl(capsys.readouterr().out)
+    assert len(resultados) == 2
+    assert all(resultado["error"].startswith("Falla del solver")
+               for resultado in resultados)
+
+def test_lote_archivo_inexistente(tmp_path, capsys):
+    archivo = str(tmp_path / "no_existe.jsonl")
+    assert cli.lote(["asignacion", archivo]) == 2
+    salida = capsys.readouterr()
+    assert salida.out == ""
+    assert archivo in salida.err
+
+def test_lote_salida_cerrada(tmp_path):
+    # Con la salida cerrada por el lector (como con head) se termina sin
+    # traza
+    entrada = tmp_path / "problemas.jsonl"
+    entrada.write_text('{"costos": [[4, 1], [2, 3]]}\n' * 20000)
+    with open(entrada) as problemas:
+        proceso = subprocess.Popen(
+            [sys.executable, "cli.py", "asignacion", "-"], cwd=RAIZ,
+            stdin=problemas, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True)
+    proceso.stdout.readline()
+    proceso.stdout.close()
+    errores = proceso.stderr.read()
+    proceso.stderr.close()
+    assert proceso.wait(timeout=60) == 1
+    assert errores == ""
+
+def test_lote_rutas(tmp_path, capsys):
+    rutas = tmp_path / "rutas.csv"
+    rutas.write_text("origen,destino,costo\nA,W,8\nA,X,6\nB,W,9\nB,X,12\n")
+    oferta = tmp_path / "oferta.csv"
+    oferta.write_text("nombre,oferta\nA,20\nB,30\n")
+    demanda = tmp_path / "demanda.csv"
+    demanda.write_text("nombre,demanda\nW,25\nX,25\n")
+    assert cli.lote(["rutas", str(rutas), "--oferta", str(oferta),
+                     "--demanda", str(demanda)]) == 0
+    filas = capsys.readouterr().out.splitlines()
+    assert filas[0] == "origen,destino,cantidad,costo"
+    assert float(filas[-1].rsplit(",", 1)[1]) == 20 * 6 + 25 * 9 + 5 * 12
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import metodo_hungaro as mh
+from memoizacion import CacheResultados, huella_matriz
+
+MATRIZ = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+
+def test_huella_ignora_la_representacion_de_los_numeros():
+    assert huella_matriz([[1, 2], [3, 4]]) \
+        == huella_matriz([["1", 2.0], [3, "4"]])
+    assert huella_matriz([[1, 2], [3, 4]]) != huella_matriz([[1, 2], [4, 3]])
+    # Listas y arreglos no comparten huella
+    assert huella_matriz([[1, 2], [3, 4]]) \
+        != huella_matriz(np.array([[1, 2], [3, 4]]))
+
+def test_hungaro_reutiliza_resultados():
+    cache = CacheResultados()
+    primero = cache.hungaro(MATRIZ)
+    assert primero == mh.hungaro(MATRIZ)
+    primero.append(None)  # Se devuelve una copia de la lista
+    assert cache.hungaro(MATRIZ) == mh.hungaro(MATRIZ)
+    estadisticas = cache.estadisticas()
+    assert estadisticas["aciertos"] == 1
+    assert estadisticas["fallos"] == 1
+
+def test_hungaro_distingue_las_opciones():
+    cache = CacheResultados()
+    assert cache.hungaro(MATRIZ, minimizar=False) \
+        == mh.hungaro(MATRIZ, minimizar=False)
+    asignaciones, u, v = cache.hungaro(MATRIZ, duales=True)
+    assert mh.verificar_asignacion(MATRIZ, asignaciones, u, v) == []
+    assert cache.hungaro(MATRIZ, costo_maximo=3) \
+        == mh.hungaro(MATRIZ, costo_maximo=3)
+    assert cache.estadisticas()["aciertos"] == 0
+
+def test_desalojo_lru():
+    cache = CacheResultados(max_entradas=2)
+    matrices = [[[k, 1], [1, k]] for k in range(3)]
+    for matriz in matrices:
+        cache.hungaro(matriz)
+    cache.hungaro(matrices[0])
+    estadisticas = cache.estadisticas()
+    assert estadisticas["entradas"] == 2
+    assert estadisticas["desalojos"] == 2
+    assert estadisticas["aciertos"] == 0
+
+def test_directorio_sobrevive_entre_caches(tmp_path):
+    CacheResultados(directorio=str(tmp_path)).hungaro(MATRIZ)
+    cache = CacheResultados(directorio=str(tmp_path))
+    assert cache.hungaro(MATRIZ) == mh.hungaro(MATRIZ)
+    assert cache.estadisticas()["aciertos_disco"] == 1
+    cache.limpiar(disco=True)
+    assert list(tmp_path.iterdir()) == []
+
+def test_transporte():
+    cache = CacheResultados()
+    oferta, demanda, costos = [20, 30], [25, 25], [[8, 6], [9, 12]]
+    for metodo in ("vogel", "cbc"):
+        resultado = cache.transporte(oferta, demanda, costos, metodo=metodo)
+        assert resultado.costo_total == 20 * 6 + 25 * 9 + 5 * 12
+        assert cache.transporte(oferta, demanda, costos,
+                                metodo=metodo) is resultado
+    assert cache.transporte(oferta, [20, 25], costos) is not resultado
+    with pytest.raises(ValueError):
+        cache.transporte(oferta, demanda, costos, metodo="simplex")
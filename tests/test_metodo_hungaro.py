@@ -0,0 +1,186 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+import metodo_hungaro as mh
+from flujo import MatrizDispersa
+
+INF = mh.INFINITO
+MOTORES = [mh.METODO_MARCADO, mh.METODO_CAMINOS]
+
+def costo_optimo(matriz, minimizar=True):
+    # Por fuerza bruta, para matrices chicas
+    elegir = min if minimizar else max
+    permutaciones = itertools.permutations(range(len(matriz)))
+    return elegir(sum(matriz[i][j] for i, j in enumerate(permutacion))
+                  for permutacion in permutaciones)
+
+def costo(matriz, asignaciones):
+    return sum(matriz[i][j] for i, j in asignaciones)
+
+def matrices_aleatorias(cantidad, semilla=0, prohibidas=0.0):
+    aleatorio = random.Random(semilla)
+    for k in range(cantidad):
+        n = aleatorio.randint(1, 6)
+        tope = aleatorio.choice([2, 10, 1000])
+        yield [[INF if aleatorio.random() < prohibidas
+                else aleatorio.randint(0, tope) for j in range(n)]
+               for i in range(n)]
+
+@pytest.mark.parametrize("metodo", MOTORES)
+@pytest.mark.parametrize("minimizar", [True, False])
+def test_motores_optimos(metodo, minimizar):
+    for matriz in matrices_aleatorias(200):
+        asignaciones = mh.hungaro([fila[:] for fila in matriz], minimizar,
+                                  metodo=metodo)
+        assert sorted(j for i, j in asignaciones) \
+            == list(range(len(matriz)))
+        assert costo(matriz, asignaciones) == costo_optimo(matriz, minimizar)
+
+def test_subasta_con_arreglos():
+    for matriz in matrices_aleatorias(100, semilla=1):
+        asignaciones = mh.hungaro(np.array(matriz),
+                                  metodo=mh.METODO_SUBASTA)
+        assert costo(matriz, asignaciones) == costo_optimo(matriz)
+
+@pytest.mark.parametrize("metodo", MOTORES)
+def test_rutas_prohibidas(metodo):
+    for matriz in matrices_aleatorias(300, semilla=2, prohibidas=0.3):
+        optimo = costo_optimo(matriz)
+        if optimo == INF:
+            with pytest.raises(ValueError):
+                mh.hungaro([fila[:] for fila in matriz], metodo=metodo)
+        else:
+            asignaciones = mh.hungaro([fila[:] for fila in matriz],
+                                      metodo=metodo)
+            assert costo(matriz, asignaciones) == optimo
+
+def test_machol_wagner_marcado():
+    n = 30
+    matriz = [[(i + 1) * (j + 1) for j in range(n)] for i in range(n)]
+    asignaciones = mh.hungaro(matriz)
+    # El óptimo empareja la fila i con la columna n - 1 - i
+    assert asignaciones == [(i, n - 1 - i) for i in range(n)]
+
+def test_funcion_pasos():
+    pasos = []
+    def registrar(matriz, marcas, filas_marcadas, columnas_marcadas,
+                  asignaciones, paso):
+        pasos.append(paso)
+    matriz = [[(i + 1) * (j + 1) for j in range(5)] for i in range(5)]
+    assert mh.hungaro(matriz, funcion_pasos=registrar) \
+        == [(i, 4 - i) for i in range(5)]
+    assert pasos[0] == mh.PASO_PROCESAR
+    assert pasos[-1] == mh.PASO_ASIGNACION_FINAL
+    assert mh.PASO_INICIO_MARCADO in pasos
+
+    # Devolver True detiene el método, con la asignación parcial
+    def detener(*argumentos):
+        return argumentos[-1] == mh.PASO_ASIGNACION_INICIAL
+    assert len(mh.hungaro(matriz, funcion_pasos=detener)) < 5
+
+def test_matriz_rectangular_se_completa():
+    asignaciones = mh.hungaro([[4, 1, 3], [2, 0, 5]])
+    assert asignaciones == [(0, 1), (1, 0), (2, 2)]
+
+def test_matriz_dispersa():
+    matriz = MatrizDispersa([0, 0, 1, 2, 2], [0, 2, 1, 0, 1],
+                            [5, 1, 2, 3, 9], (3, 3))
+    assert mh.asignacion_dispersa(matriz) == [(0, 2), (1, 1), (2, 0)]
+    assert mh.hungaro(matriz) == [(0, 2), (1, 1), (2, 0)]
+
+@pytest.mark.parametrize("metodo", MOTORES)
+@pytest.mark.parametrize("minimizar", [True, False])
+def test_duales_certifican_optimalidad(metodo, minimizar):
+    for matriz in matrices_aleatorias(100, semilla=3, prohibidas=0.2):
+        if costo_optimo(matriz) == INF:
+            continue
+        asignaciones, u, v = mh.hungaro([fila[:] for fila in matriz],
+                                        minimizar, metodo=metodo,
+                                        duales=True)
+        assert mh.verificar_asignacion(matriz, asignaciones, u, v,
+                                       minimizar) == []
+
+def test_verificar_asignacion_detecta_asignacion_no_optima():
+    matriz = [[4, 1], [2, 3]]
+    asignaciones, u, v = mh.hungaro(matriz, duales=True)
+    assert mh.verificar_asignacion(matriz, [(0, 0), (1, 1)], u, v) != []
+
+def test_modos_numericos():
+    matriz = [[0.1, 0.2, 0.3], [0.3, 0.1, 0.2], [0.2, 0.3, 0.1]]
+    for numerico in (mh.NUMERICO_AUTOMATICO, mh.NUMERICO_REAL):
+        asignaciones = mh.hungaro(matriz, numerico=numerico)
+        assert asignaciones == [(0, 0), (1, 1), (2, 2)]
+    assert mh.hungaro([[3, 1], [1, 3]], numerico=mh.NUMERICO_ENTERO) \
+        == [(0, 1), (1, 0)]
+
+def test_cuello_botella():
+    matriz = [[1, 9, 9], [9, 1, 9], [2, 2, 8]]
+    valor, asignaciones = mh.asignacion_cuello_botella(matriz)
+    assert valor == 8
+    assert asignaciones == [(0, 0), (1, 1), (2, 2)]
+
+def test_mejores_asignaciones_en_orden():
+    matriz = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+    costos = [valor for valor, asignaciones
+              in mh.mejores_asignaciones(matriz)]
+    todos = sorted(sum(matriz[i][j] for i, j in enumerate(permutacion))
+                   for permutacion in itertools.permutations(range(3)))
+    assert costos == todos
+
+def test_asignacion_incremental():
+    aleatorio = random.Random(4)
+    matriz = [[aleatorio.randint(0, 50) for j in range(6)] for i in range(6)]
+    incremental = mh.AsignacionIncremental(matriz)
+    for cambio in range(20):
+        i, j = aleatorio.randrange(6), aleatorio.randrange(6)
+        matriz[i][j] = aleatorio.randint(0, 50)
+        incremental.cambiar_costo(i, j, matriz[i][j])
+        assert costo(matriz, incremental.asignaciones()) \
+            == costo_optimo(matriz)
+
+def test_estadisticas():
+    metricas = []
+    estadisticas = mh.Estadisticas(metricas.append)
+    matriz = [[(i + 1) * (j + 1) for j in range(8)] for i in range(8)]
+    mh.hungaro(matriz, estadisticas=estadisticas)
+    mh.hungaro(matriz, metodo=mh.METODO_CAMINOS, estadisticas=estadisticas)
+    assert estadisticas.resoluciones == 2
+    assert estadisticas.contadores["pasadas_marcado"] > 0
+    assert estadisticas.contadores["aumentos"] > 0
+    assert [metrica["metodo"] for metrica in metricas] \
+        == [mh.METODO_MARCADO, mh.METODO_CAMINOS]
+    assert estadisticas.tiempos["total"] > 0
+
+@pytest.mark.parametrize("trabajadores", [0, 2])
+def test_lote_conserva_el_orden(trabajadores):
+    matrices = list(matrices_aleatorias(40, semilla=5))
+    minimizar = [k % 2 == 0 for k in range(len(matrices))]
+    resultados = mh.hungaro_lote(matrices, minimizar,
+                                 trabajadores=trabajadores,
+                                 tipo_pool=mh.POOL_HILOS, tamano_grupo=4)
+    for matriz, minimizar_matriz, asignaciones in zip(matrices, minimizar,
+                                                      resultados):
+        assert costo(matriz, asignaciones) \
+            == costo_optimo(matriz, minimizar_matriz)
+
+@pytest.mark.parametrize("minimizar", [[True], [True] * 4, "si"])
+def test_lote_exige_un_minimizar_por_matriz(minimizar):
+    matrices = [[[1, 2], [3, 4]]] * 3
+    with pytest.raises(ValueError):
+        mh.hungaro_lote(matrices, minimizar, trabajadores=0)
+    with pytest.raises(ValueError):
+        mh.hungaro_lote(iter(matrices), iter(minimizar), trabajadores=0)
+
+def test_lote_acepta_bool_de_numpy():
+    resultados = mh.hungaro_lote([[[1, 2], [3, 4]]] * 3, np.bool_(False),
+                                 trabajadores=0)
+    assert resultados == [[(0, 1), (1, 0)]] * 3
+
+def test_matriz_invalida():
+    with pytest.raises(ValueError):
+        mh.hungaro([[1, 2], [3]])
+    with pytest.raises(ValueError):
+        mh.hungaro([[INF, INF], [1, 2]])
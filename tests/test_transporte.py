@@ -0,0 +1,155 @@
+import random
+
+import numpy as np
+import pytest
+
+import transporte as trans
+from flujo import MatrizDispersa
+
+INF = float("inf")
+OFERTA = [20, 30, 25]
+DEMANDA = [10, 25, 15, 25]
+COSTOS = [[8, 6, 10, 9], [9, 12, 13, 7], [14, 9, 16, 5]]
+COSTO_OPTIMO = 585
+
+def problemas_aleatorios(cantidad, semilla=0, prohibidas=0.0):
+    aleatorio = random.Random(semilla)
+    for k in range(cantidad):
+        cant_origenes = aleatorio.randint(1, 6)
+        cant_destinos = aleatorio.randint(1, 6)
+        costos = [[INF if aleatorio.random() < prohibidas
+                   else aleatorio.randint(0, 20)
+                   for j in range(cant_destinos)]
+                  for i in range(cant_origenes)]
+        demanda = [aleatorio.randint(1, 30) for j in range(cant_destinos)]
+        oferta = [aleatorio.randint(1, 30) for i in range(cant_origenes)]
+        faltante = sum(demanda) - sum(oferta)
+        if faltante > 0:
+            oferta[0] += faltante
+        yield oferta, demanda, costos
+
+def envios(resultado, cant_origenes, cant_destinos):
+    plan = np.zeros((cant_origenes, cant_destinos))
+    plan[resultado.origenes, resultado.destinos] = resultado.cantidades
+    return plan
+
+@pytest.mark.parametrize("solver", [trans.transporte_vogel,
+                                    trans.transporte_cbc])
+def test_solvers_con_duales(solver):
+    resultado = solver(OFERTA, DEMANDA, COSTOS, duales=True)
+    assert resultado.estado == trans.ESTADO_OPTIMO
+    assert resultado.costo_total == COSTO_OPTIMO
+    assert trans.verificar_transporte(OFERTA, DEMANDA, COSTOS,
+                                      resultado) == []
+
+def test_pulp_con_nombres():
+    origenes, destinos = ["A", "B", "C"], ["W", "X", "Y", "Z"]
+    resultado = trans.costo_transporte_ruta_minima(
+        dict(zip(origenes, OFERTA)), dict(zip(destinos, DEMANDA)),
+        origenes, destinos,
+        {o: dict(zip(destinos, fila)) for o, fila in zip(origenes, COSTOS)},
+        duales=True)
+    assert resultado.estado == trans.ESTADO_OPTIMO
+    assert resultado.costo_total == COSTO_OPTIMO
+    assert trans.verificar_transporte(OFERTA, DEMANDA, COSTOS,
+                                      resultado) == []
+
+def test_vogel_y_cbc_coinciden():
+    for oferta, demanda, costos in problemas_aleatorios(40):
+        vogel = trans.transporte_vogel(oferta, demanda, costos, duales=True)
+        cbc = trans.transporte_cbc(oferta, demanda, costos)
+        assert vogel.costo_total == pytest.approx(cbc.costo_total)
+        assert trans.verificar_transporte(oferta, demanda, costos,
+                                          vogel) == []
+        plan = envios(vogel, len(oferta), len(demanda))
+        assert np.allclose(plan.sum(axis=0), demanda)
+        assert np.all(plan.sum(axis=1) <= np.array(oferta) + 1e-9)
+
+def test_rutas_prohibidas():
+    for oferta, demanda, costos in problemas_aleatorios(40, semilla=1,
+                                                        prohibidas=0.3):
+        cbc = trans.transporte_cbc(oferta, demanda, costos)
+        if cbc.estado != trans.ESTADO_OPTIMO:
+            continue
+        vogel = trans.transporte_vogel(oferta, demanda, costos)
+        assert vogel.costo_total == pytest.approx(cbc.costo_total)
+        plan = envios(cbc, len(oferta), len(demanda))
+        assert not np.any(plan[np.isinf(np.array(costos))])
+
+def test_disperso_coincide_con_denso():
+    filas, columnas = np.nonzero(np.ones((3, 4)))
+    matriz = MatrizDispersa(filas, columnas, np.array(COSTOS).ravel(),
+                            (3, 4))
+    resultado = trans.transporte_disperso(OFERTA, DEMANDA, matriz)
+    assert resultado.costo_total == COSTO_OPTIMO
+
+def test_oferta_insuficiente():
+    assert trans.transporte_vogel([5], [10], [[1]]).estado \
+        == trans.ESTADO_INFACTIBLE
+
+def test_dimensiones_invalidas():
+    with pytest.raises(ValueError):
+        trans.transporte_vogel([1, 2], [3], [[1]])
+    with pytest.raises(ValueError):
+        trans.transporte_cbc([1], [1], [[float("nan")]])
+
+def test_cbc_falla(tmp_path):
+    ruta_cbc = tmp_path / "cbc"
+    ruta_cbc.write_text("#!/bin/sh\nexit 3\n")
+    ruta_cbc.chmod(0o755)
+    with pytest.raises(RuntimeError):
+        trans.transporte_cbc(OFERTA, DEMANDA, COSTOS,
+                             ruta_cbc=str(ruta_cbc))
+
+def test_modelo_reoptimiza():
+    modelo = trans.ModeloTransporte(OFERTA, DEMANDA, COSTOS)
+    assert modelo.resolver().costo_total == COSTO_OPTIMO
+    costos = [fila[:] for fila in COSTOS]
+    costos[0][1] = 20
+    modelo.cambiar_costo(0, 1, 20)
+    demanda = DEMANDA[:]
+    demanda[2] = 5
+    modelo.cambiar_demanda(2, 5)
+    esperado = trans.transporte_vogel(OFERTA, demanda, costos)
+    assert modelo.resolver().costo_total \
+        == pytest.approx(esperado.costo_total)
+
+def test_modelo_rango_costo():
+    modelo = trans.ModeloTransporte(OFERTA, DEMANDA, COSTOS)
+    plan = envios(modelo.resolver(), 3, 4)
+    minimo, maximo = modelo.rango_costo(0, 0)
+    for costo in (minimo + 0.5, min(maximo, minimo + 50) - 0.5):
+        costos = [fila[:] for fila in COSTOS]
+        costos[0][0] = costo
+        resultado = trans.transporte_vogel(OFERTA, DEMANDA, costos)
+        assert resultado.costo_total \
+            == pytest.approx((plan * np.array(costos)).sum())
+
+def test_leer_rutas(tmp_path):
+    rutas = tmp_path / "rutas.csv"
+    rutas.write_text("origen,destino,costo\n"
+                     "A,W,8\nA,X,6\nB,W,9\nB,X,12\nC,X,9\nC,W,30\n"
+                     "A,W,7\n")
+    oferta = tmp_path / "oferta.csv"
+    oferta.write_text("nombre,oferta\nA,20\nB,30\nC,25\n")
+    instancia = trans.leer_rutas(str(rutas), str(oferta),
+                                 {"W": 10, "X": 25})
+    assert instancia.origenes == ["A", "B", "C"]
+    assert instancia.destinos == ["W", "X"]
+    assert instancia.oferta.tolist() == [20, 30, 25]
+    # La ruta repetida A-W conserva el menor costo
+    assert instancia.costos.costos.tolist() == [7, 6, 9, 12, 30, 9]
+    assert instancia.inicio.tolist() == [0, 2, 4, 6]
+    resultado = trans.transporte_vogel(instancia.oferta, instancia.demanda,
+                                       instancia.costos)
+    # A envía toda su oferta a X; W se cubre desde B
+    assert resultado.costo_total == 20 * 6 + 5 * 9 + 10 * 9
+
+def test_leer_rutas_invalidas(tmp_path):
+    rutas = tmp_path / "rutas.csv"
+    rutas.write_text("origen,destino,costo\nA,W,caro\n")
+    with pytest.raises(ValueError):
+        trans.leer_rutas(str(rutas), {"A": 1}, {"W": 1})
+    rutas.write_text("origen,costo\nA,1\n")
+    with pytest.raises(ValueError):
+        trans.leer_rutas(str(rutas), {"A": 1}, {"W": 1})
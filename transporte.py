@@ -1,28 +1,1281 @@
-import numpy as np
-import pandas as np
-from pulp import *
-from pandas import DataFrame
+import array
+import collections
+import csv
+import itertools
+import os
+import subprocess
+import tempfile
+from time import perf_counter
 
-def costo_transporte_ruta_minima(oferta, demanda, origen, destino, costo_envio):
+import flujo
+from flujo import MatrizDispersa
+
+# NumPy y PuLP tardan en importarse: las funciones que usan NumPy lo
+# importan al llamarse, y PuLP sólo lo usan costo_transporte_ruta_minima y
+# comando_cbc.  Los estados son los textos de pulp.LpStatus
+ESTADO_OPTIMO = "Optimal"
+ESTADO_INFACTIBLE = "Infeasible"
+ESTADO_INDEFINIDO = "Undefined"
+
+### Resultado de un problema de transporte.  Los envíos no nulos se guardan
+### en formato coordenado (COO): 'origenes' y 'destinos' son arreglos de
+### índices (según el orden de las listas de nombres o de la matriz de
+### costos) y 'cantidades' las cantidades enviadas por cada ruta.
+### 'precios_origen' y 'precios_destino' son los precios duales (sombra) de
+### las restricciones de oferta y demanda, o None si no se pidieron.
+### 'tiempos' es un diccionario con los segundos de construcción del
+### modelo y de resolución, cuando el solver los informa.
+ResultadoTransporte = collections.namedtuple(
+  "ResultadoTransporte",
+  "estado costo_total origenes destinos cantidades"
+  " precios_origen precios_destino tiempos",
+  defaults=(None,))
+
+### Instancia de transporte leída de archivos de rutas (ver leer_rutas).
+### 'oferta' y 'demanda' son arreglos indexados por los ids de los nodos y
+### 'costos' una MatrizDispersa de arreglos ordenada por origen y destino,
+### en formato CSR: las rutas del origen i son las posiciones inicio[i] a
+### inicio[i + 1] - 1.  'origenes' y 'destinos' son los nombres de cada id.
+InstanciaRutas = collections.namedtuple(
+  "InstanciaRutas", "oferta demanda costos inicio origenes destinos")
+
+COLUMNAS_RUTAS = ("origen", "destino", "costo")
+TAMANO_BLOQUE = 100000
+EXTENSIONES_PARQUET = (".parquet", ".pq")
+
+def costo_transporte_ruta_minima(oferta, demanda, origen, destino, costo_envio,
+                                 duales=False, mensajes=False):
+  """Resuelve el problema de transporte con PuLP y CBC.
+
+  'oferta', 'demanda' y 'costo_envio' son diccionarios indexados por los
+  nombres de 'origen' y 'destino'.  Devuelve un ResultadoTransporte, con
+  los precios duales si 'duales' es True.  No imprime nada, salvo el
+  registro de CBC si 'mensajes' es True; para mostrar el resultado se
+  puede usar mostrar_resultado.
+  """
+  import numpy as np
+  import pulp
+
+  inicio = perf_counter()
   ### Declaramos la función objetivo... nota que buscamos minimizar el costo(LpMinimize)
-  prob = LpProblem('Transporte', LpMinimize)
+  prob = pulp.LpProblem('Transporte', pulp.LpMinimize)
 
   rutas = [(i,j) for i in origen for j in destino]
-  cantidad = LpVariable.dicts('Cantidad de Envio',(origen,destino),0)
-  prob += lpSum(cantidad[i][j]*costo_envio[i][j] for (i,j) in rutas)
-  for j in destino:
-      prob += lpSum(cantidad[i][j] for i in origen) == demanda[j]
-  for i in origen:
-      prob += lpSum(cantidad[i][j] for j in destino) <= oferta[i]
-  ### Resolvemos e imprimimos el Status, si es Optimo, el problema tiene solución.
-  prob.solve()
-  print("Status:", LpStatus[prob.status])
+  cantidad = pulp.LpVariable.dicts('Cantidad de Envio',(origen,destino),0)
+  prob += pulp.lpSum(cantidad[i][j]*costo_envio[i][j] for (i,j) in rutas)
+  restricciones_demanda = [pulp.lpSum(cantidad[i][j] for i in origen)
+                           == demanda[j] for j in destino]
+  restricciones_oferta = [pulp.lpSum(cantidad[i][j] for j in destino)
+                          <= oferta[i] for i in origen]
+  for restriccion in restricciones_demanda + restricciones_oferta:
+    prob += restriccion
+  ### Resolvemos; si el Status es Optimo, el problema tiene solución.
+  construido = perf_counter()
+  prob.solve(pulp.PULP_CBC_CMD(msg=mensajes))
+  tiempos = {"construccion": construido - inicio,
+             "resolucion": perf_counter() - construido}
+
+  ### Leemos los envíos por índice, sin recorrer prob.variables()
+  plan = np.array([[cantidad[i][j].varValue or 0 for j in destino]
+                   for i in origen], dtype=np.float64)
+  precios_origen = precios_destino = None
+  if duales:
+    precios_origen = np.array([r.pi for r in restricciones_oferta])
+    precios_destino = np.array([r.pi for r in restricciones_demanda])
+  return resultado_desde_plan(pulp.LpStatus[prob.status], plan,
+                              pulp.value(prob.objective) or 0,
+                              precios_origen, precios_destino, tiempos)
+
+def transporte_cbc(oferta, demanda, costos, duales=False, ruta_cbc=None):
+  """Resuelve el problema de transporte con CBC sin armar objetos de PuLP.
+
+  Plantea el mismo modelo que costo_transporte_ruta_minima (demanda
+  exacta, oferta como cota superior), pero a partir de arreglos: el
+  archivo MPS se genera en bloque con una variable X<k> por ruta, siendo
+  k = origen * cantidad_destinos + destino, y la solución de CBC se lee
+  directamente.  'ruta_cbc' permite usar otro ejecutable de CBC; por
+  omisión se usa el que trae PuLP.
+
+  Devuelve un ResultadoTransporte con los mismos índices que 'costos', y
+  en 'tiempos' la construcción del modelo frente a la resolución.
+  """
+  inicio = perf_counter()
+  with tempfile.TemporaryDirectory() as directorio:
+    archivo_modelo = os.path.join(directorio, "transporte.mps")
+    archivo_solucion = os.path.join(directorio, "transporte.sol")
+    costos = escribir_modelo_cbc(archivo_modelo, oferta, demanda, costos)
+    construido = perf_counter()
+    proceso = subprocess.run(comando_cbc(archivo_modelo, archivo_solucion,
+                                         ruta_cbc),
+                             stdout=subprocess.DEVNULL)
+    if proceso.returncode != 0:
+      raise RuntimeError("CBC terminó con el código %d" % proceso.returncode)
+    tiempos = {"construccion": construido - inicio,
+               "resolucion": perf_counter() - construido}
+    return resultado_cbc(archivo_solucion, costos, duales, tiempos)
+
+def escribir_modelo_cbc(archivo_modelo, oferta, demanda, costos):
+  """Escribe el modelo MPS de transporte_cbc y devuelve los costos como
+  arreglo float64 (ver resultado_cbc).
+
+  Las rutas de costo infinito (prohibidas) no se escriben: su variable no
+  existe, como en transporte_disperso.
+  """
+  import numpy as np
+
+  costos = np.asarray(costos, dtype=np.float64)
+  oferta = np.asarray(oferta)
+  demanda = np.asarray(demanda)
+  cant_origenes, cant_destinos = costos.shape
+  if len(oferta) != cant_origenes or len(demanda) != cant_destinos:
+    raise ValueError("Las dimensiones de oferta, demanda y costos no "
+                     "coinciden")
+  if np.isnan(costos).any():
+    raise ValueError("Los elementos no son números")
+
+  ### Cada variable aparece en el objetivo, en su demanda y en su oferta;
+  ### las líneas se escriben a medida que se generan, y se formatean sobre
+  ### listas de Python (varias veces más rápido que sobre arreglos de texto).
+  ### La variable X<k> conserva su índice k aunque se omitan rutas
+  permitidas = np.flatnonzero(np.isfinite(costos.ravel()))
+  rutas = list(map(str, permitidas.tolist()))
+  filas = list(map(str, (permitidas // cant_destinos).tolist()))
+  columnas = list(map(str, (permitidas % cant_destinos).tolist()))
+  with open(archivo_modelo, "w") as archivo:
+    archivo.write("NAME TRANSPORTE\nROWS\n N COSTO\n")
+    archivo.writelines(" E D%d\n" % j for j in range(cant_destinos))
+    archivo.writelines(" L O%d\n" % i for i in range(cant_origenes))
+    archivo.write("COLUMNS\n")
+    archivo.writelines(map(" X%s COSTO %s D%s 1\n X%s O%s 1\n".__mod__,
+                           zip(rutas,
+                               map(repr, costos.ravel()[permitidas].tolist()),
+                               columnas, rutas, filas)))
+    archivo.write("RHS\n")
+    archivo.writelines(" RHS D%d %s\n" % (j, d)
+                       for j, d in enumerate(demanda.tolist()))
+    archivo.writelines(" RHS O%d %s\n" % (i, o)
+                       for i, o in enumerate(oferta.tolist()))
+    archivo.write("ENDATA\n")
+  return costos
+
+def comando_cbc(archivo_modelo, archivo_solucion, ruta_cbc=None):
+  """Argumentos para ejecutar CBC sobre el modelo de escribir_modelo_cbc."""
+  if ruta_cbc is None:
+    import pulp
+
+    ruta_cbc = pulp.PULP_CBC_CMD().path
+  return [ruta_cbc, archivo_modelo,
+          "-solve", "-printingOptions", "all", "-solu", archivo_solucion]
+
+def resultado_cbc(archivo_solucion, costos, duales=False, tiempos=None):
+  """Arma el ResultadoTransporte a partir del archivo de solución de CBC.
+
+  Si CBC no escribió la solución (p. ej. porque rechazó el modelo), se
+  lanza RuntimeError.
+  """
+  import numpy as np
+
+  cant_origenes, cant_destinos = costos.shape
+  try:
+    archivo = open(archivo_solucion)
+  except FileNotFoundError:
+    raise RuntimeError("CBC no escribió el archivo de solución")
+  with archivo:
+    estado, plan, precios_origen, precios_destino = \
+      leer_solucion_cbc(archivo, cant_origenes, cant_destinos)
+  ### Sólo las rutas usadas: 0 · infinito daría NaN
+  usadas = plan != 0
+  costo_total = (plan[usadas] * costos[usadas]).sum().item()
+  if not duales:
+    precios_origen = precios_destino = None
+  return resultado_desde_plan(estado, plan, costo_total, precios_origen,
+                              precios_destino, tiempos)
+
+def leer_solucion_cbc(archivo, cant_origenes, cant_destinos):
+  """Lee un archivo de solución de CBC generado por transporte_cbc.
+
+  Devuelve la tupla (estado, plan, precios_origen, precios_destino).  Las
+  líneas vacías se ignoran; si otra línea no tiene los cuatro campos de
+  CBC, se lanza ValueError.
+  """
+  import numpy as np
+
+  primera = archivo.readline()
+  if primera.startswith("Optimal"):
+    estado = ESTADO_OPTIMO
+  elif "infeasible" in primera.lower():
+    estado = ESTADO_INFACTIBLE
+  else:
+    estado = ESTADO_INDEFINIDO
+  plan = np.zeros(cant_origenes * cant_destinos)
+  precios_origen = np.zeros(cant_origenes)
+  precios_destino = np.zeros(cant_destinos)
+  for linea in archivo:
+    campos = linea.split()
+    if not campos:
+      continue
+    if campos[0] == "**":  # CBC marca así los valores no factibles
+      del campos[0]
+    if len(campos) < 4 or len(campos[1]) < 2:
+      raise ValueError("Línea inválida en la solución de CBC: %r"
+                       % linea.rstrip("\n"))
+    nombre, valor, dual = campos[1][0], campos[1][1:], campos[3]
+    if nombre == "X":
+      plan[int(valor)] = float(campos[2])
+    elif nombre == "D":
+      precios_destino[int(valor)] = float(dual)
+    else:
+      precios_origen[int(valor)] = float(dual)
+  return (estado, plan.reshape(cant_origenes, cant_destinos), precios_origen,
+          precios_destino)
+
+def resultado_desde_plan(estado, plan, costo_total, precios_origen=None,
+                         precios_destino=None, tiempos=None):
+  """Arma un ResultadoTransporte a partir de una matriz de envíos."""
+  import numpy as np
+
+  origenes, destinos = np.nonzero(plan)
+  return ResultadoTransporte(estado, costo_total, origenes, destinos,
+                             plan[origenes, destinos], precios_origen,
+                             precios_destino, tiempos)
+
+def mostrar_resultado(resultado, origen, destino):
+  """Imprime un ResultadoTransporte usando los nombres de los nodos."""
+  print("Status:", resultado.estado)
+  for i, j, cantidad in zip(resultado.origenes, resultado.destinos,
+                            resultado.cantidades):
+    print(origen[i], "->", destino[j], "=", cantidad)
+  print('El costo mínimo es:', resultado.costo_total)
+
+def transporte_vogel(oferta, demanda, costos, duales=False):
+  """Resuelve el problema de transporte sin un solver externo.
+
+  'oferta' y 'demanda' son secuencias de cantidades y 'costos' una matriz
+  (lista de listas o arreglo) con una fila por origen y una columna por
+  destino.  Si hay costos infinitos (rutas prohibidas) o 'costos' es una
+  matriz dispersa, se resuelve con transporte_disperso.  Si la oferta
+  total no coincide con la demanda total, se equilibra con un destino u
+  origen ficticio de costo cero.  Si falta oferta, el estado es
+  ESTADO_INFACTIBLE (como con PuLP), pero el plan devuelto cubre la mayor
+  demanda posible al menor costo.
+
+  La solución inicial se obtiene con la aproximación de Vogel y se mejora
+  con el método MODI (u-v) hasta el óptimo.  Devuelve un
+  ResultadoTransporte; si 'duales' es True incluye los potenciales u, v
+  como precios duales, normalizados como los de PuLP (cero en los
+  orígenes con oferta sobrante).
+  """
+  import numpy as np
+
+  if isinstance(costos, MatrizDispersa) or hasattr(costos, "tocoo"):
+    return transporte_disperso(oferta, demanda, costos, duales)
+  costos = np.asarray(costos)
+  if costos.dtype.kind not in "biuf":
+    costos = costos.astype(np.float64)
+  oferta = np.asarray(oferta)
+  demanda = np.asarray(demanda)
+  cant_origenes, cant_destinos = costos.shape
+  if len(oferta) != cant_origenes or len(demanda) != cant_destinos:
+    raise ValueError("Las dimensiones de oferta, demanda y costos no "
+                     "coinciden")
+  if (oferta < 0).any() or (demanda < 0).any():
+    raise ValueError("La oferta y la demanda no pueden ser negativas")
+  if costos.dtype.kind == "f" and np.isinf(costos).any():
+    ### Hay rutas prohibidas: se resuelve sólo con las permitidas
+    filas, columnas = np.nonzero(~np.isinf(costos))
+    return transporte_disperso(oferta, demanda, MatrizDispersa(
+      filas, columnas, costos[filas, columnas], costos.shape), duales)
+
+  ### Equilibramos con un nodo ficticio de costo cero
+  diferencia = oferta.sum() - demanda.sum()
+  if diferencia > 0:
+    costos = np.hstack([costos, np.zeros((cant_origenes, 1), costos.dtype)])
+    demanda = np.append(demanda, diferencia)
+  elif diferencia < 0:
+    costos = np.vstack([costos, np.zeros((1, cant_destinos), costos.dtype)])
+    oferta = np.append(oferta, -diferencia)
+
+  plan, base = aproximacion_vogel(oferta, demanda, costos)
+  u, v = optimizar_modi(costos, plan, base)
+  plan = plan[:cant_origenes, :cant_destinos]
+  costo_total = (plan * costos[:cant_origenes, :cant_destinos]).sum().item()
+  estado = ESTADO_INFACTIBLE if diferencia < 0 else ESTADO_OPTIMO
+  if not duales:
+    return resultado_desde_plan(estado, plan, costo_total)
+
+  ### Los potenciales se desplazan para que valgan como duales de la
+  ### oferta con <=: cero en el destino ficticio, o a lo sumo cero
+  desplazamiento = v[-1] if diferencia > 0 else -u.max()
+  u += desplazamiento
+  v -= desplazamiento
+  return resultado_desde_plan(estado, plan, costo_total, u[:cant_origenes],
+                              v[:cant_destinos])
+
+def transporte_disperso(oferta, demanda, costos, duales=False):
+  """Resuelve el problema de transporte sólo sobre las rutas permitidas.
+
+  'costos' es una MatrizDispersa (filas: orígenes, columnas: destinos) o
+  una matriz dispersa de SciPy con las rutas permitidas.  El modelo es el
+  de costo_transporte_ruta_minima (demanda exacta, oferta como cota) y se
+  resuelve como flujo de costo mínimo (ver flujo.flujo_costo_minimo), con
+  un costo que depende de la cantidad de rutas y no de orígenes x destinos.
+
+  Devuelve un ResultadoTransporte.  Si la demanda no se puede cubrir con
+  las rutas y ofertas dadas, el estado es ESTADO_INFACTIBLE, sin envíos y
+  con costo_total None.
+  """
+  import numpy as np
+
+  costos = flujo.validar_dispersa(costos)
+  cant_origenes, cant_destinos = costos.forma
+  if len(oferta) != cant_origenes or len(demanda) != cant_destinos:
+    raise ValueError("Las dimensiones de oferta, demanda y costos no "
+                     "coinciden")
+  oferta = np.asarray(oferta).tolist()
+  demanda = np.asarray(demanda).tolist()
+  if min(oferta) < 0 or min(demanda) < 0:
+    raise ValueError("La oferta y la demanda no pueden ser negativas")
+
+  ### Los destinos son las fuentes del flujo (deben recibir toda su demanda)
+  ### y los orígenes los sumideros (con capacidad igual a su oferta)
+  inicio, orden = flujo.ordenar_por(costos.columnas, cant_destinos)
+  try:
+    flujo_rutas, duales_destinos, duales_origenes = flujo.flujo_costo_minimo(
+      demanda, oferta, inicio, [costos.filas[k] for k in orden],
+      [costos.costos[k] for k in orden])
+  except ValueError:
+    vacio = np.zeros(0, dtype=int)
+    return ResultadoTransporte(ESTADO_INFACTIBLE, None, vacio, vacio,
+                               np.zeros(0), None, None)
+
+  usadas = [(k, cantidad) for k, cantidad in zip(orden, flujo_rutas)
+            if cantidad > 0]
+  origenes = np.array([costos.filas[k] for k, cantidad in usadas], dtype=int)
+  destinos = np.array([costos.columnas[k] for k, cantidad in usadas],
+                      dtype=int)
+  cantidades = np.array([cantidad for k, cantidad in usadas])
+  costo_total = sum(costos.costos[k] * cantidad for k, cantidad in usadas)
+  precios_origen = precios_destino = None
+  if duales:
+    precios_origen = np.array(duales_origenes, dtype=np.float64)
+    precios_destino = np.array(duales_destinos, dtype=np.float64)
+  return ResultadoTransporte(ESTADO_OPTIMO, costo_total, origenes, destinos,
+                             cantidades, precios_origen, precios_destino)
+
+def aproximacion_vogel(oferta, demanda, costos):
+  """Solución básica inicial de un problema equilibrado por Vogel.
+
+  En cada paso se elige la fila o columna con mayor penalización (la
+  diferencia entre sus dos costos activos más bajos) y se envía lo máximo
+  posible por su ruta más barata.  Cada fila guarda sus columnas ordenadas
+  por costo (y viceversa), de modo que los dos menores se obtienen
+  avanzando punteros en vez de recorrer la matriz en cada paso.
+
+  Devuelve la tupla (plan, base), donde base es la lista de las
+  cant_origenes + cant_destinos - 1 celdas básicas (incluye asignaciones
+  degeneradas de cantidad cero).
+  """
+  import numpy as np
+
+  cant_origenes, cant_destinos = costos.shape
+  tipo = np.result_type(oferta, demanda)
+  restante_oferta = oferta.astype(tipo)
+  restante_demanda = demanda.astype(tipo)
+  plan = np.zeros(costos.shape, dtype=tipo)
+  base = []
+  # Con cantidades reales, el redondeo puede dejar restos mínimos que no
+  # deben contar como oferta o demanda pendiente
+  tolerancia = 1e-9 * restante_oferta.sum() if tipo.kind == "f" else 0
+
+  ### Listas ordenadas por costo y punteros a la primera ruta activa
+  orden_filas = np.argsort(costos, axis=1, kind="stable")
+  orden_columnas = np.argsort(costos, axis=0, kind="stable").T
+  puntero_filas = [0] * cant_origenes
+  puntero_columnas = [0] * cant_destinos
+  fila_activa = np.ones(cant_origenes, dtype=bool)
+  columna_activa = np.ones(cant_destinos, dtype=bool)
+  # Menor y segundo menor activo de cada fila y columna (-1 si no hay)
+  menor_fila = np.full(cant_origenes, -1)
+  segundo_fila = np.full(cant_origenes, -1)
+  menor_columna = np.full(cant_destinos, -1)
+  segundo_columna = np.full(cant_destinos, -1)
+  penalizacion_fila = np.full(cant_origenes, -np.inf)
+  penalizacion_columna = np.full(cant_destinos, -np.inf)
+
+  def actualizar(indice, orden, punteros, activos, menor, segundo,
+                 penalizacion, costos_linea):
+    orden_linea = orden[indice]
+    p = punteros[indice]
+    while not activos[orden_linea[p]]:
+      p += 1
+    punteros[indice] = p
+    primero = orden_linea[p]
+    p += 1
+    while p < len(orden_linea) and not activos[orden_linea[p]]:
+      p += 1
+    menor[indice] = primero
+    if p < len(orden_linea):
+      segundo[indice] = orden_linea[p]
+      penalizacion[indice] = costos_linea[orden_linea[p]] \
+                             - costos_linea[primero]
+    else:
+      segundo[indice] = -1
+      penalizacion[indice] = costos_linea[primero]
+
+  for i in range(cant_origenes):
+    actualizar(i, orden_filas, puntero_filas, columna_activa,
+               menor_fila, segundo_fila, penalizacion_fila, costos[i])
+  for j in range(cant_destinos):
+    actualizar(j, orden_columnas, puntero_columnas, fila_activa,
+               menor_columna, segundo_columna, penalizacion_columna,
+               costos[:, j])
+
+  filas_restantes = cant_origenes
+  columnas_restantes = cant_destinos
+  while filas_restantes and columnas_restantes:
+    i = int(penalizacion_fila.argmax())
+    j = int(penalizacion_columna.argmax())
+    if penalizacion_fila[i] >= penalizacion_columna[j]:
+      j = int(menor_fila[i])
+    else:
+      i = int(menor_columna[j])
+    cantidad = min(restante_oferta[i], restante_demanda[j])
+    plan[i, j] = cantidad
+    base.append((i, j))
+    restante_oferta[i] -= cantidad
+    restante_demanda[j] -= cantidad
+
+    ### Se elimina una sola línea por paso (salvo en el último), para que
+    ### la base tenga cant_origenes + cant_destinos - 1 celdas
+    if restante_oferta[i] <= tolerancia and (restante_demanda[j] > tolerancia
+                                             or columnas_restantes == 1):
+      fila_activa[i] = False
+      penalizacion_fila[i] = -np.inf
+      filas_restantes -= 1
+      afectadas = np.flatnonzero(columna_activa & ((menor_columna == i)
+                                                   | (segundo_columna == i)))
+      if filas_restantes:
+        for k in afectadas.tolist():
+          actualizar(k, orden_columnas, puntero_columnas, fila_activa,
+                     menor_columna, segundo_columna, penalizacion_columna,
+                     costos[:, k])
+    else:
+      columna_activa[j] = False
+      penalizacion_columna[j] = -np.inf
+      columnas_restantes -= 1
+      afectadas = np.flatnonzero(fila_activa & ((menor_fila == j)
+                                                | (segundo_fila == j)))
+      if columnas_restantes:
+        for k in afectadas.tolist():
+          actualizar(k, orden_filas, puntero_filas, columna_activa,
+                     menor_fila, segundo_fila, penalizacion_fila, costos[k])
+  return plan, base
+
+def optimizar_modi(costos, plan, base, max_iteraciones=None):
+  """Lleva una solución básica al óptimo con el método MODI (u-v).
+
+  Calcula los potenciales u, v con u[i] + v[j] = costo en las celdas
+  básicas, busca la celda no básica de menor costo reducido y, si es
+  negativo, la hace entrar por el ciclo que forma con la base (el paso
+  'stepping stone').  Modifica 'plan' y 'base' en el lugar y devuelve los
+  potenciales finales (u, v).  Con 'max_iteraciones' se corta la mejora
+  luego de esa cantidad de pivotes.
+  """
+  import numpy as np
+
+  cant_origenes, cant_destinos = costos.shape
+  tolerancia = 1e-9 * max(1, np.abs(costos).max())
+  en_base = np.zeros(costos.shape, dtype=bool)
+  vecinos_fila = [[] for i in range(cant_origenes)]
+  vecinos_columna = [[] for j in range(cant_destinos)]
+  for i, j in base:
+    en_base[i, j] = True
+    vecinos_fila[i].append(j)
+    vecinos_columna[j].append(i)
+
+  u, v = potenciales_base(costos, vecinos_fila, vecinos_columna)
+  iteracion = 0
+  while True:
+    reducidos = costos - u[:, None]
+    reducidos -= v
+    reducidos[en_base] = 0
+    entrada = int(reducidos.argmin())
+    i, j = divmod(entrada, cant_destinos)
+    reducido = reducidos[i, j]
+    if reducido >= -tolerancia:
+      return u, v
+    if max_iteraciones is not None and iteracion >= max_iteraciones:
+      return u, v
+    iteracion += 1
+
+    ### Ciclo: la celda que entra más el camino de la base entre j e i
+    ciclo = camino_base(vecinos_fila, vecinos_columna, i, j)
+    restar = ciclo[1::2]
+    cantidad, salida = min((plan[celda], celda) for celda in restar)
+    for celda in ciclo[0::2]:
+      plan[celda] += cantidad
+    for celda in restar:
+      plan[celda] -= cantidad
+
+    i_salida, j_salida = salida
+    en_base[salida] = False
+    vecinos_fila[i_salida].remove(j_salida)
+    vecinos_columna[j_salida].remove(i_salida)
+    base.remove(salida)
+
+    ### Al quitar la celda que sale, la base queda partida en dos; sólo
+    ### cambian los potenciales de la parte que contiene a la columna j
+    filas, columnas = componente_base(vecinos_fila, vecinos_columna, j)
+    u[filas] -= reducido
+    v[columnas] += reducido
+
+    en_base[i, j] = True
+    vecinos_fila[i].append(j)
+    vecinos_columna[j].append(i)
+    base.append((i, j))
+
+def potenciales_base(costos, vecinos_fila, vecinos_columna):
+  """Potenciales u, v de una base (árbol) de transporte, con u[0] = 0."""
+  import numpy as np
+
+  cant_origenes, cant_destinos = costos.shape
+  u = [None] * cant_origenes
+  v = [None] * cant_destinos
+  u[0] = 0
+  pendientes = [(0, True)]
+  while pendientes:
+    k, es_fila = pendientes.pop()
+    if es_fila:
+      for j in vecinos_fila[k]:
+        if v[j] is None:
+          v[j] = costos[k, j].item() - u[k]
+          pendientes.append((j, False))
+    else:
+      for i in vecinos_columna[k]:
+        if u[i] is None:
+          u[i] = costos[i, k].item() - v[k]
+          pendientes.append((i, True))
+  return np.array(u, dtype=np.float64), np.array(v, dtype=np.float64)
+
+def flujos_base(oferta, demanda, base):
+  """Cantidades de las celdas de una base (árbol) para oferta y demanda dadas.
+
+  Se fija repetidamente una hoja del árbol: su única celda básica lleva
+  toda la cantidad restante de la hoja.  El problema debe estar
+  equilibrado; si la base no es factible para estos datos, algunas
+  cantidades resultan negativas.  Devuelve el plan completo.
+  """
+  import numpy as np
+
+  cant_origenes, cant_destinos = len(oferta), len(demanda)
+  restante_fila = np.array(oferta, dtype=np.float64)
+  restante_columna = np.array(demanda, dtype=np.float64)
+  vecinos_fila = [set() for i in range(cant_origenes)]
+  vecinos_columna = [set() for j in range(cant_destinos)]
+  for i, j in base:
+    vecinos_fila[i].add(j)
+    vecinos_columna[j].add(i)
+  plan = np.zeros((cant_origenes, cant_destinos))
+  hojas = [(i, True) for i in range(cant_origenes)
+           if len(vecinos_fila[i]) == 1]
+  hojas += [(j, False) for j in range(cant_destinos)
+            if len(vecinos_columna[j]) == 1]
+  while hojas:
+    k, es_fila = hojas.pop()
+    if es_fila:
+      if len(vecinos_fila[k]) != 1:  # La última hoja ya quedó sin celdas
+        continue
+      i, j = k, vecinos_fila[k].pop()
+      vecinos_columna[j].remove(i)
+      cantidad = restante_fila[i]
+      if len(vecinos_columna[j]) == 1:
+        hojas.append((j, False))
+    else:
+      if len(vecinos_columna[k]) != 1:
+        continue
+      i, j = vecinos_columna[k].pop(), k
+      vecinos_fila[i].remove(j)
+      cantidad = restante_columna[j]
+      if len(vecinos_fila[i]) == 1:
+        hojas.append((i, True))
+    plan[i, j] = cantidad
+    restante_fila[i] -= cantidad
+    restante_columna[j] -= cantidad
+  return plan
 
-  ### Imprimimos la solución
-  for v in prob.variables():
-      if v.varValue > 0:
-          print(v.name, "=", v.varValue)
-  print('El costo mínimo es:', value(prob.objective))
+def componente_base(vecinos_fila, vecinos_columna, j):
+  """Filas y columnas conectadas a la columna j en la base."""
+  filas = []
+  columnas = [j]
+  vistas_filas = set()
+  vistas_columnas = {j}
+  pendientes = [j]
+  while pendientes:
+    columna = pendientes.pop()
+    for fila in vecinos_columna[columna]:
+      if fila in vistas_filas:
+        continue
+      vistas_filas.add(fila)
+      filas.append(fila)
+      for otra in vecinos_fila[fila]:
+        if otra not in vistas_columnas:
+          vistas_columnas.add(otra)
+          columnas.append(otra)
+          pendientes.append(otra)
+  return filas, columnas
+
+def camino_base(vecinos_fila, vecinos_columna, i, j):
+  """Ciclo formado por la celda (i, j) y el camino de la base de j a i.
+
+  Devuelve las celdas del ciclo en orden, empezando por (i, j); las de
+  posición par reciben la cantidad que entra y las impares la ceden.
+  """
+  ### Búsqueda en anchura desde la columna j hasta la fila i
+  previo_fila = {}
+  previo_columna = {j: None}
+  pendientes = [(j, False)]
+  while i not in previo_fila:
+    siguientes = []
+    for k, es_fila in pendientes:
+      if es_fila:
+        for columna in vecinos_fila[k]:
+          if columna not in previo_columna:
+            previo_columna[columna] = k
+            siguientes.append((columna, False))
+      else:
+        for fila in vecinos_columna[k]:
+          if fila not in previo_fila:
+            previo_fila[fila] = k
+            siguientes.append((fila, True))
+    pendientes = siguientes
+
+  ciclo = [(i, j)]
+  fila = i
+  while True:
+    columna = previo_fila[fila]
+    ciclo.append((fila, columna))
+    fila = previo_columna[columna]
+    if fila is None:
+      break
+    ciclo.append((fila, columna))
+  return ciclo
+
+def costo_transporte_vogel(oferta, demanda, origen, destino, costo_envio,
+                           duales=False):
+  """Versión de costo_transporte_ruta_minima con el solver propio.
+
+  Recibe los mismos diccionarios y listas de nombres, y devuelve un
+  ResultadoTransporte cuyos índices siguen el orden de 'origen' y
+  'destino'.
+  """
+  costos = [[costo_envio[i][j] for j in destino] for i in origen]
+  return transporte_vogel([oferta[i] for i in origen],
+                          [demanda[j] for j in destino], costos, duales)
+
+def verificar_transporte(oferta, demanda, costos, resultado, tolerancia=None):
+  """Verifica el certificado de optimalidad de un ResultadoTransporte.
+
+  El resultado debe tener estado ESTADO_OPTIMO y precios duales, como los
+  que dan los solvers con duales=True.  Sin resolver de nuevo, se
+  comprueba para el modelo de costo_transporte_ruta_minima (demanda
+  exacta, oferta como cota):
+  - factibilidad primal: envíos no negativos por rutas existentes, que
+    cubren cada demanda sin superar ninguna oferta, y costo_total igual al
+    costo de los envíos;
+  - factibilidad dual: precios_origen <= 0 y precio_origen[i] +
+    precio_destino[j] <= costo en cada ruta;
+  - holgura complementaria: igualdad en las rutas con envío y precio nulo
+    en los orígenes con oferta sobrante.
+  Si todo se cumple, el plan es óptimo.  Cuesta O(orígenes x destinos)
+  con costos densos y O(rutas) con costos dispersos, mucho menos que
+  resolver.
+
+  'tolerancia' es el error absoluto admitido en cada comparación; por
+  omisión, 1e-9 veces el mayor costo, oferta o demanda (al menos 1e-9).
+  Devuelve la lista de problemas encontrados, vacía si el certificado es
+  válido.
+  """
+  import numpy as np
+
+  if resultado.estado != ESTADO_OPTIMO:
+    return ["El estado del resultado es %s" % resultado.estado]
+  if resultado.precios_origen is None or resultado.precios_destino is None:
+    raise ValueError("El resultado no tiene precios duales")
+  if isinstance(costos, MatrizDispersa) or hasattr(costos, "tocoo"):
+    dispersa = flujo.validar_dispersa(costos)
+    cant_origenes, cant_destinos = dispersa.forma
+    filas = np.array(dispersa.filas, dtype=np.int64)
+    columnas = np.array(dispersa.columnas, dtype=np.int64)
+    costos = np.array(dispersa.costos, dtype=np.float64)
+  else:
+    costos = np.asarray(costos, dtype=np.float64)
+    cant_origenes, cant_destinos = costos.shape
+    filas, columnas = np.nonzero(np.isfinite(costos))
+    costos = costos[filas, columnas]
+  oferta = np.asarray(oferta, dtype=np.float64)
+  demanda = np.asarray(demanda, dtype=np.float64)
+  if len(oferta) != cant_origenes or len(demanda) != cant_destinos:
+    raise ValueError("Las dimensiones de oferta, demanda y costos no "
+                     "coinciden")
+  u = np.asarray(resultado.precios_origen, dtype=np.float64)
+  v = np.asarray(resultado.precios_destino, dtype=np.float64)
+  if u.shape != oferta.shape or v.shape != demanda.shape:
+    return ["Los precios duales no tienen el tamaño del problema"]
+  origenes = np.asarray(resultado.origenes, dtype=np.int64)
+  destinos = np.asarray(resultado.destinos, dtype=np.int64)
+  cantidades = np.asarray(resultado.cantidades, dtype=np.float64)
+  if ((origenes < 0) | (origenes >= cant_origenes) | (destinos < 0)
+      | (destinos >= cant_destinos)).any():
+    return ["Hay envíos fuera del problema"]
+  if tolerancia is None:
+    tolerancia = 1e-9 * max(1, np.abs(costos).max(initial=0),
+                            oferta.max(initial=0), demanda.max(initial=0))
+
+  ### Costo de la ruta de cada envío: la más barata si está repetida
+  claves = filas * cant_destinos + columnas
+  claves_envios = origenes * cant_destinos + destinos
+  costos_envios = np.full(len(claves_envios), np.inf)
+  if len(claves_envios):
+    orden = np.argsort(claves_envios)
+    ordenadas = claves_envios[orden]
+    posiciones = np.searchsorted(ordenadas, claves).clip(max=len(orden) - 1)
+    coinciden = ordenadas[posiciones] == claves
+    np.minimum.at(costos_envios, orden[posiciones[coinciden]],
+                  costos[coinciden])
+
+  problemas = []
+  envios = list(zip(origenes.tolist(), destinos.tolist()))
+  flujo.agregar_problema(problemas, "Envíos negativos",
+                         [envio for envio, cantidad in zip(envios, cantidades)
+                          if cantidad < -tolerancia])
+  sin_ruta = np.isinf(costos_envios)
+  flujo.agregar_problema(problemas, "Envíos por rutas inexistentes",
+                         [envio for envio, falta in zip(envios, sin_ruta)
+                          if falta])
+  enviado = np.bincount(origenes, cantidades, minlength=cant_origenes)
+  recibido = np.bincount(destinos, cantidades, minlength=cant_destinos)
+  flujo.agregar_problema(problemas, "Orígenes que envían más que su oferta",
+                         np.flatnonzero(enviado > oferta + tolerancia))
+  flujo.agregar_problema(problemas, "Destinos con demanda sin cubrir"
+                         " exactamente",
+                         np.flatnonzero(np.abs(recibido - demanda)
+                                        > tolerancia))
+  if not sin_ruta.any():
+    costo = (costos_envios * cantidades).sum()
+    if abs(costo - resultado.costo_total) \
+       > tolerancia * max(1, np.abs(cantidades).sum()):
+      problemas.append("El costo total no coincide con los envíos: %r en"
+                       " vez de %r" % (resultado.costo_total, costo.item()))
+
+  flujo.agregar_problema(problemas, "Precios de origen positivos",
+                         np.flatnonzero(u > tolerancia))
+  reducidos = costos - u[filas] - v[columnas]
+  infactibles = np.flatnonzero(reducidos < -tolerancia)
+  flujo.agregar_problema(problemas, "Rutas con precios mayores que el costo",
+                         list(zip(filas[infactibles].tolist(),
+                                  columnas[infactibles].tolist())))
+  holgura = ~sin_ruta & (cantidades > tolerancia) \
+            & (costos_envios - u[origenes] - v[destinos] > tolerancia)
+  flujo.agregar_problema(problemas, "Envíos por rutas con precios menores"
+                         " que el costo",
+                         [envio for envio, mala in zip(envios, holgura)
+                          if mala])
+  flujo.agregar_problema(problemas, "Precios no nulos en orígenes con"
+                         " oferta sobrante",
+                         np.flatnonzero((enviado < oferta - tolerancia)
+                                        & (u < -tolerancia)))
+  return problemas
+
+class ModeloTransporte:
+  """Problema de transporte que conserva su base óptima entre escenarios.
+
+  Resuelve como transporte_vogel (Vogel y MODI) y guarda el plan, la base
+  y los potenciales.  Los cambios de oferta, demanda o costos se aplican
+  con cambiar_oferta, cambiar_demanda y cambiar_costo, y resolver
+  re-optimiza partiendo de la base anterior:
+  - Si sólo cambian costos, la base sigue siendo factible y MODI continúa
+    desde ella (suelen bastar pocos pivotes).
+  - Si sólo cambian cantidades, los potenciales siguen siendo óptimos para
+    los costos; se recalculan las cantidades de la base y, si alguna queda
+    negativa, se corrige con el simplex dual sobre el árbol de la base.
+  - Si cambian ambas y la base no sirve para ninguno de los dos métodos,
+    se resuelve desde cero.
+
+  Para no resolver escenarios que no cambian el plan, costos_reducidos,
+  precios y los métodos rango_* informan la sensibilidad de la solución
+  actual: dentro de esos rangos la base sigue siendo óptima y el costo
+  total varía según los precios duales.
+
+  Internamente el problema se equilibra con un origen ficticio (con la
+  demanda total como oferta) y un destino ficticio (con la oferta total
+  como demanda), así que la estructura no cambia al pasar de sobrante a
+  faltante de oferta.  El origen ficticio cubre la demanda faltante con un
+  costo de penalización mayor que cualquier diferencia entre planes, por
+  lo que, como en transporte_vogel, se cubre la mayor demanda posible al
+  menor costo y el estado es ESTADO_INFACTIBLE si falta oferta.
+
+  Sólo admite matrices densas sin rutas prohibidas.
+  """
+
+  def __init__(self, oferta, demanda, costos):
+    import numpy as np
+
+    costos = np.array(costos, dtype=np.float64)
+    oferta = np.array(oferta, dtype=np.float64)
+    demanda = np.array(demanda, dtype=np.float64)
+    if costos.ndim != 2:
+      raise ValueError("La matriz de costos debe tener dos dimensiones")
+    cant_origenes, cant_destinos = costos.shape
+    if len(oferta) != cant_origenes or len(demanda) != cant_destinos:
+      raise ValueError("Las dimensiones de oferta, demanda y costos no"
+                       " coinciden")
+    if not np.isfinite(costos).all():
+      raise ValueError("ModeloTransporte no admite rutas prohibidas")
+    if (costos < 0).any():
+      raise ValueError("No puede haber costos negativos")
+    if (oferta < 0).any() or (demanda < 0).any():
+      raise ValueError("La oferta y la demanda no pueden ser negativas")
+    self.cant_origenes = cant_origenes
+    self.cant_destinos = cant_destinos
+    ### El último origen y el último destino son los ficticios
+    self._costos = np.zeros((cant_origenes + 1, cant_destinos + 1))
+    self._costos[:cant_origenes, :cant_destinos] = costos
+    self._oferta = np.append(oferta, demanda.sum())
+    self._demanda = np.append(demanda, oferta.sum())
+    self._actualizar_penalizacion()
+    self._resolver_desde_cero()
+
+  def cambiar_oferta(self, i, cantidad):
+    """Cambia la oferta del origen i."""
+    if not cantidad >= 0:
+      raise ValueError("La oferta y la demanda no pueden ser negativas")
+    self._demanda[-1] += cantidad - self._oferta[i]
+    self._oferta[i] = cantidad
+    self._cantidades_cambiadas = True
+
+  def cambiar_demanda(self, j, cantidad):
+    """Cambia la demanda del destino j."""
+    if not cantidad >= 0:
+      raise ValueError("La oferta y la demanda no pueden ser negativas")
+    self._oferta[-1] += cantidad - self._demanda[j]
+    self._demanda[j] = cantidad
+    self._cantidades_cambiadas = True
+
+  def cambiar_costo(self, i, j, costo):
+    """Cambia el costo de la ruta del origen i al destino j."""
+    import numpy as np
+
+    if not 0 <= costo < np.inf:
+      raise ValueError("Los costos deben ser números no negativos")
+    self._costos[i, j] = costo
+    self._actualizar_penalizacion()
+    self._costos_cambiados = True
+
+  def resolver(self, duales=False):
+    """Re-optimiza si hubo cambios y devuelve un ResultadoTransporte.
+
+    Los precios duales, si 'duales' es True, están normalizados como en
+    transporte_vogel.  'tiempos' tiene los segundos de la re-optimización.
+    """
+    inicio = perf_counter()
+    if self._cantidades_cambiadas or self._costos_cambiados:
+      self._reoptimizar()
+    tiempos = {"construccion": 0.0, "resolucion": perf_counter() - inicio}
+    plan = self._plan[:self.cant_origenes, :self.cant_destinos]
+    costo_total = (plan * self._costos[:self.cant_origenes,
+                                       :self.cant_destinos]).sum().item()
+    faltante = self._demanda[:-1].sum() > self._oferta[:-1].sum()
+    estado = ESTADO_INFACTIBLE if faltante else ESTADO_OPTIMO
+    precios_origen = precios_destino = None
+    if duales:
+      precios_origen, precios_destino = self.precios()
+    return resultado_desde_plan(estado, plan.copy(), costo_total,
+                                precios_origen, precios_destino, tiempos)
+
+  def precios(self):
+    """Precios duales (sombra) de la oferta y la demanda: lo que cambia el
+    costo total por unidad adicional de cada una, dentro de su rango."""
+    self._actualizar()
+    desplazamiento = self._v[-1]
+    return (self._u[:self.cant_origenes] + desplazamiento,
+            self._v[:self.cant_destinos] - desplazamiento)
+
+  def costos_reducidos(self):
+    """Matriz de costos reducidos (costo - u - v) de las rutas reales.
+
+    Una ruta sin envío sólo entraría al plan si su costo bajara más que
+    su costo reducido; en las rutas de la base es cero.
+    """
+    self._actualizar()
+    reducidos = self._reducidos()
+    return reducidos[:self.cant_origenes, :self.cant_destinos]
+
+  def rango_costo(self, i, j):
+    """Tupla (minimo, maximo) de costos de la ruta (i, j) con los que el
+    plan actual sigue siendo óptimo."""
+    import numpy as np
+
+    self._actualizar()
+    costo = self._costos[i, j]
+    if not self._en_base[i, j]:
+      return costo - self._reducidos()[i, j], np.inf
+    ### Al cambiar el costo de una celda básica se desplazan los
+    ### potenciales de la parte de la base que contiene a la columna j
+    filas, columnas = self._partes_sin_celda(i, j)
+    otras_filas = np.setdiff1d(np.arange(self.cant_origenes + 1), filas)
+    otras_columnas = np.setdiff1d(np.arange(self.cant_destinos + 1),
+                                  columnas)
+    reducidos = np.where(self._en_base, np.inf, self._reducidos())
+    bajar = reducidos[np.ix_(filas, otras_columnas)]
+    subir = reducidos[np.ix_(otras_filas, columnas)]
+    return (costo - (bajar.min() if bajar.size else np.inf),
+            costo + (subir.min() if subir.size else np.inf))
+
+  def rango_oferta(self, i):
+    """Tupla (minimo, maximo) de ofertas del origen i con las que la base
+    actual sigue siendo óptima; en ese rango el costo total cambia según
+    el precio dual del origen."""
+    self._actualizar()
+    return self._rango_cantidad(i, self.cant_destinos, self._oferta[i])
+
+  def rango_demanda(self, j):
+    """Tupla (minimo, maximo) de demandas del destino j con las que la base
+    actual sigue siendo óptima, como rango_oferta."""
+    self._actualizar()
+    return self._rango_cantidad(self.cant_origenes, j, self._demanda[j])
+
+  def _actualizar(self):
+    if self._cantidades_cambiadas or self._costos_cambiados:
+      self._reoptimizar()
+
+  def _actualizar_penalizacion(self):
+    ### La penalización supera al costo de cualquier camino de la base
+    maximo = self._costos[:-1, :-1].max(initial=0)
+    penalizacion = 1 + (self.cant_origenes + self.cant_destinos + 2) * maximo
+    if self._costos[-1, 0] < penalizacion \
+       or self._costos[-1, 0] > 4 * penalizacion:
+      self._costos[-1, :-1] = 2 * penalizacion
+
+  def _resolver_desde_cero(self):
+    import numpy as np
+
+    plan, base = aproximacion_vogel(self._oferta, self._demanda, self._costos)
+    self._u, self._v = optimizar_modi(self._costos, plan, base)
+    self._plan = plan.astype(np.float64)
+    self._base = base
+    self._en_base = np.zeros(self._costos.shape, dtype=bool)
+    for celda in base:
+      self._en_base[celda] = True
+    self._cantidades_cambiadas = False
+    self._costos_cambiados = False
+
+  def _reoptimizar(self):
+    tolerancia = 1e-9 * max(1, self._oferta.sum())
+    if self._cantidades_cambiadas:
+      self._plan = flujos_base(self._oferta, self._demanda, self._base)
+    if self._plan[self._en_base].min() >= -tolerancia:
+      ### Base factible: MODI continúa desde ella
+      self._plan[self._plan < 0] = 0
+      self._u, self._v = optimizar_modi(self._costos, self._plan, self._base)
+    else:
+      if self._costos_cambiados:
+        self._u, self._v = potenciales_base(self._costos,
+                                            *self._vecinos_base())
+      tolerancia_costos = -1e-9 * max(1, self._costos.max())
+      if self._reducidos().min() >= tolerancia_costos:
+        self._simplex_dual(tolerancia)
+      else:
+        self._resolver_desde_cero()
+        return
+    self._en_base[:] = False
+    for celda in self._base:
+      self._en_base[celda] = True
+    self._cantidades_cambiadas = False
+    self._costos_cambiados = False
+
+  def _simplex_dual(self, tolerancia):
+    ### Sale la celda básica más negativa; entra, entre las celdas que
+    ### reconectan las dos partes de la base en el sentido que aumenta a
+    ### la que sale, la de menor costo reducido, lo que mantiene todos los
+    ### costos reducidos no negativos
+    import numpy as np
+
+    vecinos_fila, vecinos_columna = self._vecinos_base()
+    while True:
+      cantidad, salida = min((self._plan[celda], celda)
+                             for celda in self._base)
+      if cantidad >= -tolerancia:
+        break
+      i, j = salida
+      filas, columnas = self._partes_sin_celda(i, j, vecinos_fila,
+                                               vecinos_columna)
+      otras_columnas = np.setdiff1d(np.arange(self.cant_destinos + 1),
+                                    columnas)
+      reducidos = self._reducidos()[np.ix_(filas, otras_columnas)]
+      k = int(reducidos.argmin())
+      fila_entrada = filas[k // len(otras_columnas)]
+      columna_entrada = int(otras_columnas[k % len(otras_columnas)])
+      reducido = reducidos.flat[k]
+
+      ciclo = camino_base(vecinos_fila, vecinos_columna, fila_entrada,
+                          columna_entrada)
+      for celda in ciclo[0::2]:
+        self._plan[celda] -= cantidad
+      for celda in ciclo[1::2]:
+        self._plan[celda] += cantidad
+      self._plan[salida] = 0
+      vecinos_fila[i].remove(j)
+      vecinos_columna[j].remove(i)
+      self._base.remove(salida)
+      entrada = (fila_entrada, columna_entrada)
+      vecinos_fila[fila_entrada].append(columna_entrada)
+      vecinos_columna[columna_entrada].append(fila_entrada)
+      self._base.append(entrada)
+
+      otras_filas = np.setdiff1d(np.arange(self.cant_origenes + 1), filas)
+      self._u[otras_filas] -= reducido
+      self._v[otras_columnas] += reducido
+
+  def _vecinos_base(self):
+    vecinos_fila = [[] for i in range(self.cant_origenes + 1)]
+    vecinos_columna = [[] for j in range(self.cant_destinos + 1)]
+    for i, j in self._base:
+      vecinos_fila[i].append(j)
+      vecinos_columna[j].append(i)
+    return vecinos_fila, vecinos_columna
+
+  def _partes_sin_celda(self, i, j, vecinos_fila=None, vecinos_columna=None):
+    ### Filas y columnas de la parte de la base que contiene a la columna j
+    ### al quitar la celda básica (i, j)
+    if vecinos_fila is None:
+      vecinos_fila, vecinos_columna = self._vecinos_base()
+    vecinos_fila[i].remove(j)
+    vecinos_columna[j].remove(i)
+    filas, columnas = componente_base(vecinos_fila, vecinos_columna, j)
+    vecinos_fila[i].append(j)
+    vecinos_columna[j].append(i)
+    return filas, columnas
+
+  def _reducidos(self):
+    reducidos = self._costos - self._u[:, None]
+    reducidos -= self._v
+    return reducidos
+
+  def _rango_cantidad(self, i, j, actual):
+    ### Una unidad más entre el origen i y el destino j recorre el camino
+    ### de la base entre ellos: suma en las celdas impares del ciclo de
+    ### camino_base y resta en las pares (sin contar la celda (i, j))
+    import numpy as np
+
+    ciclo = camino_base(*self._vecinos_base(), i, j)
+    suman = [self._plan[celda] for celda in ciclo[1::2]]
+    restan = [self._plan[celda] for celda in ciclo[2::2]]
+    return (actual - min(min(suman), actual),
+            actual + min(restan, default=np.inf))
+
+def leer_rutas(archivo_rutas, oferta, demanda, columnas=COLUMNAS_RUTAS,
+               tamano_bloque=TAMANO_BLOQUE):
+  """Lee una instancia de transporte de archivos de rutas CSV o Parquet.
+
+  'archivo_rutas' tiene un registro por ruta con el origen, el destino y
+  el costo, en las columnas de nombres (o posiciones) 'columnas'; los CSV
+  deben tener encabezado.  'oferta' y 'demanda' son diccionarios
+  nombre -> cantidad o archivos con el nombre en la primera columna y la
+  cantidad en la segunda.  El formato se deduce de la extensión (.parquet
+  o .pq; cualquier otra es CSV); Parquet requiere pyarrow, que se importa
+  al leerlo.
+
+  Las rutas se leen de a 'tamano_bloque' registros y se acumulan en
+  arreglos compactos (24 bytes por ruta, más los nombres de los nodos),
+  sin armar diccionarios de costos.  Los nombres se convierten en ids
+  enteros en el orden de la oferta y la demanda; los que sólo aparecen en
+  las rutas reciben los ids siguientes y cantidad 0.  Si una ruta se
+  repite, se conserva la más barata.
+
+  Devuelve una InstanciaRutas, que se resuelve con
+  transporte_vogel(instancia.oferta, instancia.demanda, instancia.costos)
+  y se muestra con mostrar_resultado(resultado, instancia.origenes,
+  instancia.destinos).  Si falta una columna o un costo o una cantidad no
+  es un número, se lanza ValueError.
+  """
+  import numpy as np
+
+  ids_origenes, oferta = _leer_cantidades(oferta, tamano_bloque)
+  ids_destinos, demanda = _leer_cantidades(demanda, tamano_bloque)
+  filas = array.array("q")
+  columnas_rutas = array.array("q")
+  costos = array.array("d")
+  for origenes, destinos, costos_bloque in _bloques_columnas(
+      archivo_rutas, columnas, tamano_bloque):
+    ### Un nombre nuevo recibe el id len(ids), que se evalúa antes de
+    ### agregarlo
+    filas.extend([ids_origenes.setdefault(nombre, len(ids_origenes))
+                  for nombre in origenes])
+    columnas_rutas.extend([ids_destinos.setdefault(nombre, len(ids_destinos))
+                           for nombre in destinos])
+    try:
+      costos.extend(map(float, costos_bloque))
+    except (TypeError, ValueError):
+      raise ValueError("Hay costos que no son números en %s" % archivo_rutas)
+  oferta += [0] * (len(ids_origenes) - len(oferta))
+  demanda += [0] * (len(ids_destinos) - len(demanda))
+
+  ### Orden por origen, destino y costo; de cada ruta repetida queda la
+  ### primera, que es la más barata
+  filas = np.frombuffer(filas, dtype=np.int64)
+  columnas_rutas = np.frombuffer(columnas_rutas, dtype=np.int64)
+  costos = np.frombuffer(costos, dtype=np.float64)
+  orden = np.lexsort((costos, columnas_rutas, filas))
+  filas = filas[orden]
+  columnas_rutas = columnas_rutas[orden]
+  costos = costos[orden]
+  del orden
+  if len(filas) > 1:
+    distintas = np.empty(len(filas), dtype=bool)
+    distintas[0] = True
+    np.not_equal(filas[1:], filas[:-1], out=distintas[1:])
+    distintas[1:] |= columnas_rutas[1:] != columnas_rutas[:-1]
+    if not distintas.all():
+      filas = filas[distintas]
+      columnas_rutas = columnas_rutas[distintas]
+      costos = costos[distintas]
+  inicio = np.searchsorted(filas, np.arange(len(ids_origenes) + 1))
+  return InstanciaRutas(
+    np.array(oferta), np.array(demanda),
+    MatrizDispersa(filas, columnas_rutas, costos,
+                   (len(ids_origenes), len(ids_destinos))),
+    inicio, list(ids_origenes), list(ids_destinos))
+
+def _leer_cantidades(cantidades, tamano_bloque):
+  # Devuelve el diccionario nombre -> id y la lista de cantidades por id
+  if isinstance(cantidades, dict):
+    return {nombre: k for k, nombre in enumerate(cantidades)}, \
+           list(cantidades.values())
+  ids = {}
+  lista = []
+  for nombres, valores in _bloques_columnas(cantidades, (0, 1), tamano_bloque):
+    for nombre, valor in zip(nombres, valores):
+      if nombre in ids:
+        raise ValueError("El nodo %r se repite en %s" % (nombre, cantidades))
+      ids[nombre] = len(lista)
+      lista.append(_cantidad(valor, cantidades))
+  return ids, lista
+
+def _cantidad(valor, archivo):
+  if isinstance(valor, str):
+    try:
+      return int(valor)
+    except ValueError:
+      pass
+  try:
+    return float(valor)
+  except (TypeError, ValueError):
+    raise ValueError("La cantidad %r de %s no es un número" % (valor, archivo))
+
+def _bloques_columnas(archivo, columnas, tamano_bloque):
+  # Produce, de a 'tamano_bloque' registros, una lista de valores por cada
+  # columna pedida (por nombre o posición)
+  if os.path.splitext(archivo)[1].lower() in EXTENSIONES_PARQUET:
+    import pyarrow.parquet as pq
+
+    lector = pq.ParquetFile(archivo)
+    nombres = lector.schema_arrow.names
+    nombres = [nombres[k] for k in _indices_columnas(nombres, columnas,
+                                                     archivo)]
+    for lote in lector.iter_batches(tamano_bloque, columns=nombres):
+      yield [lote.column(nombre).to_pylist() for nombre in nombres]
+    return
+  with open(archivo, newline="", encoding="utf-8") as entrada:
+    lector = csv.reader(entrada)
+    encabezado = [nombre.strip() for nombre in next(lector, [])]
+    indices = _indices_columnas(encabezado, columnas, archivo)
+    while True:
+      leidas = list(itertools.islice(lector, tamano_bloque))
+      if not leidas:
+        return
+      filas = [fila for fila in leidas if fila]  # Sin las líneas vacías
+      try:
+        bloque = [[fila[k].strip() for fila in filas] for k in indices]
+      except IndexError:
+        raise ValueError("Hay registros con menos columnas que el"
+                         " encabezado en %s" % archivo)
+      yield bloque
+
+def _indices_columnas(encabezado, columnas, archivo):
+  indices = []
+  for columna in columnas:
+    if isinstance(columna, int):
+      indice = columna
+    elif columna in encabezado:
+      indice = encabezado.index(columna)
+    else:
+      raise ValueError("Falta la columna %r en %s" % (columna, archivo))
+    if not 0 <= indice < len(encabezado):
+      raise ValueError("Falta la columna %d en %s" % (indice, archivo))
+    indices.append(indice)
+  return indices
+
+def leer_datos():
+  """Pide por consola los datos de un problema de transporte.
+
+  Devuelve la tupla (oferta, demanda, origen, destino, costo_envio) con
+  los argumentos que esperan costo_transporte_ruta_minima y
+  costo_transporte_vogel.
+  """
+  # ALMACENES Y OFERTAS
+  cantidad_origenes = input(">>> Ingrese la cantidad de almacenes: ")
+  ### Validar que sea un digito
+  while cantidad_origenes == "" or not cantidad_origenes.isdigit():
+    cantidad_origenes = input(">>> Ingrese una cantidad válida de almacenes: ")
+  # Almacenes y sus ofertas 
+  origen = [] # Array con el nombre de los origenes
+  ofertas = [] # Array con las ofertas de los origenes
+  oferta = {} # Diccionario con el nombre del almacen y su oferta
+  for i in range(int(cantidad_origenes)):
+    almacen = input("\n>>> Ingrese el nombre del almacen: ")
+    oferta_almacen = input(">>> Ingrese la oferta del almacen: ")
+    ## Validar que sea un digito
+    while oferta_almacen == "" or not oferta_almacen.isdigit():
+      oferta_almacen = input(">>> Ingrese una oferta válida del almacen {almacen}: ")
+    ### Almacenando los valores obtenidos
+    origen.append(almacen) # Array con los nombres de los origenes
+    ofertas.append(int(oferta_almacen)) # Array con las ofertas de los origenes
+    oferta[almacen] = int(oferta_almacen) # Diccionario clave(nombre del almacen)-valor(oferta
+
+
+  # DISTRIBUIDORES Y DEMANDA
+  cantidad_destinos = input("\n>>> Ingrese la cantidad de centros de distribución: ")
+  ### Validar que sea un digito
+  while cantidad_destinos == "" or not cantidad_destinos.isdigit():
+    cantidad_destinos = input(">>> Ingrese una cantidad válida de centros de distribución: ")
+  # Distribuidores y demanda
+  destino = [] # Array con el nombre de los destinos
+  destinos = [] # Array con las demandas de los destinos
+  demanda = {} # Diccionario con el nombre del centro de distribución y su demanda
+  for i in range(int(cantidad_destinos)):
+    distribuidor = input("\n>>> Ingrese el nombre del centro de distribución: ")
+    demanda_distribuidor = input(f">>> Ingrese la demanda del centro de distribución {distribuidor}: ")
+    ## Validar que sea un digito
+    while demanda_distribuidor == "" or not demanda_distribuidor.isdigit():
+      demanda_distribuidor = input(">>> Ingrese una demanda válida del centro de distribución: ")
+    ### Almacenando los valores obtenidos
+    destino.append(distribuidor)
+    destinos.append(int(demanda_distribuidor))
+    demanda[distribuidor] = int(demanda_distribuidor)
+
+  # Costo de transporte
+  print("\n>>> Costos de transporte de cada almacén a cada centro de distribución")
+  costos_transporte = {}
+  for i in origen:
+    costo_fila = {}
+    for j in destino:
+      costo = input(f">>> Ingrese el costo de transporte de {i} a {j}: ")
+      ## Validar que sea un digito
+      while costo == "" or not costo.isdigit():
+        costo = input(f">>> Ingrese un costo válido de transporte de {i} a {j}: ")
+      costo_fila[j] = int(costo)
+    costos_transporte[i] = costo_fila
+  return oferta, demanda, origen, destino, costos_transporte
 
 def main():
   while True:
@@ -41,62 +1294,11 @@ def main():
     if option == "1":
       print(">>> Ejecutando el método de transporte Vogel...")
 
-      # ALMACENES Y OFERTAS
-      cantidad_origenes = input(">>> Ingrese la cantidad de almacenes: ")
-      ### Validar que sea un digito
-      while cantidad_origenes == "" or not cantidad_origenes.isdigit():
-        cantidad_origenes = input(">>> Ingrese una cantidad válida de almacenes: ")
-      # Almacenes y sus ofertas 
-      origen = [] # Array con el nombre de los origenes
-      ofertas = [] # Array con las ofertas de los origenes
-      oferta = {} # Diccionario con el nombre del almacen y su oferta
-      for i in range(int(cantidad_origenes)):
-        almacen = input("\n>>> Ingrese el nombre del almacen: ")
-        oferta_almacen = input(">>> Ingrese la oferta del almacen: ")
-        ## Validar que sea un digito
-        while oferta_almacen == "" or not oferta_almacen.isdigit():
-          oferta_almacen = input(">>> Ingrese una oferta válida del almacen {almacen}: ")
-        ### Almacenando los valores obtenidos
-        origen.append(almacen) # Array con los nombres de los origenes
-        ofertas.append(int(oferta_almacen)) # Array con las ofertas de los origenes
-        oferta[almacen] = int(oferta_almacen) # Diccionario clave(nombre del almacen)-valor(oferta
-
-
-      # DISTRIBUIDORES Y DEMANDA
-      cantidad_destinos = input("\n>>> Ingrese la cantidad de centros de distribución: ")
-      ### Validar que sea un digito
-      while cantidad_destinos == "" or not cantidad_destinos.isdigit():
-        cantidad_destinos = input(">>> Ingrese una cantidad válida de centros de distribución: ")
-      # Distribuidores y demanda
-      destino = [] # Array con el nombre de los destinos
-      destinos = [] # Array con las demandas de los destinos
-      demanda = {} # Diccionario con el nombre del centro de distribución y su demanda
-      for i in range(int(cantidad_destinos)):
-        distribuidor = input("\n>>> Ingrese el nombre del centro de distribución: ")
-        demanda_distribuidor = input(f">>> Ingrese la demanda del centro de distribución {distribuidor}: ")
-        ## Validar que sea un digito
-        while demanda_distribuidor == "" or not demanda_distribuidor.isdigit():
-          demanda_distribuidor = input(">>> Ingrese una demanda válida del centro de distribución: ")
-        ### Almacenando los valores obtenidos
-        destino.append(distribuidor)
-        destinos.append(int(demanda_distribuidor))
-        demanda[distribuidor] = int(demanda_distribuidor)
-
-      # Costo de transporte
-      print("\n>>> Costos de transporte de cada almacén a cada centro de distribución")
-      costos_transporte = {}
-      costo_fila = {}
-      for i in origen:
-        for j in destino:
-          costo = input(f">>> Ingrese el costo de transporte de {i} a {j}: ")
-          ## Validar que sea un digito
-          while costo == "" or not costo.isdigit():
-            costo = input(f">>> Ingrese un costo válido de transporte de {i} a {j}: ")
-          costo_fila[j] = int(costo)
-        costos_transporte[i] = costo_fila
-      
+      oferta, demanda, origen, destino, costos_transporte = leer_datos()
+
       # Calcular los resultados
-      costo_transporte_ruta_minima(oferta, demanda, origen, destino, costos_transporte)
+      resultado = costo_transporte_vogel(oferta, demanda, origen, destino, costos_transporte)
+      mostrar_resultado(resultado, origen, destino)
       
     # Salir del programa
     else: